@@ -3,13 +3,77 @@ Décorateurs personnalisés pour l'authentification et les permissions.
 
 Ce module fournit des décorateurs réutilisables pour protéger les vues
 et contrôler l'accès en fonction du statut d'authentification.
+
+Ils acceptent aussi les vues async : l'utilisateur est alors chargé avec
+``request.auser()`` (et son profil avec l'ORM async), puis remplacé dans
+``request.user`` pour que la vue et les templates n'aient plus à
+interroger la base de façon synchrone.
 """
 
 from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.urls import reverse
 
+from .models import Profile
+
+
+async def aload_user(request):
+    """
+    Charger l'utilisateur et son profil depuis une vue async.
+
+    ``request.user`` est un objet paresseux qui ferait une requête
+    synchrone au premier accès (interdit dans la boucle d'événements) : il
+    est remplacé par l'utilisateur chargé, avec ``user.profile`` en cache.
+    """
+    user = await request.auser()
+    if user.is_authenticated and not User.profile.is_cached(user):
+        profile = await Profile.objects.filter(user=user).afirst()
+        # Même cache que l'accès à ``user.profile`` (None : pas de profil)
+        User.profile.related.set_cached_value(user, profile)
+    request.user = user
+    return user
+
+
+def _user_passes(test, refuse):
+    """
+    Décorateur qui répond ``refuse(request)`` si ``test(user)`` est faux,
+    pour une vue synchrone comme pour une vue async.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                if not test(await aload_user(request)):
+                    return refuse(request)
+                return await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                if not test(request.user):
+                    return refuse(request)
+                return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _redirect_to_login(request):
+    messages.warning(request, 'Vous devez être connecté pour accéder à cette page.')
+    return redirect(f"{reverse('home:login')}?next={request.path}")
+
+
+def _redirect_to_board(request):
+    messages.info(request, 'Vous êtes déjà connecté.')
+    return redirect('jobs:index')
+
+
+def _redirect_to_home(request):
+    messages.error(request, 'Vous n\'avez pas les permissions nécessaires.')
+    return redirect('home:index')
+
 
 def login_required_custom(view_func):
     """
@@ -21,14 +85,12 @@ def login_required_custom(view_func):
         @login_required_custom
         def my_view(request):
             ...
+
+        @login_required_custom
+        async def my_async_view(request):
+            ...
     """
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            messages.warning(request, 'Vous devez être connecté pour accéder à cette page.')
-            return redirect(f"{reverse('home:login')}?next={request.path}")
-        return view_func(request, *args, **kwargs)
-    return wrapper
+    return _user_passes(lambda user: user.is_authenticated, _redirect_to_login)(view_func)
 
 
 def logout_required(view_func):
@@ -42,13 +104,7 @@ def logout_required(view_func):
         def my_view(request):
             ...
     """
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        if request.user.is_authenticated:
-            messages.info(request, 'Vous êtes déjà connecté.')
-            return redirect('jobs:index')
-        return view_func(request, *args, **kwargs)
-    return wrapper
+    return _user_passes(lambda user: not user.is_authenticated, _redirect_to_board)(view_func)
 
 
 def admin_required(view_func):
@@ -62,11 +118,5 @@ def admin_required(view_func):
         def my_view(request):
             ...
     """
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated or not request.user.is_staff:
-            messages.error(request, 'Vous n\'avez pas les permissions nécessaires.')
-            return redirect('home:index')
-        return view_func(request, *args, **kwargs)
-    return wrapper
+    return _user_passes(lambda user: user.is_authenticated and user.is_staff, _redirect_to_home)(view_func)
 
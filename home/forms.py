@@ -9,6 +9,8 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from .models import Profile
+from .tasks import schedule_thumbnails
+from .thumbnails import delete_thumbnails
 
 
 class RegisterForm(UserCreationForm):
@@ -114,13 +116,15 @@ class RegisterForm(UserCreationForm):
         user.email = self.cleaned_data['email']
         if commit:
             user.save()
-            Profile.objects.create(
+            profile = Profile.objects.create(
                 user=user,
                 user_type=self.cleaned_data['user_type'],
                 address=self.cleaned_data['address'],
                 image=self.cleaned_data.get('image'),
                 siret=self.cleaned_data.get('siret', ''),
             )
+            # Miniatures générées hors de la requête (voir home.thumbnails)
+            schedule_thumbnails(profile.image.name)
         return user
 
 
@@ -214,7 +218,9 @@ class ProfileUpdateForm(forms.Form):
         self.profile.address = self.cleaned_data['address']
 
         # Sauvegarder l'image si uploadée
+        old_image = None
         if self.cleaned_data.get('image'):
+            old_image = self.profile.image.name
             self.profile.image = self.cleaned_data['image']
 
         # Sauvegarder le CV si uploadé (postulants uniquement)
@@ -223,5 +229,11 @@ class ProfileUpdateForm(forms.Form):
 
         self.profile.siret = self.cleaned_data.get('siret', '')
         self.profile.save()
+
+        if self.cleaned_data.get('image') and self.profile.image.name != old_image:
+            # Stockage adressé par le contenu : l'ancienne photo peut servir à un autre profil
+            if old_image and not Profile.objects.filter(image=old_image).exists():
+                delete_thumbnails(old_image)
+            schedule_thumbnails(self.profile.image.name)
         return self.profile
 
@@ -0,0 +1,105 @@
+"""
+Compter les requêtes SQL d'un affichage du board par un visiteur connecté,
+selon le moteur de sessions et le middleware d'authentification.
+
+Un visiteur postulant temporaire est créé pour la mesure puis supprimé.
+
+Usage:
+    python manage.py benchmark_auth_queries
+    python manage.py benchmark_auth_queries --requests 50 --page-cache 60
+"""
+
+import re
+import statistics
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from home.models import Profile
+
+SNAPSHOT_MIDDLEWARE = 'home.middleware.SnapshotAuthenticationMiddleware'
+DJANGO_MIDDLEWARE = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+AUTH_TABLES = ('django_session', 'auth_user', 'home_profile')
+
+
+def _middleware(authentication):
+    return [
+        authentication if name in (SNAPSHOT_MIDDLEWARE, DJANGO_MIDDLEWARE) else name
+        for name in settings.MIDDLEWARE
+    ]
+
+
+CONFIGURATIONS = [
+    ('sessions en base, AuthenticationMiddleware', {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'MIDDLEWARE': _middleware(DJANGO_MIDDLEWARE),
+    }),
+    ('sessions cached_db, instantané', {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'MIDDLEWARE': _middleware(SNAPSHOT_MIDDLEWARE),
+    }),
+    ('sessions signées, instantané', {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'MIDDLEWARE': _middleware(SNAPSHOT_MIDDLEWARE),
+    }),
+]
+
+
+def _table(sql):
+    match = re.search(r'FROM "(\w+)"', sql)
+    table = match.group(1) if match else 'autre'
+    return table if table in AUTH_TABLES else 'board'
+
+
+class Command(BaseCommand):
+    help = "Compte les requêtes SQL par affichage du board selon les sessions et l'authentification."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help="Affichages mesurés par configuration")
+        parser.add_argument('--page-cache', type=int, default=0,
+                            help="JOBS_BOARD_PAGE_CACHE_TIMEOUT pendant la mesure (0 = désactivé)")
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(f'benchmark-{uuid.uuid4().hex[:12]}', first_name='Benchmark')
+        Profile.objects.create(user=user, user_type=Profile.USER_TYPE_APPLICANT, address='')
+        try:
+            for label, overrides in CONFIGURATIONS:
+                with override_settings(JOBS_BOARD_PAGE_CACHE_TIMEOUT=options['page_cache'], **overrides):
+                    self._measure(label, user, options['requests'])
+        finally:
+            user.delete()
+
+    def _measure(self, label, user, requests):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+        url = reverse('jobs:index')
+        # Premier affichage : caches (session, instantané, cartes) remplis
+        client.get(url)
+
+        tables, timings = Counter(), []
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                self.stderr.write(self.style.ERROR(f'{label} : réponse {response.status_code}'))
+                return
+            tables.update(_table(query['sql']) for query in queries)
+        client.logout()
+
+        per_request = ', '.join(
+            f'{table} {tables[table] / requests:g}' for table in (*AUTH_TABLES, 'board') if tables[table]
+        ) or 'aucune'
+        self.stdout.write(
+            f'{label} : {sum(tables.values()) / requests:g} requête(s) par affichage ({per_request}), '
+            f'médiane {statistics.median(timings) * 1000:.1f} ms'
+        )
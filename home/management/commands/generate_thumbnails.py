@@ -0,0 +1,30 @@
+"""
+Générer les miniatures des photos de profil existantes.
+
+Utile après l'ajout d'une variante ou pour les photos envoyées avant la
+mise en place des miniatures.
+
+Usage:
+    python manage.py generate_thumbnails
+"""
+
+from django.core.management.base import BaseCommand
+
+from home.models import Profile
+from home.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Génère les miniatures (WebP/JPEG) des photos de profil."
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        names = Profile.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True)
+        for name in names.iterator():
+            try:
+                generate_thumbnails(name)
+                done += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'{name}: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Miniatures générées pour {done} images ({failed} en échec).'))
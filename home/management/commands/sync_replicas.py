@@ -0,0 +1,40 @@
+"""
+Recopier la base principale SQLite vers les réplicas configurés.
+
+Remplace la réplication d'un vrai serveur de bases de données pour tester
+le routage des lectures en local (voir ``job_board.routers``).
+
+Usage:
+    JOB_BOARD_DB_REPLICAS=db-replica.sqlite3 python manage.py sync_replicas
+"""
+
+import sqlite3
+from contextlib import closing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from job_board.routers import replicas
+
+
+class Command(BaseCommand):
+    help = "Copie la base principale SQLite vers les réplicas (API de sauvegarde SQLite)."
+
+    def handle(self, *args, **options):
+        aliases = replicas()
+        if not aliases:
+            raise CommandError('Aucun réplica configuré (variable JOB_BOARD_DB_REPLICAS).')
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Seule une base principale SQLite peut être recopiée.')
+        source.ensure_connection()
+
+        for alias in aliases:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f"Le réplica {alias} n'est pas une base SQLite.")
+            replica.close()
+            # Copie cohérente même si la base principale est en cours d'écriture
+            with closing(sqlite3.connect(replica.settings_dict['NAME'])) as target:
+                source.connection.backup(target)
+            self.stdout.write(self.style.SUCCESS(f'{alias} : {replica.settings_dict["NAME"]} à jour.'))
@@ -0,0 +1,186 @@
+"""
+Authentification à partir d'un instantané en cache de l'utilisateur et de
+son profil.
+
+Sans lui, chaque requête authentifiée lit l'utilisateur puis son profil
+(``request.user.profile`` dans l'en-tête et sur le board). Avec des
+sessions ``cached_db`` (voir ``SESSION_ENGINE``), une requête
+authentifiée ne fait plus aucune de ces requêtes tant que le cache répond.
+
+L'instantané contient les champs de l'utilisateur (sauf le mot de passe,
+rechargé à la demande s'il est lu), ceux de son profil et l'empreinte de
+session (``get_session_auth_hash``), qui remplace la vérification faite
+par ``django.contrib.auth.get_user``. Tout enregistrement de l'utilisateur
+ou du profil (``ProfileUpdateForm.save``, changement de mot de passe,
+admin...) l'invalide en incrémentant une génération (voir
+``home.signals``) : un instantané écrit par une requête concurrente avec
+des données plus anciennes est ignoré. Une génération évincée du cache
+repart d'une valeur jamais utilisée (horodatage) : un ancien instantané
+ne peut pas redevenir valide.
+
+Le cache est celui de ``CACHES['default']`` : avec plusieurs processus, il
+doit être partagé (Redis, Memcached) pour que l'invalidation les atteigne.
+"""
+
+import time
+from functools import partial
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.fields.files import FieldFile
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .models import Profile
+
+SNAPSHOT_KEY = 'user-snapshot:{}'
+GENERATION_KEY = 'user-snapshot:generation:{}'
+DEFAULT_TIMEOUT = 5 * 60
+
+
+def _user_fields():
+    return [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+def _profile_fields():
+    return [field.attname for field in Profile._meta.concrete_fields]
+
+
+def _values(instance, names):
+    values = [getattr(instance, name) for name in names]
+    # Nom du fichier plutôt que le FieldFile, qui référence toute l'instance
+    return [value.name if isinstance(value, FieldFile) else value for value in values]
+
+
+def _keys(user_id):
+    return SNAPSHOT_KEY.format(user_id), GENERATION_KEY.format(user_id)
+
+
+def invalidate_snapshot(user_id):
+    """Rendre caduc l'instantané de ``user_id`` (dans tous les processus)."""
+    key = GENERATION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, time.time_ns(), timeout=None):
+            cache.incr(key)
+
+
+def _generation(entries, user_id):
+    """Génération courante ; absente (jamais écrite ou évincée), elle est créée."""
+    key = GENERATION_KEY.format(user_id)
+    generation = entries.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+async def _ageneration(entries, user_id):
+    key = GENERATION_KEY.format(user_id)
+    generation = entries.get(key)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def _restore(request, entries, user_id):
+    """Utilisateur de l'instantané s'il est à jour et correspond à la session."""
+    snapshot_key, generation_key = _keys(user_id)
+    entry = entries.get(snapshot_key)
+    generation = entries.get(generation_key)
+    if entry is None or generation is None or entry['generation'] != generation:
+        return None
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    if not session_hash or not constant_time_compare(session_hash, entry['session_auth_hash']):
+        # Empreinte absente ou changée : vérification complète par Django
+        return None
+    if request.session.get(BACKEND_SESSION_KEY) not in settings.AUTHENTICATION_BACKENDS:
+        return None
+
+    user = User.from_db(DEFAULT_DB_ALIAS, _user_fields(), entry['user'])
+    profile = None
+    if entry['profile'] is not None:
+        profile = Profile.from_db(DEFAULT_DB_ALIAS, _profile_fields(), entry['profile'])
+        Profile.user.field.set_cached_value(profile, user)
+    User.profile.related.set_cached_value(user, profile)
+    return user
+
+
+def _snapshot(user, profile, generation):
+    User.profile.related.set_cached_value(user, profile)
+    return {
+        'generation': generation,
+        'session_auth_hash': user.get_session_auth_hash(),
+        'user': _values(user, _user_fields()),
+        'profile': None if profile is None else _values(profile, _profile_fields()),
+    }
+
+
+def timeout():
+    return getattr(settings, 'HOME_USER_SNAPSHOT_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def get_user(request):
+    """``django.contrib.auth.get_user`` servi depuis l'instantané quand c'est possible."""
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return auth.get_user(request)
+    entries = cache.get_many(_keys(user_id))
+    user = _restore(request, entries, user_id)
+    if user is None:
+        # Génération lue avant le chargement : une invalidation entre-temps l'emporte
+        generation = _generation(entries, user_id)
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            profile = Profile.objects.filter(user=user).first()
+            snapshot = _snapshot(user, profile, generation)
+            cache.set(SNAPSHOT_KEY.format(user_id), snapshot, timeout=timeout())
+    return user
+
+
+async def aget_user(request):
+    """Version async de ``get_user``."""
+    user_id = await request.session.aget(SESSION_KEY)
+    if user_id is None:
+        return await auth.aget_user(request)
+    entries = await cache.aget_many(_keys(user_id))
+    user = _restore(request, entries, user_id)
+    if user is None:
+        generation = await _ageneration(entries, user_id)
+        user = await auth.aget_user(request)
+        if user.is_authenticated:
+            profile = await Profile.objects.filter(user=user).afirst()
+            snapshot = _snapshot(user, profile, generation)
+            await cache.aset(SNAPSHOT_KEY.format(user_id), snapshot, timeout=timeout())
+    return user
+
+
+class SnapshotAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    ``AuthenticationMiddleware`` dont ``request.user`` (et ``request.auser()``)
+    vient de l'instantané en cache, profil compris.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _cached_user(request))
+        request.auser = partial(_acached_user, request)
+
+
+def _cached_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = get_user(request)
+    return request._cached_user
+
+
+async def _acached_user(request):
+    if not hasattr(request, '_acached_user'):
+        request._acached_user = await aget_user(request)
+    return request._acached_user
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:47
+
+import home.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_profile_cv_alter_profile_image'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='cv',
+            field=models.FileField(blank=True, null=True, storage=home.storage.ContentAddressedStorage(), upload_to='profiles/cvs/'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=home.storage.ContentAddressedStorage(), upload_to='profiles/images/'),
+        ),
+    ]
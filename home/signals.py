@@ -0,0 +1,27 @@
+"""
+Signaux de l'application home.
+
+Invalident l'instantané utilisateur + profil de ``home.middleware`` dès
+que l'un des deux est enregistré ou supprimé.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .middleware import invalidate_snapshot
+from .models import Profile
+
+
+@receiver(post_save, sender=User, dispatch_uid='home_snapshot_user_save')
+@receiver(post_delete, sender=User, dispatch_uid='home_snapshot_user_delete')
+def invalidate_user_snapshot(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_snapshot(instance.pk)
+
+
+@receiver(post_save, sender=Profile, dispatch_uid='home_snapshot_profile_save')
+@receiver(post_delete, sender=Profile, dispatch_uid='home_snapshot_profile_delete')
+def invalidate_profile_snapshot(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_snapshot(instance.user_id)
@@ -0,0 +1,54 @@
+"""
+Stockage adressé par le contenu pour les fichiers de profil.
+
+Un fichier est enregistré sous ``<upload_to>/<aa>/<sha256><extension>`` :
+deux envois identiques (le même CV renvoyé, la même photo sur deux
+comptes) pointent vers le même fichier, le second ne coûte ni écriture ni
+espace disque. Le condensat calculé pendant la réception
+(``home.uploads.HashingUploadHandler``) est réutilisé ; à défaut le
+fichier est relu par morceaux.
+
+Un fichier pouvant être partagé entre plusieurs profils, remplacer une
+photo ou un CV ne supprime jamais l'ancien fichier.
+"""
+
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+
+def content_hash(content):
+    """SHA-256 de ``content`` (condensat déjà calculé à l'upload, sinon lecture par morceaux)."""
+    digest = getattr(content, 'content_hash', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """``FileSystemStorage`` qui nomme les fichiers d'après leur SHA-256."""
+
+    def content_name(self, name, content):
+        directory, file_name = posixpath.split(name)
+        digest = content_hash(content)
+        extension = os.path.splitext(file_name)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{extension}')
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Contenu déjà présent : rien à écrire
+            return name
+        return super()._save(name, content)
+
+
+content_addressed_storage = ContentAddressedStorage()
@@ -0,0 +1,19 @@
+"""
+Tâches en arrière-plan de l'application home (voir ``tasks.queue``).
+"""
+
+from tasks.queue import task
+
+from .thumbnails import generate_thumbnails
+
+
+@task(max_attempts=3)
+def generate_profile_thumbnails(source_name):
+    """Générer les miniatures d'une photo de profil."""
+    generate_thumbnails(source_name)
+
+
+def schedule_thumbnails(source_name):
+    """Mettre en file la génération des miniatures de ``source_name``."""
+    if source_name:
+        generate_profile_thumbnails.enqueue(args=[source_name], dedup_key=f'thumbnails:{source_name}')
@@ -0,0 +1,25 @@
+"""
+Balises de template pour les miniatures des photos de profil.
+
+Usage:
+    {% load thumbnails %}
+    <img src="{% thumbnail_url profile.image 'small' %}" width="64" height="64">
+"""
+
+from django import template
+
+from home import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def thumbnail_url(context, image, size='medium'):
+    """
+    URL de la miniature ``size`` de ``image`` : WebP si le navigateur
+    l'annonce dans son en-tête Accept, JPEG sinon.
+    """
+    request = context.get('request')
+    accept = request.META.get('HTTP_ACCEPT', '') if request else ''
+    fmt = 'webp' if 'image/webp' in accept else 'jpeg'
+    return thumbnails.thumbnail_url(image, size, fmt)
@@ -0,0 +1,291 @@
+"""
+Tests de l'application home.
+
+Lancement:
+    python manage.py test home
+"""
+
+import hashlib
+import posixpath
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from . import throttling
+from .middleware import GENERATION_KEY, SNAPSHOT_KEY, invalidate_snapshot
+from .models import Profile
+from .storage import content_addressed_storage
+from .thumbnails import SIZES, thumbnail_name
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def make_image(size=(1200, 800), fmt='JPEG', exif=True, color=(200, 30, 30)):
+    """Créer une image en mémoire (avec une orientation EXIF)."""
+    image = Image.new('RGB', size, color)
+    buffer = BytesIO()
+    options = {}
+    if exif:
+        metadata = Image.Exif()
+        metadata[0x0112] = 6  # rotation de 90°
+        metadata[0x010F] = 'Appareil photo'
+        options['exif'] = metadata
+    image.save(buffer, fmt, **options)
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+class AsyncProfileTests(TestCase):
+    """Page profil servie par le client ASGI (vue async)."""
+
+    async def test_profile_is_created_and_rendered(self):
+        user = await User.objects.acreate(username='carol', first_name='Carol')
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(reverse('home:profile'))
+        self.assertContains(response, 'Carol')
+        profile = await Profile.objects.aget(user=user)
+        self.assertEqual(profile.user_type, Profile.USER_TYPE_APPLICANT)
+
+    async def test_anonymous_visitor_is_redirected(self):
+        response = await self.async_client.get(reverse('home:profile'))
+        self.assertRedirects(
+            response, f"{reverse('home:login')}?next={reverse('home:profile')}", fetch_redirect_response=False,
+        )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, TASKS_EAGER=True)
+class ProfileThumbnailTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('alice', first_name='Alice', last_name='Martin')
+        self.profile = Profile.objects.create(user=self.user, user_type=Profile.USER_TYPE_APPLICANT, address='Paris')
+        self.client.force_login(self.user)
+
+    def upload(self, **image):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('home:profile'), {
+                'first_name': 'Alice', 'last_name': 'Martin', 'address': 'Paris', 'image': make_image(**image),
+            })
+        self.profile.refresh_from_db()
+
+    def test_variants_are_generated_without_exif(self):
+        self.upload()
+        for size, dimensions in SIZES.items():
+            for fmt in ('webp', 'jpeg'):
+                with default_storage.open(thumbnail_name(self.profile.image.name, size, fmt)) as file:
+                    thumbnail = Image.open(file)
+                    self.assertEqual(thumbnail.size, dimensions)
+                    self.assertFalse(thumbnail.getexif())
+
+    def test_profile_page_serves_thumbnail(self):
+        self.upload()
+        response = self.client.get(reverse('home:profile'), HTTP_ACCEPT='image/webp,*/*')
+        self.assertContains(response, thumbnail_name(self.profile.image.name, 'large', 'webp'))
+        response = self.client.get(reverse('home:profile'))
+        self.assertContains(response, thumbnail_name(self.profile.image.name, 'large', 'jpeg'))
+
+    def test_replacing_image_removes_old_thumbnails(self):
+        self.upload()
+        old = thumbnail_name(self.profile.image.name, 'small', 'webp')
+        self.upload(color=(30, 30, 200))
+        self.assertFalse(default_storage.exists(old))
+        self.assertTrue(default_storage.exists(thumbnail_name(self.profile.image.name, 'small', 'webp')))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, TASKS_EAGER=True, PROFILE_CV_MAX_SIZE=100 * 1024)
+class ProfileUploadTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('bob', first_name='Bob', last_name='Durand')
+        self.profile = Profile.objects.create(user=self.user, user_type=Profile.USER_TYPE_APPLICANT, address='Lyon')
+        self.client.force_login(self.user)
+
+    def post_cv(self, name, content):
+        return self.client.post(reverse('home:profile'), {
+            'first_name': 'Bob', 'last_name': 'Durand', 'address': 'Lyon',
+            'cv': SimpleUploadedFile(name, content, content_type='application/pdf'),
+        })
+
+    def test_identical_cvs_share_one_file(self):
+        content = b'%PDF-1.4 mon cv'
+        self.post_cv('cv.pdf', content)
+        self.profile.refresh_from_db()
+        first = self.profile.cv.name
+        self.assertTrue(first.startswith('profiles/cvs/'))
+        self.assertIn(hashlib.sha256(content).hexdigest(), first)
+
+        other = User.objects.create_user('carol', first_name='Carol', last_name='Petit')
+        other_profile = Profile.objects.create(user=other, user_type=Profile.USER_TYPE_APPLICANT, address='Nantes')
+        self.client.force_login(other)
+        self.client.post(reverse('home:profile'), {
+            'first_name': 'Carol', 'last_name': 'Petit', 'address': 'Nantes',
+            'cv': SimpleUploadedFile('autre-nom.PDF', content),
+        })
+        other_profile.refresh_from_db()
+        self.assertEqual(other_profile.cv.name, first)
+        self.assertEqual(len(content_addressed_storage.listdir(posixpath.dirname(first))[1]), 1)
+
+    def test_wrong_type_is_rejected(self):
+        response = self.post_cv('cv.exe', b'MZ...')
+        self.assertContains(response, 'Type de fichier non accepté')
+        response = self.post_cv('cv.pdf', b'MZ pas un pdf')
+        self.assertContains(response, 'ne correspond pas')
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.cv)
+
+    def test_oversized_upload_is_aborted(self):
+        response = self.post_cv('cv.pdf', b'%PDF-' + b'0' * 300 * 1024)
+        self.assertContains(response, 'Fichier trop volumineux')
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.cv)
+
+
+class UserSnapshotTests(TestCase):
+    """Utilisateur et profil servis par l'instantané en cache (home.middleware)."""
+
+    AUTH_TABLES = ('django_session', 'auth_user', 'home_profile')
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('dave', first_name='Dave')
+        Profile.objects.create(user=self.user, user_type=Profile.USER_TYPE_APPLICANT, address='Nantes')
+        self.client.force_login(self.user)
+
+    def get_board(self):
+        """Afficher le board ; retourne la réponse et les requêtes d'authentification."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('jobs:index'))
+        return response, [
+            query['sql'] for query in queries
+            if any(f'FROM "{table}"' in query['sql'] for table in self.AUTH_TABLES)
+        ]
+
+    def test_logged_in_board_skips_session_user_and_profile_queries(self):
+        _, queries = self.get_board()
+        self.assertEqual(len(queries), 2)  # utilisateur et profil, mis en cache
+        response, queries = self.get_board()
+        self.assertEqual(queries, [])
+        self.assertEqual(response.wsgi_request.user.profile.address, 'Nantes')
+
+    def test_profile_update_invalidates_snapshot(self):
+        self.get_board()
+        self.client.post(reverse('home:profile'), {'first_name': 'David', 'last_name': 'Roux', 'address': 'Lille'})
+        response, _ = self.get_board()
+        self.assertEqual(response.wsgi_request.user.first_name, 'David')
+        self.assertEqual(response.wsgi_request.user.profile.address, 'Lille')
+
+    def test_password_change_logs_out_existing_sessions(self):
+        self.get_board()
+        self.user.set_password('nouveau-mot-de-passe')
+        self.user.save()
+        response, _ = self.get_board()
+        self.assertEqual(response.status_code, 302)
+
+    def test_snapshot_written_before_an_invalidation_is_ignored(self):
+        self.get_board()
+        stale = cache.get(SNAPSHOT_KEY.format(self.user.pk))
+        Profile.objects.filter(user=self.user).update(address='Brest')
+        invalidate_snapshot(self.user.pk)
+        # Requête concurrente qui avait lu l'ancien profil
+        cache.set(SNAPSHOT_KEY.format(self.user.pk), stale)
+        response, _ = self.get_board()
+        self.assertEqual(response.wsgi_request.user.profile.address, 'Brest')
+
+    def test_evicted_generation_does_not_revive_a_stale_snapshot(self):
+        # Compteur évincé du cache (MAX_ENTRIES) avant puis après l'invalidation
+        cache.delete(GENERATION_KEY.format(self.user.pk))
+        self.get_board()
+        stale = cache.get(SNAPSHOT_KEY.format(self.user.pk))
+        Profile.objects.filter(user=self.user).update(address='Brest')
+        invalidate_snapshot(self.user.pk)
+        cache.delete(GENERATION_KEY.format(self.user.pk))
+        cache.set(SNAPSHOT_KEY.format(self.user.pk), stale)
+        response, _ = self.get_board()
+        self.assertEqual(response.wsgi_request.user.profile.address, 'Brest')
+
+    def test_saving_a_restored_user_keeps_the_password(self):
+        self.get_board()
+        response, _ = self.get_board()
+        user = response.wsgi_request.user
+        user.last_name = 'Roux'
+        user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).password, self.user.password)
+
+
+@override_settings(RATE_LIMITS={'login': (3, 6), 'register': (2, 1), 'create_offer': (2, 1)})
+class RateLimitTests(TestCase):
+    """Seaux de jetons de ``home.throttling``."""
+
+    def setUp(self):
+        cache.clear()
+        throttling._local.clear()
+        # Pas de hachage PBKDF2 dans les tests ; compte les tentatives arrivées jusqu'à la vue
+        patcher = mock.patch('home.views.authenticate', return_value=None)
+        self.authenticate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, username='eve', ip='10.0.0.1'):
+        return self.client.post(
+            reverse('home:login'), {'username': username, 'password': 'x'}, REMOTE_ADDR=ip,
+        )
+
+    def test_burst_is_rejected_before_hashing(self):
+        statuses = [self.login().status_code for _ in range(5)]
+        self.assertEqual(statuses, [200, 200, 200, 429, 429])
+        self.assertEqual(self.authenticate.call_count, 3)
+        self.assertEqual(self.login()['Retry-After'], '10')
+
+    def test_username_is_limited_across_addresses(self):
+        for index in range(3):
+            self.login(ip=f'10.0.0.{index}')
+        self.assertEqual(self.login(ip='10.0.0.99').status_code, 429)
+        self.assertEqual(self.login(username='frank', ip='10.0.0.99').status_code, 200)
+
+    def test_tokens_are_refilled(self):
+        with mock.patch('home.throttling.time.time', return_value=1000.0):
+            for _ in range(3):
+                self.login()
+            self.assertEqual(self.login().status_code, 429)
+        with mock.patch('home.throttling.time.time', return_value=1010.0):
+            self.assertEqual(self.login().status_code, 200)
+
+    def test_register_and_create_offer_are_limited(self):
+        for _ in range(2):
+            self.client.post(reverse('home:register'), {})
+        self.assertEqual(self.client.post(reverse('home:register'), {}).status_code, 429)
+
+        company = User.objects.create_user('acme')
+        Profile.objects.create(user=company, user_type=Profile.USER_TYPE_COMPANY, address='Paris', siret='12345678901234')
+        self.client.force_login(company)
+        for _ in range(2):
+            self.client.post(reverse('jobs:create_offer'), {})
+        self.assertEqual(self.client.post(reverse('jobs:create_offer'), {}).status_code, 429)
+        self.assertEqual(self.client.get(reverse('jobs:create_offer')).status_code, 200)
+
+    @override_settings(RATE_LIMIT_CACHE='absent')
+    def test_local_fallback_when_cache_is_unavailable(self):
+        with self.assertLogs('home.throttling', 'WARNING'):
+            statuses = [self.login().status_code for _ in range(4)]
+        self.assertEqual(statuses[-1], 429)
+
+    def test_metrics_count_allowed_and_rejected_attempts(self):
+        for _ in range(4):
+            self.login()
+        admin = User.objects.create_superuser('admin', 'admin@test.com')
+        self.client.force_login(admin)
+        stats = self.client.get(reverse('jobs:metrics')).json()['rate_limits']
+        self.assertEqual(stats['login'], {'allowed': 3, 'rejected': 1})
@@ -0,0 +1,151 @@
+"""
+Limitation de débit par seaux de jetons (token buckets).
+
+Chaque portée de ``RATE_LIMITS`` (``login``, ``register``,
+``create_offer``) a un seau par clé : adresse IP, nom d'utilisateur saisi,
+utilisateur connecté. Un seau contient au plus ``capacité`` jetons et en
+regagne ``par minute`` ; une requête consomme un jeton dans chacun de ses
+seaux et est refusée (429) si l'un d'eux est vide.
+
+Le contrôle se fait avant la vue : une rafale de tentatives de connexion
+est refusée sans hacher un seul mot de passe (PBKDF2 occupe un cœur
+plusieurs dizaines de millisecondes par tentative).
+
+Les seaux sont stockés dans le cache ``RATE_LIMIT_CACHE``, partagé entre
+workers en production. Si ce cache ne répond plus, un cache mémoire local
+prend le relais : la limite s'applique alors par processus. La lecture
+puis l'écriture d'un seau ne sont pas atomiques : des requêtes simultanées
+peuvent dépasser la limite de quelques jetons.
+
+Usage:
+    @rate_limit('login', client_ip, posted_username)
+    def login_view(request):
+        ...
+"""
+
+import hashlib
+import logging
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ratelimit'
+DEFAULT_LIMITS = {
+    'login': (10, 5),
+    'register': (5, 1),
+    'create_offer': (20, 10),
+}
+
+_local = LocMemCache('ratelimit-fallback', {})
+
+
+def limits():
+    """``{portée: (capacité, jetons rendus par minute)}``."""
+    return getattr(settings, 'RATE_LIMITS', DEFAULT_LIMITS)
+
+
+def _call(method, *args, **kwargs):
+    """Appeler le cache partagé, ou le cache local s'il est indisponible."""
+    try:
+        return getattr(caches[getattr(settings, 'RATE_LIMIT_CACHE', 'default')], method)(*args, **kwargs)
+    except ValueError:
+        # ``incr`` d'une clé absente : réponse normale du cache
+        raise
+    except Exception:
+        logger.warning('Cache de limitation indisponible, seaux locaux au processus', exc_info=True)
+        return getattr(_local, method)(*args, **kwargs)
+
+
+def _incr(key):
+    try:
+        _call('incr', key)
+    except ValueError:
+        if not _call('add', key, 1, timeout=None):
+            _call('incr', key)
+
+
+def _take(key, capacity, per_second, now):
+    """Prendre un jeton ; retourne 0 ou le nombre de secondes avant le prochain jeton."""
+    tokens, updated = _call('get', key) or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * per_second)
+    wait = 0 if tokens >= 1 else (1 - tokens) / per_second
+    if not wait:
+        tokens -= 1
+    # Un seau plein n'a pas besoin d'être conservé
+    _call('set', key, (tokens, now), timeout=math.ceil((capacity - tokens) / per_second) + 1)
+    return wait
+
+
+def check(scope, keys):
+    """
+    Consommer un jeton par clé de ``keys`` (les clés vides sont ignorées).
+
+    Retourne 0 si la requête est autorisée, sinon le délai (en secondes)
+    avant la prochaine tentative possible.
+    """
+    capacity, per_minute = limits()[scope]
+    now = time.time()
+    wait = max(
+        (_take(f'{KEY_PREFIX}:{scope}:{key}', capacity, per_minute / 60, now) for key in keys if key),
+        default=0,
+    )
+    _incr(f'{KEY_PREFIX}:stats:{scope}:{"rejected" if wait else "allowed"}')
+    return wait
+
+
+def get_stats():
+    """Compteurs de requêtes autorisées et refusées, par portée."""
+    return {
+        scope: {
+            'allowed': _call('get', f'{KEY_PREFIX}:stats:{scope}:allowed', 0),
+            'rejected': _call('get', f'{KEY_PREFIX}:stats:{scope}:rejected', 0),
+        }
+        for scope in limits()
+    }
+
+
+def client_ip(request):
+    """Adresse du client (``REMOTE_ADDR``, à faire renseigner par le proxy)."""
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def posted_username(request):
+    """Nom d'utilisateur saisi dans le formulaire, sans distinction de casse."""
+    username = request.POST.get('username', '').strip().lower()
+    if not username:
+        return None
+    # Empreinte : clé de cache valide quel que soit le texte saisi
+    return f'username:{hashlib.sha256(username.encode()).hexdigest()[:32]}'
+
+
+def user_key(request):
+    """Utilisateur connecté."""
+    return f'user:{request.user.pk}' if request.user.is_authenticated else None
+
+
+def rate_limit(scope, *keys, methods=('POST',)):
+    """
+    Décorateur limitant les requêtes ``methods`` d'une vue à
+    ``RATE_LIMITS[scope]``, pour chacune des clés calculées par ``keys``.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                wait = check(scope, [key(request) for key in keys])
+                if wait:
+                    response = render(request, 'home/too_many_requests.html', {
+                        'retry_after': math.ceil(wait),
+                    }, status=429)
+                    response['Retry-After'] = str(math.ceil(wait))
+                    return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
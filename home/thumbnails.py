@@ -0,0 +1,120 @@
+"""
+Miniatures des photos de profil.
+
+Les photos envoyées à l'inscription ou depuis le profil sont conservées
+telles quelles ; on en dérive des variantes de taille fixe, en WebP et en
+JPEG, sans métadonnées EXIF (l'orientation est appliquée aux pixels avant
+d'être retirée). Les variantes sont écrites dans le stockage des médias sous
+un nom déterministe calculé à partir du nom du fichier source : les
+régénérer écrase les mêmes fichiers et le template les retrouve sans
+requête en base.
+
+La génération se fait hors du cycle requête/réponse, dans la file de
+tâches (``home.tasks.generate_profile_thumbnails``, exécutée par
+``run_workers``). Tant qu'une variante n'existe pas, ``thumbnail_url``
+renvoie l'URL de l'image d'origine.
+"""
+
+import hashlib
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+THUMBNAIL_DIR = 'profiles/thumbnails'
+
+# Variante -> (largeur, hauteur). Les variantes carrées sont recadrées au centre.
+SIZES = {
+    'small': (64, 64),
+    'medium': (128, 128),
+    'large': (256, 256),
+}
+
+# Format -> (extension, options d'encodage Pillow)
+FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Refuser de décoder des images démesurées (bombe de décompression)
+MAX_SOURCE_PIXELS = 40_000_000
+
+
+def thumbnail_name(source_name, size, fmt='webp'):
+    """Nom (dans le stockage) de la variante ``size`` au format ``fmt`` de ``source_name``."""
+    digest = hashlib.sha256(source_name.encode()).hexdigest()[:16]
+    extension = FORMATS[fmt][0]
+    return posixpath.join(THUMBNAIL_DIR, digest[:2], f'{digest}-{size}.{extension}')
+
+
+def _prepare(image):
+    """Appliquer l'orientation EXIF et convertir en RGB (sans transparence)."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image.convert('RGBA'), mask=image.convert('RGBA').getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_variants(source):
+    """
+    Calculer toutes les variantes d'une image ouverte en lecture binaire.
+
+    Retourne un dict ``{(size, fmt): octets}``. Les images sont réencodées
+    à partir des pixels seuls : aucune métadonnée n'est recopiée.
+    """
+    with Image.open(source) as image:
+        if image.width * image.height > MAX_SOURCE_PIXELS:
+            raise ValueError(f'Image trop grande ({image.width}x{image.height})')
+        # Décodage réduit pour les JPEG : bien plus rapide sur les grandes photos
+        image.draft('RGB', max(SIZES.values()))
+        image = _prepare(image)
+
+    variants = {}
+    for size, dimensions in SIZES.items():
+        thumbnail = ImageOps.fit(image, dimensions, method=Image.Resampling.LANCZOS)
+        for fmt, (_extension, options) in FORMATS.items():
+            buffer = BytesIO()
+            thumbnail.save(buffer, **options)
+            variants[size, fmt] = buffer.getvalue()
+    return variants
+
+
+def generate_thumbnails(source_name, storage=None):
+    """Générer (ou régénérer) les miniatures de ``source_name``."""
+    storage = storage or default_storage
+    with storage.open(source_name, 'rb') as source:
+        variants = render_variants(source)
+    for (size, fmt), content in variants.items():
+        name = thumbnail_name(source_name, size, fmt)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(content))
+    return len(variants)
+
+
+def delete_thumbnails(source_name, storage=None):
+    """Supprimer les miniatures de ``source_name`` (image remplacée)."""
+    storage = storage or default_storage
+    for size in SIZES:
+        for fmt in FORMATS:
+            storage.delete(thumbnail_name(source_name, size, fmt))
+
+
+def thumbnail_url(image, size='medium', fmt='webp', storage=None):
+    """
+    URL de la variante demandée de ``image`` (un ``FieldFile``), ou de
+    l'image d'origine si la miniature n'a pas encore été générée.
+    """
+    if not image:
+        return ''
+    if size not in SIZES or fmt not in FORMATS:
+        raise ValueError(f'Variante inconnue: {size} / {fmt}')
+    storage = storage or default_storage
+    name = thumbnail_name(image.name, size, fmt)
+    if storage.exists(name):
+        return storage.url(name)
+    return image.url
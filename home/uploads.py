@@ -0,0 +1,150 @@
+"""
+Réception en flux des fichiers de profil (CV et photo).
+
+``HashingUploadHandler`` remplace les gestionnaires d'upload par défaut de
+Django (voir ``FILE_UPLOAD_HANDLERS``). Il écrit chaque morceau reçu une
+seule fois (en mémoire pour les petites requêtes, dans un fichier
+temporaire sinon) en calculant son SHA-256 au passage. Le condensat est
+attaché au fichier (``content_hash``) et réutilisé par
+``home.storage.ContentAddressedStorage`` pour ne pas relire le fichier.
+
+Pour les champs listés dans ``UPLOAD_RULES``, les limites sont vérifiées
+au fil de la réception :
+
+- l'extension dès l'en-tête de la partie, puis la signature du contenu
+  (octets magiques) dès le premier morceau : le reste du fichier est ignoré ;
+- la taille maximale dès qu'elle est dépassée : la lecture de la requête
+  est interrompue, le fichier n'est jamais lu en entier.
+
+Les refus sont notés dans ``request.upload_errors`` ; les vues les
+reportent sur leur formulaire avec ``add_upload_errors``.
+"""
+
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+from django.template.defaultfilters import filesizeformat
+
+MB = 1024 * 1024
+
+
+def _is_webp(head):
+    return head[:4] == b'RIFF' and head[8:12] == b'WEBP'
+
+
+# Extension -> test de la signature du début du fichier
+SIGNATURES = {
+    '.pdf': lambda head: head.startswith(b'%PDF-'),
+    '.doc': lambda head: head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'),
+    '.docx': lambda head: head.startswith(b'PK\x03\x04'),
+    '.odt': lambda head: head.startswith(b'PK\x03\x04'),
+    '.jpg': lambda head: head.startswith(b'\xff\xd8\xff'),
+    '.jpeg': lambda head: head.startswith(b'\xff\xd8\xff'),
+    '.png': lambda head: head.startswith(b'\x89PNG\r\n\x1a\n'),
+    '.gif': lambda head: head[:6] in (b'GIF87a', b'GIF89a'),
+    '.webp': _is_webp,
+}
+
+# Champ de formulaire -> (extensions acceptées, setting de taille maximale, valeur par défaut)
+UPLOAD_RULES = {
+    'cv': (('.pdf', '.doc', '.docx', '.odt'), 'PROFILE_CV_MAX_SIZE', 5 * MB),
+    'image': (('.jpg', '.jpeg', '.png', '.gif', '.webp'), 'PROFILE_IMAGE_MAX_SIZE', 5 * MB),
+}
+
+
+def get_rule(field_name):
+    """Retourner ``(extensions, taille maximale)`` pour ``field_name``, ou None."""
+    if field_name not in UPLOAD_RULES:
+        return None
+    extensions, setting, default = UPLOAD_RULES[field_name]
+    return extensions, getattr(settings, setting, default)
+
+
+def add_upload_errors(form, request):
+    """Reporter sur ``form`` les fichiers refusés à la réception ; True s'il y en a."""
+    errors = getattr(request, 'upload_errors', {})
+    for field, message in errors.items():
+        form.add_error(field if field in form.fields else None, message)
+    return bool(errors)
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Gestionnaire d'upload unique : stockage, SHA-256 et limites en un passage."""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.in_memory = False
+        self.errors = {}
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Même règle que MemoryFileUploadHandler : en mémoire si la requête est petite
+        self.in_memory = content_length <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        self.errors = {}
+        if self.request is not None:
+            self.request.upload_errors = self.errors
+
+    def reject(self, message, stop=False):
+        self.errors[self.field_name] = message
+        if stop:
+            # Ne pas lire la suite de la requête : le client reçoit la réponse tout de suite
+            raise StopUpload(connection_reset=True)
+        raise SkipFile()
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.hasher = hashlib.sha256()
+        self.rule = get_rule(field_name)
+        self.extension = os.path.splitext(file_name)[1].lower()
+        if self.rule:
+            extensions, max_size = self.rule
+            if self.extension not in extensions:
+                self.reject(f"Type de fichier non accepté (formats: {', '.join(extensions)}).")
+            if content_length and content_length > max_size:
+                self.reject(f'Fichier trop volumineux (maximum {filesizeformat(max_size)}).', stop=True)
+
+        if self.in_memory:
+            self.file = BytesIO()
+        else:
+            self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rule:
+            if start == 0 and not SIGNATURES[self.extension](raw_data[:16]):
+                self.reject("Le contenu du fichier ne correspond pas à son extension.")
+            if start + len(raw_data) > self.rule[1]:
+                self.reject(f'Fichier trop volumineux (maximum {filesizeformat(self.rule[1])}).', stop=True)
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        # Dernier gestionnaire de la chaîne : rien à transmettre
+        return None
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        if self.in_memory:
+            uploaded = InMemoryUploadedFile(
+                file=self.file,
+                field_name=self.field_name,
+                name=self.file_name,
+                content_type=self.content_type,
+                size=file_size,
+                charset=self.charset,
+                content_type_extra=self.content_type_extra,
+            )
+        else:
+            self.file.size = file_size
+            uploaded = self.file
+        uploaded.content_hash = self.hasher.hexdigest()
+        return uploaded
+
+    def upload_interrupted(self):
+        temporary_path = getattr(getattr(self, 'file', None), 'temporary_file_path', None)
+        if temporary_path:
+            try:
+                self.file.close()
+                os.remove(temporary_path())
+            except FileNotFoundError:
+                pass
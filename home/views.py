@@ -5,13 +5,16 @@ Ce module contient les vues pour gérer l'enregistrement, la connexion et
 la déconnexion des utilisateurs.
 """
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .forms import RegisterForm, LoginForm, ProfileUpdateForm
-from .decorators import logout_required
+from .decorators import login_required_custom, logout_required
 from .models import Profile
+from .throttling import client_ip, posted_username, rate_limit
+from .uploads import add_upload_errors
 
 
 def index(request):
@@ -23,6 +26,7 @@ def index(request):
 
 
 @logout_required
+@rate_limit('register', client_ip)
 def register(request):
     """
     Vue pour l'enregistrement d'un nouvel utilisateur.
@@ -34,6 +38,7 @@ def register(request):
     """
     if request.method == 'POST':
         form = RegisterForm(request.POST, request.FILES)
+        add_upload_errors(form, request)
         if form.is_valid():
             # Créer le nouvel utilisateur
             user = form.save()
@@ -54,6 +59,7 @@ def register(request):
 
 
 @logout_required
+@rate_limit('login', client_ip, posted_username)
 def login_view(request):
     """
     Vue pour la connexion d'un utilisateur existant.
@@ -61,7 +67,9 @@ def login_view(request):
     Méthode GET : Affiche le formulaire de connexion.
     Méthode POST : Authentifie l'utilisateur.
 
-    Les utilisateurs déjà connectés sont redirigés vers le board.
+    Les utilisateurs déjà connectés sont redirigés vers le board. Les
+    tentatives sont limitées par IP et par nom d'utilisateur avant tout
+    hachage de mot de passe (voir ``home.throttling``).
     """
     if request.method == 'POST':
         form = LoginForm(request.POST)
@@ -86,34 +94,45 @@ def login_view(request):
     return render(request, 'home/login.html', {'form': form})
 
 
-@login_required(login_url='home:login')
-def profile(request):
+@login_required_custom
+async def profile(request):
     """
     Vue du profil utilisateur.
 
     Affiche et met à jour les informations du compte connecté.
+
+    Vue async : l'affichage lit le profil avec l'ORM async, la mise à jour
+    (fichiers envoyés, stockage, tâches) reste synchrone.
     """
-    profile, _ = Profile.objects.get_or_create(
-        user=request.user,
-        defaults={
-            'user_type': Profile.USER_TYPE_APPLICANT,
-            'address': '',
-        }
-    )
+    # Chargé par ``login_required_custom`` (None si l'utilisateur n'en a pas)
+    profile = getattr(request.user, 'profile', None)
+    if profile is None:
+        profile, _ = await Profile.objects.aget_or_create(
+            user=request.user,
+            defaults={
+                'user_type': Profile.USER_TYPE_APPLICANT,
+                'address': '',
+            }
+        )
 
     if request.method == 'POST':
-        form = ProfileUpdateForm(request.POST, request.FILES, user=request.user, profile=profile)
-        if form.is_valid():
-            form.save()
-            messages.success(request, 'Votre profil a été mis à jour.')
-            return redirect('home:profile')
-        else:
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, f'{field}: {error}')
-    else:
-        form = ProfileUpdateForm(user=request.user, profile=profile)
+        return await sync_to_async(_update_profile)(request, profile)
+
+    form = ProfileUpdateForm(user=request.user, profile=profile)
+    return render(request, 'home/profile.html', {'form': form, 'profile': profile})
+
 
+def _update_profile(request, profile):
+    """Traiter le formulaire de profil envoyé en POST."""
+    form = ProfileUpdateForm(request.POST, request.FILES, user=request.user, profile=profile)
+    add_upload_errors(form, request)
+    if form.is_valid():
+        form.save()
+        messages.success(request, 'Votre profil a été mis à jour.')
+        return redirect('home:profile')
+    for field, errors in form.errors.items():
+        for error in errors:
+            messages.error(request, f'{field}: {error}')
     return render(request, 'home/profile.html', {'form': form, 'profile': profile})
 
 
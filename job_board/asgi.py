@@ -3,14 +3,22 @@ ASGI config for job_board project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serveur ASGI (voir README) : ``uvicorn job_board.asgi:application``. En
+DEBUG, les fichiers statiques sont servis comme par ``runserver``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_board.settings')
 
 application = get_asgi_application()
+
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
@@ -0,0 +1,226 @@
+"""
+Routage des lectures vers des réplicas en lecture seule.
+
+Les lectures des modèles de ``jobs`` et ``home`` partent vers un réplica
+tiré au hasard parmi ``DATABASE_REPLICAS`` ; les écritures, les migrations
+et les autres applications (sessions, auth, tasks) restent sur la base
+principale (``default``).
+
+Seules les requêtes HTTP sûres (GET, HEAD...) lisent les réplicas : les
+workers de tâches, les commandes et le shell lisent la base principale.
+
+Les réplicas sont en retard sur la base principale. Pour qu'un visiteur
+voie ses propres écritures (nouvelle offre, profil modifié), les lectures
+restent sur la base principale :
+
+- pendant toute requête non sûre (POST...) ;
+- pendant ``DATABASE_REPLICA_STICKY_SECONDS`` après une telle requête, grâce
+  au cookie posé par ``ReplicaStickinessMiddleware`` (la redirection après
+  ``create_offer`` lit donc la base principale) ;
+- dans un bloc ``transaction.atomic()`` sur la base principale, et pour
+  les objets liés à une instance lue sur la base principale ;
+- dans un bloc ``with use_primary():``.
+
+Un réplica injoignable est écarté pendant ``DATABASE_REPLICA_RETRY_SECONDS`` ;
+sans réplica disponible, tout est lu sur la base principale.
+
+Le middleware choisit un réplica au début de chaque requête sûre : toutes
+ses lectures voient le même état, et la vérification du réplica (qui
+ouvre une connexion) ne se fait pas dans la boucle d'événements d'une
+vue async. Le corps d'une réponse en streaming (API, export) est lu après
+le retour de la vue : le middleware enveloppe son itérateur pour que ces
+lectures restent sur le réplica choisi.
+"""
+
+import contextvars
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import FileResponse
+
+logger = logging.getLogger(__name__)
+
+ROUTED_APPS = frozenset({'jobs', 'home'})
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'TRACE'})
+STICKY_COOKIE = 'db_primary'
+
+# Réplica choisi à la première lecture
+ANY_REPLICA = '*'
+
+# None (base principale), ANY_REPLICA ou alias déjà choisi. Contextvar
+# plutôt que thread-local : suit aussi les vues async
+_read_database = contextvars.ContextVar('database_read_alias', default=None)
+
+# alias -> instant (time.monotonic) avant lequel le réplica n'est plus essayé
+_unavailable_until = {}
+
+
+def replicas():
+    """Alias des réplicas configurés."""
+    return [alias for alias in getattr(settings, 'DATABASE_REPLICAS', ()) if alias in connections]
+
+
+@contextmanager
+def _reading(alias):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def _read_each(iterator, alias):
+    """Itérer ``iterator`` en lisant sur ``alias`` à chaque morceau."""
+    iterator = iter(iterator)
+    while True:
+        # Contexte posé et retiré à chaque morceau : le serveur peut
+        # reprendre l'itération dans un autre thread ou une autre tâche
+        with _reading(alias):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+async def _aread_each(iterator, alias):
+    """Version async de ``_read_each``."""
+    iterator = aiter(iterator)
+    while True:
+        with _reading(alias):
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                return
+        yield chunk
+
+
+def use_replicas():
+    """Autoriser les lectures sur les réplicas dans ce bloc."""
+    return _reading(ANY_REPLICA)
+
+
+def use_primary():
+    """Lire sur la base principale dans ce bloc."""
+    return _reading(None)
+
+
+def replica_available(alias):
+    """Vérifier qu'un réplica répond (connexion ouverte ou ouvrable)."""
+    connection = connections[alias]
+    if connection.connection is not None:
+        return connection.is_usable()
+    # Ouvrir un fichier SQLite absent créerait une base vide
+    if connection.vendor == 'sqlite' and not connection.is_in_memory_db() \
+            and not os.path.exists(connection.settings_dict['NAME']):
+        return False
+    try:
+        connection.ensure_connection()
+    except DatabaseError:
+        return False
+    return True
+
+
+def choose_replica():
+    """Alias d'un réplica disponible, ou de la base principale à défaut."""
+    now = time.monotonic()
+    candidates = [alias for alias in replicas() if _unavailable_until.get(alias, 0) <= now]
+    random.shuffle(candidates)
+    for alias in candidates:
+        if replica_available(alias):
+            return alias
+        logger.warning('Réplica %s indisponible, lectures sur la base principale', alias)
+        _unavailable_until[alias] = now + getattr(settings, 'DATABASE_REPLICA_RETRY_SECONDS', 30)
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """Lectures de ``jobs`` et ``home`` sur les réplicas, écritures sur ``default``."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in ROUTED_APPS:
+            return None
+        alias = _read_database.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return choose_replica() if alias == ANY_REPLICA else alias
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in ROUTED_APPS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les réplicas contiennent les mêmes données que la base principale
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in getattr(settings, 'DATABASE_REPLICAS', ()):
+            # Schéma recopié depuis la base principale
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Lire sur la base principale pendant les requêtes d'écriture et peu après.
+
+    Le cookie ``STICKY_COOKIE`` n'est posé que si des réplicas sont configurés.
+    Middleware sync et async : sous ASGI, il n'impose pas de passage par un
+    thread aux vues async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        alias = choose_replica() if self.reads_replicas(request) else None
+        with _reading(alias):
+            response = self.get_response(request)
+        return self.process_response(request, response, alias)
+
+    async def __acall__(self, request):
+        alias = await sync_to_async(choose_replica)() if self.reads_replicas(request) else None
+        with _reading(alias):
+            response = await self.get_response(request)
+        return self.process_response(request, response, alias)
+
+    def reads_replicas(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+            and bool(replicas())
+        )
+
+    def process_response(self, request, response, alias=None):
+        if alias is not None and response.streaming and not isinstance(response, FileResponse):
+            # Le corps est lu après la sortie du bloc ``_reading`` ci-dessus ;
+            # un fichier ne lit pas la base et garde son envoi par sendfile
+            read_each = _aread_each if response.is_async else _read_each
+            response.streaming_content = read_each(response.streaming_content, alias)
+        if request.method not in SAFE_METHODS and replicas():
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
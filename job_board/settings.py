@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,14 +40,17 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'home',  # Ajouter l'app home pour que Django trouve les templates
     'jobs',  # Ajouter l'app home pour que Django trouve les templates
+    'tasks',  # File de tâches en arrière-plan (python manage.py run_workers)
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'job_board.routers.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # AuthenticationMiddleware + instantané en cache de l'utilisateur et de son profil
+    'home.middleware.SnapshotAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -75,13 +79,81 @@ WSGI_APPLICATION = 'job_board.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Réglages SQLite appliqués à chaque nouvelle connexion (``init_command``) :
+# - WAL : les lectures ne bloquent plus l'écriture et inversement ;
+# - synchronous=NORMAL : sûr en WAL (pas de corruption), fsync au checkpoint ;
+# - cache de pages (en Kio quand la valeur est négative) et mmap plus grands.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            # BEGIN IMMEDIATE : le verrou d'écriture est pris au début de la
+            # transaction, en attendant son tour, au lieu d'échouer avec
+            # « database is locked » en promouvant un verrou de lecture
+            'transaction_mode': 'IMMEDIATE',
+            # busy_timeout (secondes) : attente maximale du verrou d'écriture
+            'timeout': 20,
+        },
     }
 }
 
+# Réplicas en lecture (voir job_board.routers) : chemins de fichiers SQLite
+# séparés par des virgules, recopiés depuis la base principale par
+# ``python manage.py sync_replicas``. Non utilisés par les tests.
+DATABASE_REPLICAS = []
+for index, name in enumerate(filter(None, os.environ.get('JOB_BOARD_DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {**DATABASES['default'], 'NAME': BASE_DIR / name.strip()}
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['job_board.routers.ReplicaRouter']
+# Lectures sur la base principale pendant N secondes après une écriture
+DATABASE_REPLICA_STICKY_SECONDS = 10
+# Délai avant de réessayer un réplica injoignable
+DATABASE_REPLICA_RETRY_SECONDS = 30
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Cache mémoire local par défaut ; en production, utiliser un backend partagé
+# (Redis, Memcached) pour que tous les workers profitent des mêmes entrées.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'job-board',
+    }
+}
+
+
+# Sessions lues dans le cache (écrites aussi en base) : pas de requête par page.
+# 'django.contrib.sessions.backends.signed_cookies' évite aussi l'écriture en
+# base, mais les sessions ne peuvent plus être révoquées côté serveur.
+SESSION_ENGINE = os.environ.get('JOB_BOARD_SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+# Durée de vie (secondes) de l'instantané utilisateur + profil (home.middleware)
+HOME_USER_SNAPSHOT_TIMEOUT = 5 * 60
+
+
+# Limitation de débit (home.throttling) : portée -> (capacité du seau, jetons
+# rendus par minute), par IP, nom d'utilisateur saisi ou utilisateur connecté
+RATE_LIMITS = {
+    'login': (10, 5),
+    'register': (5, 1),
+    'create_offer': (20, 10),
+}
+# Cache partagé des seaux (un cache mémoire local prend le relais s'il tombe)
+RATE_LIMIT_CACHE = 'default'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,8 +197,48 @@ STATICFILES_DIRS = [
 # Media files (User uploads - images, CVs, etc.)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Réception des fichiers : un seul gestionnaire qui stocke, calcule le SHA-256
+# et applique les limites de home.uploads au fil de l'eau
+FILE_UPLOAD_HANDLERS = ['home.uploads.HashingUploadHandler']
+PROFILE_CV_MAX_SIZE = 5 * 1024 * 1024
+PROFILE_IMAGE_MAX_SIZE = 5 * 1024 * 1024
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Job board
+# Nombre d'offres affichées par page sur le board (surchargeable via ?size=)
+JOBS_PAGE_SIZE = 20
+JOBS_MAX_PAGE_SIZE = 100
+# Durée de vie (secondes) des fragments HTML des cartes d'offres
+JOBS_CARD_CACHE_TIMEOUT = 60 * 60
+# Cache de page partagé du board (secondes, 0 = désactivé). Les entrées sont
+# indexées par la version du board : elles deviennent caduques dès qu'une offre change.
+JOBS_BOARD_PAGE_CACHE_TIMEOUT = 0
+# Pagination de l'API JSON (/board/api/v1/offers/)
+JOBS_API_PAGE_SIZE = 50
+JOBS_API_MAX_PAGE_SIZE = 1000
+
+# Durée de publication (jours) d'une nouvelle offre, puis délai (jours) après
+# lequel une offre inactive quitte la table des offres pour les archives
+# (voir ``manage.py archive_offers``)
+JOBS_OFFER_LIFETIME_DAYS = 60
+JOBS_ARCHIVE_AFTER_DAYS = 90
+# Délai (jours) avant la purge des offres supprimées par les entreprises
+# (voir ``manage.py purge_offers``)
+JOBS_PURGE_AFTER_DAYS = 7
+
+# Délai (secondes) de regroupement des alertes de recherches enregistrées avant envoi
+JOBS_ALERT_BATCH_DELAY = 5 * 60
+
+# E-mails (alertes) : affichés dans la console en développement
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'job-board@localhost'
+
+# File de tâches (application tasks)
+# True : exécuter les tâches dans le processus appelant, sans worker
+TASKS_EAGER = False
+# Secondes après lesquelles une tâche « en cours » d'un worker disparu est remise en file
+TASKS_LOCK_TIMEOUT = 15 * 60
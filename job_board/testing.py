@@ -0,0 +1,72 @@
+"""
+Outils de test partagés entre les applications du projet.
+
+``assert_max_queries`` permet de fixer un budget de requêtes SQL à un bloc
+de code, pour détecter les régressions de type N+1 dans les vues.
+``temporary_database`` isole les commandes de mesure de la base courante.
+"""
+
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Levée quand un bloc exécute plus de requêtes que son budget."""
+
+
+@contextmanager
+def assert_max_queries(budget, using=DEFAULT_DB_ALIAS):
+    """
+    Vérifier qu'un bloc exécute au plus ``budget`` requêtes SQL.
+
+    En cas de dépassement, le message liste les requêtes exécutées.
+
+    Usage:
+        with assert_max_queries(5):
+            client.get('/board/')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > budget:
+        details = '\n'.join(
+            f'{index}. {query["sql"]}'
+            for index, query in enumerate(context.captured_queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f'{executed} requêtes exécutées pour un budget de {budget}:\n{details}'
+        )
+
+
+def count_queries(func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Exécuter ``func`` et retourner le nombre de requêtes SQL émises."""
+    with CaptureQueriesContext(connections[using]) as context:
+        func(*args, **kwargs)
+    return len(context.captured_queries)
+
+
+@contextmanager
+def temporary_database(using=DEFAULT_DB_ALIAS):
+    """
+    Basculer la connexion ``using`` sur une base de test (migrations
+    comprises), détruite à la sortie du bloc.
+
+    Sous SQLite, la base est un fichier temporaire plutôt qu'une base en
+    mémoire : WAL et connexions par thread comme en production.
+    """
+    connection = connections[using]
+    with tempfile.TemporaryDirectory() as directory:
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        previous_test_name = test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = previous_test_name
@@ -0,0 +1,258 @@
+"""
+Tests de la configuration du projet.
+
+Lancement:
+    python manage.py test job_board
+"""
+
+import copy
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.utils import load_backend
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from home.models import Profile
+from jobs.models import Offer
+from . import routers
+
+
+@contextmanager
+def write_transaction(connection):
+    """``transaction.atomic()`` pour une connexion créée hors de ``connections``."""
+    connection.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+    try:
+        with connection.cursor() as cursor:
+            yield cursor
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.set_autocommit(True)
+
+
+class SQLiteConcurrencyTests(SimpleTestCase):
+    """
+    Lecteurs et écrivains concurrents sur une vraie base SQLite (fichier).
+
+    La base de test de Django est en mémoire (pas de WAL) : chaque thread
+    ouvre sa propre connexion, configurée comme ``DATABASES['default']``
+    ou avec d'autres ``OPTIONS``, sur un fichier temporaire.
+    """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = str(Path(tmpdir.name) / 'stress.sqlite3')
+
+    def connect(self, options):
+        """Nouvelle connexion à la base de test avec ``options``."""
+        database = copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+        database.update(NAME=self.path, OPTIONS=options)
+        return load_backend(database['ENGINE']).DatabaseWrapper(database, alias='sqlite-stress')
+
+    def create_table(self, options):
+        connection = self.connect(options)
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER)')
+        return connection
+
+    def run_threads(self, options, targets):
+        """Lancer ``targets(connection)`` en parallèle ; retourne les erreurs levées."""
+        errors = []
+
+        def run(target):
+            connection = self.connect(options)
+            try:
+                target(connection)
+            except OperationalError as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def count(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*), MAX(value) FROM counter')
+            return cursor.fetchone()
+
+    def read_then_write(self, barrier):
+        """Lire puis écrire dans une même transaction (cas de ``get_or_create``)."""
+        def target(connection):
+            with write_transaction(connection) as cursor:
+                cursor.execute('SELECT COUNT(*) FROM counter')
+                try:
+                    # Faire se chevaucher les transactions ; en mode IMMEDIATE
+                    # la seconde attend au BEGIN et la barrière expire
+                    barrier.wait(timeout=0.5)
+                except threading.BrokenBarrierError:
+                    pass
+                cursor.execute('INSERT INTO counter (value) VALUES (1)')
+        return target
+
+    def test_pragmas_are_applied(self):
+        connection = self.create_table(settings.DATABASES[DEFAULT_DB_ALIAS]['OPTIONS'])
+        with connection.cursor() as cursor:
+            for pragma, expected in [('journal_mode', 'wal'), ('synchronous', 1), ('busy_timeout', 20000)]:
+                cursor.execute(f'PRAGMA {pragma}')
+                self.assertEqual(cursor.fetchone()[0], expected, pragma)
+        connection.close()
+
+    def test_default_sqlite_fails_on_overlapping_writes(self):
+        self.create_table({}).close()
+        barrier = threading.Barrier(2)
+        errors = self.run_threads({}, [self.read_then_write(barrier) for _ in range(2)])
+        self.assertTrue(errors)
+        self.assertIn('database is locked', str(errors[0]))
+
+    def test_immediate_transactions_serialize_writes(self):
+        options = settings.DATABASES[DEFAULT_DB_ALIAS]['OPTIONS']
+        connection = self.create_table(options)
+        barrier = threading.Barrier(2)
+        errors = self.run_threads(options, [self.read_then_write(barrier) for _ in range(2)])
+        self.assertEqual(errors, [])
+        self.assertEqual(self.count(connection), (2, 1))
+        connection.close()
+
+    def test_readers_are_not_blocked_by_writers(self):
+        options = settings.DATABASES[DEFAULT_DB_ALIAS]['OPTIONS']
+        connection = self.create_table(options)
+        writers, iterations, readers = 6, 30, 4
+        remaining = threading.Semaphore(0)
+        done = threading.Event()
+        read_latencies = []
+
+        def writer(connection):
+            try:
+                for _ in range(iterations):
+                    with write_transaction(connection) as cursor:
+                        cursor.execute('SELECT COALESCE(MAX(value), 0) FROM counter')
+                        cursor.execute('INSERT INTO counter (value) VALUES (%s)', [cursor.fetchone()[0] + 1])
+                        # Transaction d'écriture qui dure : les lecteurs doivent passer
+                        time.sleep(0.002)
+            finally:
+                remaining.release()
+
+        def reader(connection):
+            while not done.is_set():
+                started = time.perf_counter()
+                self.count(connection)
+                read_latencies.append(time.perf_counter() - started)
+
+        def supervisor(connection):
+            for _ in range(writers):
+                remaining.acquire()
+            done.set()
+
+        errors = self.run_threads(options, [writer] * writers + [reader] * readers + [supervisor])
+
+        self.assertEqual(errors, [])
+        # Écritures sérialisées : aucune perte, aucune valeur lue en double
+        self.assertEqual(self.count(connection), (writers * iterations, writers * iterations))
+        self.assertGreater(len(read_latencies), writers * iterations)
+        self.assertLess(max(read_latencies), 0.5)
+        connection.close()
+
+
+REPLICA = 'replica-test'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTests(TransactionTestCase):
+    """Base principale (base de test) et réplica SQLite recopié par ``sync_replicas``."""
+
+    # Le réplica est déclaré dans setUpClass, avant la résolution de '__all__'
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        database = copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+        database['NAME'] = str(Path(cls.tmpdir.name) / 'replica.sqlite3')
+        connections.settings[REPLICA] = database
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        routers._unavailable_until.clear()
+        self.company = User.objects.create_user(username='company', last_name='Tech Corp')
+        Profile.objects.create(user=self.company, user_type=Profile.USER_TYPE_COMPANY, address='Paris')
+        self.offer = Offer.objects.create(company=self.company, title='Développeur Python', description='API')
+        call_command('sync_replicas', stdout=StringIO())
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        Offer.objects.filter(pk=self.offer.pk).update(title='Titre modifié')
+        # Hors requête (workers, commandes) : base principale
+        self.assertEqual(Offer.objects.get(pk=self.offer.pk).title, 'Titre modifié')
+        with routers.use_replicas():
+            self.assertEqual(Offer.objects.all().db, REPLICA)
+            self.assertEqual(Offer.objects.get(pk=self.offer.pk).title, 'Développeur Python')
+            # Applications non routées : base principale
+            self.assertEqual(User.objects.all().db, DEFAULT_DB_ALIAS)
+            with routers.use_primary():
+                self.assertEqual(Offer.objects.get(pk=self.offer.pk).title, 'Titre modifié')
+            with transaction.atomic():
+                self.assertEqual(Offer.objects.get(pk=self.offer.pk).title, 'Titre modifié')
+
+    def test_redirect_after_post_reads_primary(self):
+        self.client.force_login(self.company)
+        response = self.client.post(reverse('jobs:create_offer'), {
+            'title': 'Data engineer', 'description': 'Spark', 'salary': '45000', 'active': 'on',
+        }, follow=True)
+        self.assertIn(routers.STICKY_COOKIE, self.client.cookies)
+        self.assertContains(response, 'Data engineer')
+
+        # Cookie expiré : retour au réplica, pas encore recopié
+        del self.client.cookies[routers.STICKY_COOKIE]
+        self.assertNotContains(self.client.get(reverse('jobs:index')), 'Data engineer')
+        call_command('sync_replicas', stdout=StringIO())
+        self.assertContains(self.client.get(reverse('jobs:index')), 'Data engineer')
+
+    def test_streamed_bodies_are_read_on_the_replica(self):
+        Offer.objects.filter(pk=self.offer.pk).update(title='Titre modifié')
+        admin = User.objects.create_user(username='admin', is_staff=True)
+        self.client.force_login(admin)
+        # Corps lus après le retour de la vue : toujours sur le réplica
+        for url, params in [(reverse('jobs:api_offer_list'), {}), (reverse('jobs:export_offers'), {'format': 'jsonl'})]:
+            body = b''.join(self.client.get(url, params).streaming_content)
+            self.assertNotIn(b'Titre modifi', body)
+            self.assertIn(b'Python', body)
+
+    async def test_async_streamed_body_is_read_on_the_replica(self):
+        await Offer.objects.filter(pk=self.offer.pk).aupdate(title='Titre modifié')
+        response = await self.async_client.get(reverse('jobs:api_offer_list'))
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertNotIn(b'Titre modifi', body)
+        self.assertIn(b'Python', body)
+
+    def test_falls_back_to_primary_when_replica_is_down(self):
+        connections[REPLICA].close()
+        os.remove(connections[REPLICA].settings_dict['NAME'])
+        with routers.use_replicas(), self.assertLogs('job_board.routers', 'WARNING'):
+            self.assertEqual(Offer.objects.all().db, DEFAULT_DB_ALIAS)
+            self.assertEqual(Offer.objects.get(pk=self.offer.pk).title, 'Développeur Python')
+        self.assertIn(REPLICA, routers._unavailable_until)
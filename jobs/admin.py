@@ -5,7 +5,11 @@ Permet aux administrateurs de gérer les offres d'emploi.
 """
 
 from django.contrib import admin
-from .models import Offer
+from django.db.models import BooleanField, Q, Value
+from django.http import StreamingHttpResponse
+from .export import FORMATS, stream_export
+from .models import Application, ArchivedOffer, FacetCount, JobAlert, Offer, SavedSearch, Skill
+from .search import search_filter
 
 
 @admin.register(Offer)
@@ -18,17 +22,20 @@ class OfferAdmin(admin.ModelAdmin):
     list_display = ('title', 'company', 'salary', 'active', 'publication_date')
     list_filter = ('active', 'publication_date', 'company')
     search_fields = ('title', 'description', 'company__user__username', 'company__user__email')
-    readonly_fields = ('publication_date',)
+    readonly_fields = ('publication_date', 'skill_tags')
+    # Charger l'entreprise avec la liste pour éviter une requête par ligne
+    list_select_related = ('company', 'company__profile')
+    actions = ('export_csv',)
 
     fieldsets = (
         ('Informations de base', {
             'fields': ('company', 'title', 'description')
         }),
         ('Détails', {
-            'fields': ('salary', 'skills', 'active')
+            'fields': ('salary', 'skills', 'skill_tags', 'active')
         }),
         ('Dates', {
-            'fields': ('publication_date',),
+            'fields': ('publication_date', 'expires_at', 'deleted_at'),
             'classes': ('collapse',)
         }),
     )
@@ -42,3 +49,102 @@ class OfferAdmin(admin.ModelAdmin):
             qs = qs.filter(company=request.user)
         return qs
 
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Utiliser l'index plein texte pour le titre et la description au lieu
+        de ``icontains`` ; l'entreprise reste recherchée par nom ou email.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        queryset = queryset.filter(
+            search_filter(search_term)
+            | Q(company__username__icontains=search_term)
+            | Q(company__email__icontains=search_term)
+        )
+        return queryset, False
+
+    @admin.action(description='Exporter en CSV')
+    def export_csv(self, request, queryset):
+        """Exporter les offres sélectionnées (en flux, voir ``jobs.export``)."""
+        response = StreamingHttpResponse(stream_export(queryset, 'csv'), content_type=FORMATS['csv'])
+        response['Content-Disposition'] = 'attachment; filename="offres.csv"'
+        return response
+
+
+@admin.register(ArchivedOffer)
+class ArchivedOfferAdmin(admin.ModelAdmin):
+    """Offres archivées par ``archive_offers``, en lecture seule."""
+    list_display = ('title', 'company', 'salary', 'publication_date', 'archived_at')
+    list_filter = ('publication_date', 'archived_at')
+    search_fields = ('title', 'company__username', 'company__last_name')
+    list_select_related = ('company',)
+    actions = ('export_csv',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if not request.user.is_superuser:
+            qs = qs.filter(company=request.user)
+        return qs
+
+    @admin.action(description='Exporter en CSV')
+    def export_csv(self, request, queryset):
+        """Même format que l'export des offres, ``active`` valant toujours faux."""
+        rows = queryset.annotate(active=Value(False, output_field=BooleanField()))
+        response = StreamingHttpResponse(stream_export(rows, 'csv'), content_type=FORMATS['csv'])
+        response['Content-Disposition'] = 'attachment; filename="offres-archivees.csv"'
+        return response
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    """Vocabulaire des compétences, alimenté automatiquement par les offres."""
+    list_display = ('name', 'key')
+    search_fields = ('key', 'name')
+
+
+@admin.register(Application)
+class ApplicationAdmin(admin.ModelAdmin):
+    """Candidatures, filtrables par statut."""
+    list_display = ('applicant', 'offer', 'archived_offer', 'company', 'status', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('applicant', 'offer', 'archived_offer', 'company')
+    raw_id_fields = ('applicant', 'offer', 'archived_offer', 'company')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    """Recherches enregistrées ; l'index des termes est maintenu par les signaux."""
+    list_display = ('name', 'user', 'query', 'salary_min', 'term_count', 'created_at')
+    list_select_related = ('user',)
+    search_fields = ('name', 'query', 'user__username')
+    readonly_fields = ('term_count',)
+
+
+@admin.register(JobAlert)
+class JobAlertAdmin(admin.ModelAdmin):
+    list_display = ('saved_search', 'offer', 'user', 'created_at', 'delivered_at')
+    list_select_related = ('saved_search', 'offer', 'user')
+    raw_id_fields = ('saved_search', 'offer', 'user')
+
+
+@admin.register(FacetCount)
+class FacetCountAdmin(admin.ModelAdmin):
+    """Compteurs de facettes, en lecture seule (maintenus par les signaux)."""
+    list_display = ('facet', 'label', 'value', 'count')
+    list_filter = ('facet',)
+    search_fields = ('label', 'value')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
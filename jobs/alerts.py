@@ -0,0 +1,140 @@
+"""
+Alertes sur recherches enregistrées.
+
+Chaque recherche enregistrée est décomposée en termes requis
+(``skill:<clé>`` pour une compétence, ``kw:<mot>`` pour un mot-clé
+normalisé comme dans ``jobs.search``) stockés dans l'index inversé
+``SavedSearchTerm``. Pour une nouvelle offre, on calcule ses propres termes
+et une seule requête retrouve les recherches dont *tous* les termes sont
+présents :
+
+    SELECT saved_search_id FROM savedsearchterm
+    WHERE term IN (<termes de l'offre>)
+    GROUP BY saved_search_id HAVING COUNT(*) = term_count
+
+Seules les entrées de l'index qui partagent un terme avec l'offre sont
+lues, jamais l'ensemble des recherches. Les mots-clés sont comparés mot
+entier (pas de recherche par préfixe comme sur le board).
+
+Le rapprochement tourne dans la file de tâches après la création d'une
+offre ; les alertes trouvées sont envoyées par lots, un e-mail par
+utilisateur (voir ``jobs.tasks``).
+"""
+
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count, F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import JobAlert, Offer, SavedSearch, SavedSearchTerm
+from .search import tokenize
+from .skills import canonical_skill_key
+
+KEYWORD_PREFIX = 'kw:'
+SKILL_PREFIX = 'skill:'
+
+# Au-delà, les derniers mots (dans l'ordre du texte) d'une description très
+# longue sont ignorés (limite du nombre de paramètres d'une requête SQLite)
+MAX_OFFER_TERMS = 900
+
+
+def search_terms(query, skills):
+    """Termes requis d'une recherche enregistrée."""
+    terms = {f'{KEYWORD_PREFIX}{word}' for word in tokenize(query or '')}
+    terms |= {f'{SKILL_PREFIX}{canonical_skill_key(skill)}' for skill in skills or [] if canonical_skill_key(skill)}
+    return terms
+
+
+def offer_terms(offer):
+    """Termes présents dans une offre (compétences, mots du titre et de la description)."""
+    terms = {f'{SKILL_PREFIX}{canonical_skill_key(skill)}' for skill in offer.skills or [] if canonical_skill_key(skill)}
+    words = dict.fromkeys(tokenize(f'{offer.title} {offer.description}'))
+    terms.update(f'{KEYWORD_PREFIX}{word}' for word in list(words)[:MAX_OFFER_TERMS - len(terms)])
+    return terms
+
+
+def index_saved_search(saved_search):
+    """(Ré)écrire les entrées de l'index inversé d'une recherche enregistrée."""
+    terms = search_terms(saved_search.query, saved_search.skills)
+    SavedSearchTerm.objects.filter(saved_search=saved_search).delete()
+    SavedSearchTerm.objects.bulk_create(
+        SavedSearchTerm(saved_search=saved_search, term=term) for term in terms
+    )
+    if saved_search.term_count != len(terms):
+        saved_search.term_count = len(terms)
+        SavedSearch.objects.filter(pk=saved_search.pk).update(term_count=len(terms))
+
+
+def matching_searches(offer):
+    """Recherches enregistrées auxquelles correspond ``offer``."""
+    complete = (
+        SavedSearchTerm.objects
+        .filter(term__in=offer_terms(offer))
+        .values('saved_search')
+        .annotate(matched=Count('id'))
+        .filter(matched=F('saved_search__term_count'))
+        .values('saved_search')
+    )
+    # Sans terme, seul le salaire minimum filtre (voir ``SavedSearchForm.clean``)
+    searches = SavedSearch.objects.filter(Q(id__in=complete) | Q(term_count=0, salary_min__isnull=False))
+    if offer.salary is None:
+        searches = searches.filter(salary_min__isnull=True)
+    else:
+        searches = searches.filter(Q(salary_min__isnull=True) | Q(salary_min__lte=offer.salary))
+    # Une entreprise n'est pas alertée de ses propres offres
+    return searches.exclude(user_id=offer.company_id)
+
+
+def match_offers(offer_ids):
+    """Créer les alertes des offres actives ``offer_ids`` ; retourne leur nombre."""
+    created = 0
+    for offer in Offer.objects.filter(id__in=offer_ids, active=True):
+        alerts = [
+            JobAlert(saved_search_id=search_id, offer=offer, user_id=user_id)
+            for search_id, user_id in matching_searches(offer).values_list('id', 'user_id')
+        ]
+        created += len(JobAlert.objects.bulk_create(alerts, ignore_conflicts=True))
+    return created
+
+
+def deliver_alerts(batch_size=500):
+    """
+    Envoyer les alertes en attente : un e-mail par utilisateur, sur une
+    seule connexion SMTP par lot de ``batch_size`` alertes.
+
+    Retourne le nombre d'e-mails envoyés.
+    """
+    sent = 0
+    while True:
+        pending = list(
+            JobAlert.objects
+            .filter(delivered_at__isnull=True, offer__active=True)
+            .select_related('user', 'offer', 'saved_search')
+            .order_by('user_id', 'id')[:batch_size]
+        )
+        if not pending:
+            break
+        messages = []
+        for user, alerts in groupby(pending, key=lambda alert: alert.user):
+            alerts = list(alerts)
+            if not user.email:
+                continue
+            messages.append(EmailMessage(
+                subject=f'{len(alerts)} nouvelle(s) offre(s) pour vos alertes',
+                body=render_to_string('jobs/emails/job_alerts.txt', {'user': user, 'alerts': alerts}),
+                to=[user.email],
+            ))
+        get_connection().send_messages(messages)
+        JobAlert.objects.filter(id__in=[alert.id for alert in pending]).update(delivered_at=timezone.now())
+        sent += len(messages)
+        if len(pending) < batch_size:
+            break
+    return sent
+
+
+def alert_batch_delay():
+    """Délai (secondes) pendant lequel les alertes s'accumulent avant un envoi groupé."""
+    return getattr(settings, 'JOBS_ALERT_BATCH_DELAY', 300)
@@ -0,0 +1,262 @@
+"""
+API JSON en lecture seule pour les offres d'emploi (version 1).
+
+Routes (préfixe ``/board/api/v1/``):
+    offers/            liste paginée par curseur
+    offers/<id>/       détail d'une offre
+
+Paramètres de la liste:
+    after / before     curseurs de pagination (``next_cursor`` / ``previous_cursor``)
+    size               taille de page (``JOBS_API_PAGE_SIZE``, max ``JOBS_API_MAX_PAGE_SIZE``)
+    fields             champs à renvoyer, séparés par des virgules (ex: ``id,title``)
+    active             ``true`` (défaut), ``false`` ou ``all``
+    skills, skills_mode, company, q    comme sur le board (voir ``jobs.filters``)
+    salary_min, salary_max             bornes du salaire
+
+Les lignes sont lues avec ``.values()`` (pas d'instances de modèles) et la
+page est envoyée en streaming au fil de la lecture de la base. Les vues
+sont async : sous ASGI, la lecture passe par l'ORM async (``aiterator``).
+"""
+
+import json
+from decimal import Decimal, InvalidOperation
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .filters import filter_offers
+from .models import Offer
+from .pagination import KeysetPaginator, InvalidCursor, get_page_size
+
+API_VERSION = 'v1'
+
+# Champ exposé -> champ lu en base
+FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'salary': 'salary',
+    'skills': 'skills',
+    'company_id': 'company_id',
+    'company': 'company__last_name',
+    'publication_date': 'publication_date',
+    'updated_at': 'updated_at',
+    'active': 'active',
+}
+
+# Nombre de lignes lues par aller-retour avec la base pendant le streaming
+CHUNK_SIZE = 200
+
+
+class BadRequest(ValueError):
+    """Paramètre invalide, renvoyé au client avec un statut 400."""
+
+
+def _error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def parse_fields(value):
+    """Valider ``?fields=`` et retourner la liste des champs exposés."""
+    if not value:
+        return list(FIELDS)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        raise BadRequest(f"Champs inconnus: {', '.join(unknown)}")
+    return fields
+
+
+def _decimal_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise BadRequest(f"Paramètre '{name}' invalide")
+
+
+def filtered_offers(params):
+    """Appliquer les filtres de l'API ; retourne ``(queryset, ordering)``."""
+    offers = Offer.objects.live()
+    active = params.get('active', 'true')
+    if active == 'true':
+        offers = offers.filter(active=True)
+    elif active == 'false':
+        offers = offers.filter(active=False)
+    elif active != 'all':
+        raise BadRequest("Paramètre 'active' invalide (true, false ou all)")
+
+    salary_min = _decimal_param(params, 'salary_min')
+    if salary_min is not None:
+        offers = offers.filter(salary__gte=salary_min)
+    salary_max = _decimal_param(params, 'salary_max')
+    if salary_max is not None:
+        offers = offers.filter(salary__lte=salary_max)
+
+    return filter_offers(offers, params)
+
+
+def serialize(row, fields):
+    return json.dumps({field: row[FIELDS[field]] for field in fields}, cls=DjangoJSONEncoder)
+
+
+def _page_url(request, **params):
+    query = request.GET.copy()
+    for key, value in params.items():
+        query.pop(key, None)
+        if value is not None:
+            query[key] = value
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+class _PageWriter:
+    """
+    Morceaux du document JSON d'une page, partagés par ``stream_page`` et
+    ``astream_page``.
+
+    Les curseurs ne sont connus qu'après la dernière ligne : ils sont donc
+    écrits à la fin de l'objet, après ``results``.
+    """
+
+    def __init__(self, request, paginator, fields, after=None, before=None):
+        self.request = request
+        self.paginator = paginator
+        self.fields = fields
+        self.after, self.before = after, before
+        columns = list(dict.fromkeys([FIELDS[field] for field in fields] + paginator.fields))
+        if before:
+            # Lecture en ordre inverse : la page doit être retournée avant d'être écrite
+            self.source = KeysetPaginator(
+                paginator.queryset.values(*columns), paginator.ordering, paginator.page_size,
+            )
+        else:
+            self.source = paginator.get_queryset(after=after)[:paginator.page_size + 1].values(*columns)
+        self.count, self.first, self.last = 0, None, None
+        self.next_cursor = self.previous_cursor = None
+
+    def rows_of(self, page):
+        """Lignes d'une page lue en ordre inverse, dont les curseurs sont déjà connus."""
+        self.next_cursor, self.previous_cursor = page.next_cursor, page.previous_cursor
+        return page.object_list
+
+    def head(self):
+        return '{"version": "%s", "results": [' % API_VERSION
+
+    def write(self, row):
+        """Morceau JSON de ``row``, ou None pour la ligne sentinelle."""
+        if self.count == self.paginator.page_size:
+            # Ligne sentinelle : il existe une page suivante
+            self.next_cursor = self.paginator.cursor_for(self.last)
+            return None
+        chunk = (',' if self.count else '') + serialize(row, self.fields)
+        self.first = self.first or row
+        self.last = row
+        self.count += 1
+        return chunk
+
+    def tail(self):
+        if not self.before and self.after and self.first:
+            self.previous_cursor = self.paginator.cursor_for(self.first)
+        # Fin de l'objet : on réutilise json.dumps en retirant son accolade ouvrante
+        return '], ' + json.dumps({
+            'count': self.count,
+            'next_cursor': self.next_cursor,
+            'previous_cursor': self.previous_cursor,
+            'next': _page_url(self.request, after=self.next_cursor, before=None) if self.next_cursor else None,
+            'previous': (
+                _page_url(self.request, before=self.previous_cursor, after=None) if self.previous_cursor else None
+            ),
+        })[1:]
+
+
+def stream_page(request, paginator, fields, after=None, before=None):
+    """Générer le document JSON d'une page morceau par morceau."""
+    writer = _PageWriter(request, paginator, fields, after=after, before=before)
+    if before:
+        rows = writer.rows_of(writer.source.get_page(before=before))
+    else:
+        rows = writer.source.iterator(chunk_size=CHUNK_SIZE)
+    yield writer.head()
+    for row in rows:
+        chunk = writer.write(row)
+        if chunk is None:
+            break
+        yield chunk
+    yield writer.tail()
+
+
+async def astream_page(request, paginator, fields, after=None, before=None):
+    """
+    Version async de ``stream_page`` (lecture avec ``aiterator``), servie
+    par un serveur ASGI sans occuper de thread pendant l'envoi.
+    """
+    writer = _PageWriter(request, paginator, fields, after=after, before=before)
+    yield writer.head()
+    if before:
+        for row in writer.rows_of(await writer.source.aget_page(before=before)):
+            yield writer.write(row)
+    else:
+        async for row in writer.source.aiterator(chunk_size=CHUNK_SIZE):
+            chunk = writer.write(row)
+            if chunk is None:
+                break
+            yield chunk
+    yield writer.tail()
+
+
+@require_GET
+async def offer_list(request):
+    """
+    Liste paginée des offres, envoyée en streaming.
+
+    Sous ASGI le corps est un générateur async (``astream_page``) ; sous
+    WSGI un générateur classique, que le serveur sait envoyer sans le
+    charger en mémoire.
+    """
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+        # La recherche plein texte inspecte le schéma au premier appel
+        offers, ordering = await sync_to_async(filtered_offers)(request.GET)
+    except BadRequest as exc:
+        return _error(str(exc))
+
+    page_size = get_page_size(
+        request,
+        default=getattr(settings, 'JOBS_API_PAGE_SIZE', 50),
+        maximum=getattr(settings, 'JOBS_API_MAX_PAGE_SIZE', 1000),
+    )
+    paginator = KeysetPaginator(offers, ordering=ordering, page_size=page_size)
+    after, before = request.GET.get('after'), request.GET.get('before')
+    try:
+        # Valider les curseurs avant de commencer à envoyer la réponse
+        paginator.get_queryset(after=after, before=before)
+    except InvalidCursor:
+        return _error('Curseur invalide')
+
+    stream = astream_page if isinstance(request, ASGIRequest) else stream_page
+    return StreamingHttpResponse(
+        stream(request, paginator, fields, after=after, before=before),
+        content_type='application/json',
+    )
+
+
+@require_GET
+async def offer_detail(request, offer_id):
+    """Détail d'une offre (active ou non)."""
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+    except BadRequest as exc:
+        return _error(str(exc))
+    row = await Offer.objects.live().filter(pk=offer_id).values(*{FIELDS[field] for field in fields}).afirst()
+    if row is None:
+        return _error('Offre introuvable', status=404)
+    return JsonResponse(
+        {field: row[FIELDS[field]] for field in fields},
+        encoder=DjangoJSONEncoder,
+    )
@@ -0,0 +1,43 @@
+"""
+Candidatures aux offres.
+
+L'envoi est idempotent : la contrainte unique ``(applicant, offer)``
+garantit qu'un double clic ou un renvoi du formulaire ne crée jamais deux
+candidatures, même avec deux requêtes simultanées.
+"""
+
+from . import board
+from .models import Application
+
+
+def submit_application(applicant, offer):
+    """
+    Enregistrer la candidature de ``applicant`` à ``offer``.
+
+    Retourne ``(application, created)`` ; une candidature existante est
+    retournée telle quelle. Le CV du profil est figé au moment de l'envoi.
+    """
+    profile = getattr(applicant, 'profile', None)
+    application, created = Application.objects.get_or_create(
+        applicant=applicant,
+        offer=offer,
+        defaults={
+            'company_id': offer.company_id,
+            'cv': profile.cv.name if profile and profile.cv else '',
+        },
+    )
+    if created:
+        # Le bouton « Postuler » de ce visiteur change : son ETag du board aussi
+        board.bump_user_generation(applicant.id)
+    return application, created
+
+
+def applied_offer_ids(user, offer_ids):
+    """Ids, parmi ``offer_ids``, des offres auxquelles ``user`` a déjà postulé."""
+    if not offer_ids:
+        return set()
+    return set(
+        Application.objects
+        .filter(applicant=user, offer_id__in=offer_ids)
+        .values_list('offer_id', flat=True)
+    )
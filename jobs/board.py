@@ -0,0 +1,208 @@
+"""
+Fraîcheur et cache de page du board.
+
+La « version du board » (``BoardVersion``, une ligne lue par sa clé) est
+incrémentée par tout ce qui peut changer son contenu : enregistrement ou
+suppression d'une offre, changement de nom ou de profil d'une entreprise
+(voir ``jobs.signals``) et opérations en masse qui contournent les
+signaux (``jobs.lifecycle``, ``import_offers``), qui appellent
+``bump_generation``. Les suppressions en masse passent par ``bump_once`` :
+la ligne n'est mise à jour qu'une fois, et non une fois par offre. Elle
+sert à :
+
+- répondre ``304 Not Modified`` aux GET conditionnels (ETag et
+  Last-Modified) sans rien rendre ;
+- indexer un cache de page optionnel (``JOBS_BOARD_PAGE_CACHE_TIMEOUT``)
+  partagé entre visiteurs du même type de profil. Seules les parties
+  communes y sont stockées (cartes, curseurs, facettes) ; les actions
+  propres au visiteur sont ajoutées à chaque affichage.
+
+Le board est une vue async : ``async_board_state`` calcule l'état avant
+``@condition``, qui appelle ``board_etag`` sans ``await``.
+"""
+
+import contextvars
+import hashlib
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BoardVersion
+
+USER_GENERATION_KEY = 'board:user-generation:{}'
+PAGE_KEY_PREFIX = 'board-page'
+
+# Dans un bloc ``bump_once`` : liste marquée par ``bump_generation``
+_pending_bump = contextvars.ContextVar('board_pending_bump', default=None)
+
+
+def _seed():
+    # Une génération évincée du cache repart d'une valeur jamais utilisée :
+    # un ancien ETag ne peut pas redevenir valide
+    return time.time_ns()
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, _seed(), timeout=None):
+            cache.incr(key)
+
+
+def _generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _seed(), timeout=None)
+        generation = cache.get(key, _seed())
+    return generation
+
+
+def bump_generation():
+    """
+    Invalider la version du board (et donc le cache de page).
+
+    À appeler dans la transaction de la modification : la nouvelle version
+    est visible en même temps que les données.
+    """
+    pending = _pending_bump.get()
+    if pending is not None:
+        pending.append(True)
+        return
+    now = timezone.now()
+    bumped = BoardVersion.objects.filter(pk=BoardVersion.SINGLETON_ID).update(
+        generation=F('generation') + 1, changed_at=now,
+    )
+    if not bumped:
+        BoardVersion.objects.update_or_create(
+            pk=BoardVersion.SINGLETON_ID, defaults={'changed_at': now},
+        )
+
+
+@contextmanager
+def bump_once():
+    """
+    Regrouper les ``bump_generation`` du bloc (receivers de ``post_save``
+    et ``post_delete`` d'une opération en masse) en un seul, à la sortie.
+
+    Usage:
+        with board.bump_once():
+            Offer.objects.filter(pk__in=ids).delete()
+    """
+    if _pending_bump.get() is not None:
+        yield
+        return
+    pending = []
+    token = _pending_bump.set(pending)
+    try:
+        yield
+    finally:
+        _pending_bump.reset(token)
+    if pending:
+        bump_generation()
+
+
+def bump_user_generation(user_id):
+    """Invalider l'ETag du board d'un seul visiteur (ses actions ont changé)."""
+    _incr(USER_GENERATION_KEY.format(user_id))
+
+
+def board_version():
+    """Retourner ``(génération, date de la dernière modification)``."""
+    version = (
+        BoardVersion.objects.filter(pk=BoardVersion.SINGLETON_ID)
+        .values_list('generation', 'changed_at').first()
+    )
+    return version or (0, None)
+
+
+def _user_type(request):
+    profile = getattr(request.user, 'profile', None)
+    return profile.user_type if profile else ''
+
+
+def get_board_state(request):
+    """
+    Calculer (une fois par requête) la version du board et l'ETag associé.
+
+    L'ETag dépend aussi du visiteur (et de sa génération, voir
+    ``bump_user_generation``), de son jeton CSRF et des paramètres GET. Il vaut None quand des messages flash attendent d'être affichés :
+    la réponse doit alors être rendue en entier.
+    """
+    if not hasattr(request, '_board_state'):
+        generation, last_modified = board_version()
+        version = f'{generation}:{last_modified.isoformat() if last_modified else ""}'
+        etag = None
+        if not len(get_messages(request)):
+            signature = '|'.join([
+                version,
+                str(request.user.pk),
+                str(_generation(USER_GENERATION_KEY.format(request.user.pk))),
+                request.META.get('CSRF_COOKIE', ''),
+                request.GET.urlencode(),
+            ])
+            etag = hashlib.sha256(signature.encode()).hexdigest()[:32]
+        request._board_state = {
+            'version': version,
+            'last_modified': last_modified if etag else None,
+            'etag': etag,
+        }
+    return request._board_state
+
+
+def async_board_state(view_func):
+    """
+    Décorateur d'une vue async protégée par ``@condition(board_etag...)``.
+
+    ``condition`` appelle ``etag_func`` de façon synchrone, même autour
+    d'une vue async : l'état est calculé ici, hors de la boucle
+    d'événements, et ``board_etag`` le relit depuis la requête.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        await sync_to_async(get_board_state)(request)
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def board_etag(request, *args, **kwargs):
+    return get_board_state(request)['etag']
+
+
+def board_last_modified(request, *args, **kwargs):
+    return get_board_state(request)['last_modified']
+
+
+def page_timeout():
+    return getattr(settings, 'JOBS_BOARD_PAGE_CACHE_TIMEOUT', 0)
+
+
+def _page_key(request):
+    signature = '|'.join([
+        get_board_state(request)['version'],
+        _user_type(request),
+        '&'.join(sorted(request.GET.urlencode().split('&'))),
+    ])
+    return f'{PAGE_KEY_PREFIX}:{hashlib.sha256(signature.encode()).hexdigest()}'
+
+
+async def aget_cached_page(request):
+    """
+    Retourner les données de page en cache, ou None (cache désactivé ou
+    absent). L'état du board doit déjà être calculé (``async_board_state``).
+    """
+    if not page_timeout():
+        return None
+    return await cache.aget(_page_key(request))
+
+
+async def aset_cached_page(request, data):
+    if page_timeout():
+        await cache.aset(_page_key(request), data, timeout=page_timeout())
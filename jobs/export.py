@@ -0,0 +1,72 @@
+"""
+Export des offres en CSV ou JSONL, en flux.
+
+Les lignes sont lues avec ``.values().iterator(chunk_size=...)`` et écrites
+au fil de l'eau : la mémoire utilisée ne dépend que de ``chunk_size`` et le
+premier octet part dès le premier lot lu, quel que soit le nombre d'offres.
+
+Les colonnes reprennent celles attendues par la commande ``import_offers``
+(``company`` est le nom d'utilisateur de l'entreprise, ``skills`` une liste
+séparée par des virgules en CSV), un export peut donc être réimporté tel quel.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+
+# Colonne exportée -> champ lu en base
+COLUMNS = {
+    'id': 'id',
+    'company': 'company__username',
+    'company_name': 'company__last_name',
+    'title': 'title',
+    'description': 'description',
+    'salary': 'salary',
+    'skills': 'skills',
+    'active': 'active',
+    'publication_date': 'publication_date',
+    'updated_at': 'updated_at',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """Pseudo-fichier dont ``write`` renvoie la ligne au lieu de la stocker."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Itérer sur les lignes à exporter (dicts indexés par colonne exportée)."""
+    rows = queryset.order_by('id').values(*COLUMNS.values()).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield {column: row[field] for column, field in COLUMNS.items()}
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(list(COLUMNS))
+    for row in rows:
+        row['skills'] = ', '.join(row['skills'] or [])
+        yield writer.writerow(row.values())
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def stream_export(queryset, fmt='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Générer le contenu de l'export de ``queryset`` au format ``fmt``."""
+    if fmt not in FORMATS:
+        raise ValueError(f'Format inconnu: {fmt}')
+    rows = export_rows(queryset, chunk_size=chunk_size)
+    return iter_jsonl(rows) if fmt == 'jsonl' else iter_csv(rows)
@@ -0,0 +1,212 @@
+"""
+Facettes du board : tranches de salaire, compétences, entreprises et mois
+de publication, avec le nombre d'offres actives pour chaque valeur.
+
+Les compteurs sont stockés dans ``FacetCount`` et ajustés de +1/-1 quand
+une offre active est créée, modifiée, désactivée ou supprimée. Afficher
+les facettes coûte donc quelques lectures indexées, indépendamment du
+nombre d'offres. ``rebuild_facets()`` recalcule tout depuis zéro (commande
+``manage.py rebuild_facets``).
+"""
+
+from collections import Counter
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import FacetCount, Offer
+from .skills import canonical_skill_key
+
+# (valeur, borne basse incluse, borne haute exclue, libellé)
+SALARY_BANDS = [
+    ('0-30000', None, 30000, 'Moins de 30 k€'),
+    ('30000-45000', 30000, 45000, '30 à 45 k€'),
+    ('45000-60000', 45000, 60000, '45 à 60 k€'),
+    ('60000-', 60000, None, 'Plus de 60 k€'),
+]
+
+# Champs à lire pour calculer les facettes d'une offre via ``.values()``
+FACET_FIELDS = ('salary', 'skills', 'company_id', 'company__last_name', 'company__username', 'publication_date')
+
+TOP_LIMIT = 10
+MONTH_LIMIT = 12
+
+
+def salary_band(salary):
+    """Retourner la tranche ``(valeur, libellé)`` d'un salaire, ou None."""
+    if salary is None:
+        return None
+    for value, low, high, label in SALARY_BANDS:
+        if (low is None or salary >= low) and (high is None or salary < high):
+            return value, label
+    return None
+
+
+def salary_band_bounds(value):
+    """Bornes ``(basse, haute)`` d'une tranche, ou None si inconnue."""
+    for band, low, high, _label in SALARY_BANDS:
+        if band == value:
+            return low, high
+    return None
+
+
+def month_bounds(value):
+    """Bornes ``[début, fin[`` (aware) du mois ``'AAAA-MM'``, ou None."""
+    try:
+        start = datetime.strptime(value, '%Y-%m')
+    except (TypeError, ValueError):
+        return None
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def offer_values(offer):
+    """Extraire d'une instance les champs utilisés par les facettes."""
+    return {
+        'salary': offer.salary,
+        'skills': offer.skills,
+        'company_id': offer.company_id,
+        'company__last_name': offer.company.last_name,
+        'company__username': offer.company.username,
+        'publication_date': offer.publication_date,
+    }
+
+
+def facet_entries(values):
+    """
+    Lister les ``(facette, valeur, libellé)`` auxquels une offre contribue.
+
+    ``values`` est un dict de ``FACET_FIELDS`` (voir ``offer_values``).
+    """
+    entries = set()
+    band = salary_band(values['salary'])
+    if band:
+        entries.add((FacetCount.FACET_SALARY, *band))
+    for name in values['skills'] or []:
+        key = canonical_skill_key(name)
+        if key:
+            entries.add((FacetCount.FACET_SKILL, key, ' '.join(str(name).split())))
+    company_label = values['company__last_name'] or values['company__username']
+    entries.add((FacetCount.FACET_COMPANY, str(values['company_id']), company_label))
+    if values['publication_date']:
+        published = timezone.localtime(values['publication_date'])
+        entries.add((FacetCount.FACET_MONTH, published.strftime('%Y-%m'), published.strftime('%m/%Y')))
+    return entries
+
+
+def _bump(facet, value, label, delta):
+    """Ajouter ``delta`` au compteur, en créant la ligne au besoin."""
+    updated = FacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+    if updated or delta <= 0:
+        return
+    try:
+        with transaction.atomic():
+            FacetCount.objects.create(facet=facet, value=value, label=label, count=delta)
+    except IntegrityError:
+        # Créée entre-temps par une autre requête
+        FacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def _entries_by_key(values):
+    return {(facet, value): label for facet, value, label in facet_entries(values)}
+
+
+def apply_deltas(deltas, labels):
+    """
+    Appliquer un ``Counter`` ``(facette, valeur) -> delta``.
+
+    ``labels`` donne le libellé à utiliser si la ligne doit être créée.
+    """
+    for (facet, value), delta in deltas.items():
+        if delta:
+            _bump(facet, value, labels[facet, value], delta)
+
+
+def count_offers(rows, sign=1):
+    """
+    Ajuster les compteurs pour des offres actives ajoutées (``sign=1``) ou
+    retirées (``sign=-1``) en masse. ``rows`` sont des dicts de
+    ``FACET_FIELDS`` ; une seule requête par valeur de facette distincte.
+    """
+    deltas, labels = Counter(), {}
+    for values in rows:
+        entries = _entries_by_key(values)
+        labels.update(entries)
+        for key in entries:
+            deltas[key] += sign
+    apply_deltas(deltas, labels)
+
+
+def offer_changed(old_values, new_values):
+    """
+    Ajuster les compteurs après la modification d'une offre.
+
+    ``old_values``/``new_values`` valent None si l'offre n'était pas (ou
+    plus) active : création, suppression et (dés)activation sont ainsi des
+    cas particuliers du même calcul.
+    """
+    old = _entries_by_key(old_values) if old_values else {}
+    new = _entries_by_key(new_values) if new_values else {}
+    deltas = Counter()
+    for key in old.keys() - new.keys():
+        deltas[key] -= 1
+    for key in new.keys() - old.keys():
+        deltas[key] += 1
+    apply_deltas(deltas, {**old, **new})
+
+
+def rebuild_facets():
+    """Recalculer tous les compteurs depuis les offres actives."""
+    deltas, labels = Counter(), {}
+    rows = Offer.objects.active().values(*FACET_FIELDS).iterator(chunk_size=2000)
+    for values in rows:
+        entries = _entries_by_key(values)
+        labels.update(entries)
+        for key in entries:
+            deltas[key] += 1
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(
+            [
+                FacetCount(facet=facet, value=value, label=labels[facet, value], count=count)
+                for (facet, value), count in deltas.items()
+            ],
+            batch_size=1000,
+        )
+
+
+def _facet_querysets(limit):
+    visible = FacetCount.objects.filter(count__gt=0)
+    return {
+        FacetCount.FACET_SALARY: visible.filter(facet=FacetCount.FACET_SALARY),
+        FacetCount.FACET_SKILL: visible.filter(facet=FacetCount.FACET_SKILL).order_by('-count', 'value')[:limit],
+        FacetCount.FACET_COMPANY: visible.filter(facet=FacetCount.FACET_COMPANY).order_by('-count', 'value')[:limit],
+        FacetCount.FACET_MONTH: visible.filter(facet=FacetCount.FACET_MONTH).order_by('-value')[:MONTH_LIMIT],
+    }
+
+
+def _sort_salary_bands(facets):
+    band_order = [value for value, _low, _high, _label in SALARY_BANDS]
+    facets[FacetCount.FACET_SALARY].sort(
+        key=lambda facet: band_order.index(facet.value) if facet.value in band_order else len(band_order),
+    )
+    return facets
+
+
+def get_facets(limit=TOP_LIMIT):
+    """
+    Retourner les facettes à afficher, sous forme de dict
+    ``{facette: [FacetCount, ...]}``. Une requête indexée par facette.
+    """
+    return _sort_salary_bands({
+        facet: list(queryset) for facet, queryset in _facet_querysets(limit).items()
+    })
+
+
+async def aget_facets(limit=TOP_LIMIT):
+    """Version async de ``get_facets``."""
+    return _sort_salary_bands({
+        facet: [row async for row in queryset] for facet, queryset in _facet_querysets(limit).items()
+    })
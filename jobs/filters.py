@@ -0,0 +1,55 @@
+"""
+Filtres du board des offres.
+
+Regroupe la lecture des paramètres GET (``?q=``, ``?skills=``...) pour que
+le board et les autres listes d'offres filtrent de la même façon.
+"""
+
+from .facets import month_bounds, salary_band_bounds
+from .search import search_offers
+from .skills import parse_skill_keys, skills_filter
+
+DEFAULT_ORDERING = ('-publication_date', '-id')
+
+
+def filter_offers(queryset, params):
+    """
+    Appliquer les filtres présents dans ``params`` (un ``QueryDict``).
+
+    - ``q`` : recherche plein texte, triée par pertinence ;
+    - ``skills`` : compétences séparées par des virgules ;
+    - ``skills_mode`` : ``all`` (ET, par défaut) ou ``any`` (OU) ;
+    - ``salary`` : tranche de salaire (voir ``jobs.facets.SALARY_BANDS``) ;
+    - ``company`` : id de l'entreprise ;
+    - ``month`` : mois de publication au format ``AAAA-MM``.
+
+    Retourne ``(queryset, ordering)`` à passer au ``KeysetPaginator``.
+    """
+    ordering = DEFAULT_ORDERING
+
+    skill_keys = parse_skill_keys(params.get('skills', ''))
+    if skill_keys:
+        match_all = params.get('skills_mode', 'all') != 'any'
+        queryset = queryset.filter(skills_filter(skill_keys, match_all=match_all))
+
+    bounds = salary_band_bounds(params.get('salary'))
+    if bounds:
+        low, high = bounds
+        if low is not None:
+            queryset = queryset.filter(salary__gte=low)
+        if high is not None:
+            queryset = queryset.filter(salary__lt=high)
+
+    company = params.get('company', '')
+    if company.isdigit():
+        queryset = queryset.filter(company_id=int(company))
+
+    bounds = month_bounds(params.get('month'))
+    if bounds:
+        queryset = queryset.filter(publication_date__gte=bounds[0], publication_date__lt=bounds[1])
+
+    query = params.get('q', '').strip()
+    if query:
+        queryset, ordering = search_offers(queryset, query)
+
+    return queryset, ordering
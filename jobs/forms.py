@@ -6,7 +6,8 @@ des offres d'emploi par les entreprises.
 """
 
 from django import forms
-from .models import Offer
+from .alerts import search_terms
+from .models import Offer, SavedSearch
 
 
 class OfferForm(forms.ModelForm):
@@ -79,3 +80,64 @@ class OfferForm(forms.ModelForm):
             instance.save()
         return instance
 
+
+class SavedSearchForm(forms.ModelForm):
+    """
+    Formulaire d'enregistrement d'une recherche (alerte e-mail).
+
+    Les compétences sont saisies séparées par des virgules, comme sur le board.
+    Une alerte sans mot-clé exploitable (mots vides seulement), sans
+    compétence ni salaire minimum correspondrait à toutes les offres : elle
+    est refusée.
+    """
+
+    skills_input = forms.CharField(
+        label="Compétences",
+        required=False,
+        widget=forms.TextInput(attrs={
+            'class': 'w-full px-4 py-2 border border-slate-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary',
+            'placeholder': 'python, django',
+        }),
+    )
+
+    class Meta:
+        model = SavedSearch
+        fields = ['name', 'query', 'salary_min']
+        widgets = {
+            'name': forms.TextInput(attrs={
+                'class': 'w-full px-4 py-2 border border-slate-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary',
+                'placeholder': "Nom de l'alerte (ex: Python à Paris)",
+            }),
+            'query': forms.TextInput(attrs={
+                'class': 'w-full px-4 py-2 border border-slate-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary',
+                'placeholder': 'Mots-clés',
+            }),
+            'salary_min': forms.NumberInput(attrs={
+                'class': 'w-full px-4 py-2 border border-slate-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary',
+                'placeholder': '40000',
+            }),
+        }
+        labels = {
+            'name': "Nom de l'alerte",
+            'query': 'Mots-clés',
+            'salary_min': 'Salaire minimum (€)',
+        }
+
+    def clean_skills_input(self):
+        return [skill.strip() for skill in self.cleaned_data.get('skills_input', '').split(',') if skill.strip()]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        terms = search_terms(cleaned_data.get('query'), cleaned_data.get('skills_input'))
+        if not terms and cleaned_data.get('salary_min') is None and not self.has_error('salary_min'):
+            raise forms.ValidationError(
+                "Indiquez au moins un mot-clé significatif, une compétence ou un salaire minimum."
+            )
+        return cleaned_data
+
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        instance.skills = self.cleaned_data.get('skills_input', [])
+        if commit:
+            instance.save()
+        return instance
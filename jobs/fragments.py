@@ -0,0 +1,152 @@
+"""
+Cache des fragments HTML des cartes d'offres du board.
+
+Chaque carte est rendue une fois puis gardée en cache sous la clé
+``offer-card:<id>`` avec la version de l'offre (``updated_at``) : une
+entrée dont la version ne correspond plus est traitée comme absente. Les
+signaux de ``Offer``, ``User`` et ``Profile`` suppriment les entrées
+concernées (voir ``jobs.signals``).
+
+Les parties propres au visiteur (bouton de suppression du propriétaire,
+bouton « Postuler » ou candidature déjà envoyée, jetons CSRF) ne sont pas
+mises en cache : le fragment contient un emplacement ``ACTIONS_PLACEHOLDER``
+rempli à chaque affichage.
+
+Les compteurs de succès/échecs sont stockés dans le cache lui-même, donc
+partagés entre processus si le backend l'est.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from home.models import Profile
+from .applications import applied_offer_ids
+
+KEY_PREFIX = 'offer-card'
+HITS_KEY = f'{KEY_PREFIX}:stats:hits'
+MISSES_KEY = f'{KEY_PREFIX}:stats:misses'
+ACTIONS_PLACEHOLDER = '<!--offer-actions-->'
+
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def card_key(offer_id):
+    return f'{KEY_PREFIX}:{offer_id}'
+
+
+def offer_version(offer):
+    return offer.updated_at.isoformat()
+
+
+def _incr(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Compteur absent (premier appel ou éviction)
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def render_card(offer):
+    """Rendre la partie partageable d'une carte (sans contexte visiteur)."""
+    return render_to_string('jobs/partials/offer_card.html', {'offer': offer})
+
+
+def render_actions(request, offer_id, company_id, applied=None):
+    """
+    Rendre les actions propres au visiteur : supprimer pour le propriétaire,
+    postuler pour un postulant. ``applied`` est l'ensemble des offres
+    auxquelles le visiteur a déjà postulé, ou None s'il ne peut pas postuler.
+    """
+    is_owner = request.user.id == company_id
+    if not is_owner and applied is None:
+        return ''
+    return render_to_string(
+        'jobs/partials/offer_card_actions.html',
+        {
+            'offer': {'id': offer_id, 'company_id': company_id},
+            'is_owner': is_owner,
+            'applied': applied is not None and offer_id in applied,
+        },
+        request=request,
+    )
+
+
+def can_apply(user):
+    profile = getattr(user, 'profile', None)
+    return profile is not None and profile.user_type == Profile.USER_TYPE_APPLICANT
+
+
+def get_cards(offers):
+    """
+    Retourner le HTML partagé des cartes de ``offers``, dans l'ordre.
+
+    Un seul aller-retour vers le cache pour lire toutes les cartes et un
+    seul pour écrire celles qui manquaient.
+    """
+    offers = list(offers)
+    cached = cache.get_many([card_key(offer.id) for offer in offers])
+    cards, missing = [], {}
+    for offer in offers:
+        entry = cached.get(card_key(offer.id))
+        if entry and entry[0] == offer_version(offer):
+            cards.append(entry[1])
+        else:
+            html = render_card(offer)
+            missing[card_key(offer.id)] = (offer_version(offer), html)
+            cards.append(html)
+    if missing:
+        timeout = getattr(settings, 'JOBS_CARD_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        cache.set_many(missing, timeout=timeout)
+    _incr(HITS_KEY, len(offers) - len(missing))
+    _incr(MISSES_KEY, len(missing))
+    return cards
+
+
+def fill_actions(request, cards):
+    """
+    Insérer les actions du visiteur dans des cartes partagées.
+
+    ``cards`` est une liste de ``(offer_id, company_id, html)`` ; retourne
+    la liste des HTML prêts à afficher. Pour un postulant, ses candidatures
+    sur la page sont lues en une requête.
+    """
+    applied = None
+    if can_apply(request.user):
+        applied = applied_offer_ids(request.user, [offer_id for offer_id, _company_id, _html in cards])
+    return [
+        mark_safe(html.replace(ACTIONS_PLACEHOLDER, render_actions(request, offer_id, company_id, applied)))
+        for offer_id, company_id, html in cards
+    ]
+
+
+def render_cards(request, offers):
+    """Retourner le HTML des cartes de ``offers`` avec les actions du visiteur."""
+    offers = list(offers)
+    return fill_actions(request, [
+        (offer.id, offer.company_id, html)
+        for offer, html in zip(offers, get_cards(offers))
+    ])
+
+
+def invalidate_offers(offer_ids):
+    """Supprimer du cache les cartes des offres ``offer_ids``."""
+    keys = [card_key(offer_id) for offer_id in offer_ids]
+    if keys:
+        cache.delete_many(keys)
+
+
+def get_stats():
+    """Compteurs de succès/échecs du cache de cartes."""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,223 @@
+"""
+Cycle de vie des offres : expiration, désactivation, suppression et archivage.
+
+Une offre est publiée jusqu'à ``Offer.expires_at`` (``JOBS_OFFER_LIFETIME_DAYS``
+jours par défaut). La commande ``archive_offers``, à lancer régulièrement
+(cron), enchaîne :
+
+1. ``deactivate_expired`` : les offres actives expirées sont désactivées ;
+2. ``archive_inactive`` : les offres inactives depuis plus de
+   ``JOBS_ARCHIVE_AFTER_DAYS`` jours sont déplacées dans ``ArchivedOffer``.
+
+Une offre supprimée par son entreprise (``soft_delete_offers``) est
+seulement désactivée et marquée (``deleted_at``) ; ``purge_offers`` la
+supprime vraiment, par lots, après ``JOBS_PURGE_AFTER_DAYS`` jours. Un
+nettoyage de centaines d'offres se fait ainsi en un seul ``UPDATE``.
+
+La table ``jobs_offer`` et ses index (board, recherche plein texte,
+compétences) ne contiennent ainsi que les offres récentes ; les archives
+gardent l'id d'origine et restent consultables (admin, historique des
+candidatures, statistiques).
+
+Les commandes procèdent par lots d'ids, un lot par transaction : un
+écrivain concurrent n'attend jamais plus d'un lot. Les ``update()`` en
+masse ne déclenchent pas les signaux de ``Offer`` : leur travail
+(facettes, cartes, version du board, alertes en attente) est fait ici.
+Les ``delete()`` en masse les déclenchent pour chaque offre ; la version
+du board n'y est incrémentée qu'une fois par lot (``board.bump_once``).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import board, facets, fragments
+from .models import Application, ArchivedOffer, JobAlert, Offer, default_expires_at
+from .tasks import schedule_alert_matching
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+DEFAULT_PURGE_AFTER_DAYS = 7
+
+# Champs recopiés de l'offre vers son archive
+ARCHIVED_FIELDS = (
+    'id', 'company_id', 'title', 'description', 'salary', 'skills',
+    'publication_date', 'updated_at', 'expires_at',
+)
+
+
+def archive_cutoff(now=None):
+    """Date avant laquelle une offre inactive (``updated_at``) est archivée."""
+    days = getattr(settings, 'JOBS_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def purge_cutoff(now=None):
+    """Date avant laquelle une offre supprimée (``deleted_at``) est purgée."""
+    days = getattr(settings, 'JOBS_PURGE_AFTER_DAYS', DEFAULT_PURGE_AFTER_DAYS)
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def _take_offline(rows, ids):
+    """Travail des signaux pour des offres qui quittent le board."""
+    facets.count_offers([row for row in rows if row['active']], -1)
+    # Alertes jamais envoyées : l'offre n'est plus visible
+    JobAlert.objects.filter(offer_id__in=ids, delivered_at__isnull=True).delete()
+    fragments.invalidate_offers(ids)
+    board.bump_generation()
+
+
+def _locked_rows(queryset):
+    return list(queryset.select_for_update().values('id', 'active', *facets.FACET_FIELDS))
+
+
+def deactivate_offers(queryset, now=None):
+    """
+    Désactiver en une requête les offres actives de ``queryset``.
+
+    Les filtres de ``queryset`` (propriétaire...) font partie de l'``UPDATE``.
+    À appeler dans une transaction. Retourne les ids désactivés.
+    """
+    now = now or timezone.now()
+    queryset = queryset.filter(active=True)
+    rows = _locked_rows(queryset)
+    ids = [row['id'] for row in rows]
+    if ids:
+        # updated_at : rattrapé par les recommandations
+        queryset.filter(pk__in=ids).update(active=False, updated_at=now)
+        _take_offline(rows, ids)
+    return ids
+
+
+def reactivate_offers(queryset, now=None):
+    """
+    Réactiver en une requête les offres inactives (non supprimées) de ``queryset``.
+
+    Une offre expirée repart pour une durée de publication complète.
+    À appeler dans une transaction. Retourne les ids réactivés.
+    """
+    now = now or timezone.now()
+    queryset = queryset.filter(active=False, deleted_at__isnull=True)
+    rows = _locked_rows(queryset)
+    ids = [row['id'] for row in rows]
+    if ids:
+        queryset.filter(pk__in=ids).update(
+            active=True,
+            updated_at=now,
+            expires_at=Case(When(expires_at__lte=now, then=Value(default_expires_at())), default=F('expires_at')),
+        )
+        facets.count_offers(rows)
+        fragments.invalidate_offers(ids)
+        board.bump_generation()
+        # Les alertes en attente ont été supprimées à la désactivation
+        schedule_alert_matching(ids)
+    return ids
+
+
+def soft_delete_offers(queryset, now=None):
+    """
+    Supprimer en une requête les offres de ``queryset`` : elles sont
+    désactivées et marquées, la suppression réelle est faite plus tard par
+    ``purge_deleted``.
+
+    À appeler dans une transaction. Retourne les ids supprimés.
+    """
+    now = now or timezone.now()
+    queryset = queryset.filter(deleted_at__isnull=True)
+    rows = _locked_rows(queryset)
+    ids = [row['id'] for row in rows]
+    if ids:
+        queryset.filter(pk__in=ids).update(active=False, deleted_at=now, updated_at=now)
+        _take_offline(rows, ids)
+    return ids
+
+
+def expired(now=None):
+    """Offres actives dont la publication est terminée."""
+    return Offer.objects.filter(active=True, expires_at__lte=now or timezone.now()).order_by()
+
+
+def deactivate_expired(now=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Désactiver les offres actives expirées, par lots ; retourne leur nombre."""
+    now = now or timezone.now()
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(expired(now).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return total
+            total += len(deactivate_offers(Offer.objects.filter(pk__in=ids), now))
+
+
+def archivable(before):
+    """Offres inactives (non supprimées) non modifiées depuis ``before``."""
+    return Offer.objects.filter(active=False, deleted_at__isnull=True, updated_at__lt=before).order_by()
+
+
+def archive_offers(ids, now=None):
+    """
+    Déplacer les offres inactives ``ids`` vers ``ArchivedOffer``.
+
+    À appeler dans une transaction. Les candidatures sont rattachées à
+    l'archive ; les alertes et les compétences indexées sont supprimées
+    avec l'offre. Retourne le nombre d'offres archivées.
+    """
+    now = now or timezone.now()
+    rows = list(Offer.objects.filter(pk__in=ids, active=False).select_for_update().values(*ARCHIVED_FIELDS))
+    if not rows:
+        return 0
+    ids = [row['id'] for row in rows]
+    ArchivedOffer.objects.bulk_create([ArchivedOffer(archived_at=now, **row) for row in rows])
+    Application.objects.filter(offer_id__in=ids).update(archived_offer_id=F('offer_id'), offer=None)
+    with board.bump_once():
+        Offer.objects.filter(pk__in=ids).delete()
+    return len(rows)
+
+
+def archive_inactive(before=None, batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Archiver par lots les offres inactives depuis ``before`` ; retourne leur nombre."""
+    now = now or timezone.now()
+    stale = archivable(before or archive_cutoff(now))
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(stale.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return total
+            total += archive_offers(ids, now)
+
+
+def purgeable(before):
+    """Offres supprimées avant ``before``."""
+    return Offer.objects.filter(deleted_at__lt=before).order_by()
+
+
+def purge_deleted(before=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Supprimer par lots les offres supprimées avant ``before`` (candidatures
+    et alertes comprises) ; retourne leur nombre.
+    """
+    stale = purgeable(before or purge_cutoff())
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(stale.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return total
+            with board.bump_once():
+                Offer.objects.filter(pk__in=ids).delete()
+            total += len(ids)
+
+
+def offer_history(*fields):
+    """
+    Offres en ligne et archivées, pour l'historique et les statistiques.
+
+    ``fields`` doivent exister dans les deux tables (voir ``ARCHIVED_FIELDS``).
+    """
+    return Offer.objects.order_by().values(*fields).union(
+        ArchivedOffer.objects.order_by().values(*fields), all=True,
+    )
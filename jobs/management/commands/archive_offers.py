@@ -0,0 +1,48 @@
+"""
+Désactiver les offres expirées et archiver les offres inactives anciennes.
+
+À lancer régulièrement (cron) : voir ``jobs.lifecycle``.
+
+Usage:
+    python manage.py archive_offers
+    python manage.py archive_offers --batch-size 1000 --archive-after-days 30
+    python manage.py archive_offers --dry-run
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs import lifecycle
+
+
+class Command(BaseCommand):
+    help = "Désactive les offres expirées et déplace les offres inactives anciennes vers les archives."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=lifecycle.DEFAULT_BATCH_SIZE,
+                            help="Offres traitées par transaction")
+        parser.add_argument('--archive-after-days', type=int, default=None,
+                            help="Archiver les offres inactives depuis ce nombre de jours (JOBS_ARCHIVE_AFTER_DAYS)")
+        parser.add_argument('--dry-run', action='store_true', help="Compter sans rien modifier")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options['archive_after_days'] is None:
+            before = lifecycle.archive_cutoff(now)
+        else:
+            before = now - timedelta(days=options['archive_after_days'])
+
+        if options['dry_run']:
+            expired = lifecycle.expired(now).count()
+            # Les offres expirées aujourd'hui ne sont pas encore archivables
+            archivable = lifecycle.archivable(before).count()
+            self.stdout.write(f"{expired} offre(s) expirée(s) à désactiver, {archivable} offre(s) à archiver.")
+            return
+
+        deactivated = lifecycle.deactivate_expired(now, batch_size=options['batch_size'])
+        archived = lifecycle.archive_inactive(before, batch_size=options['batch_size'], now=now)
+        self.stdout.write(self.style.SUCCESS(
+            f"{deactivated} offre(s) expirée(s) désactivée(s), {archived} offre(s) archivée(s)."
+        ))
@@ -0,0 +1,190 @@
+"""
+Comparer le débit du board servi en WSGI et en ASGI face à des clients lents.
+
+Les deux gestionnaires de Django sont appelés dans le processus, sans
+serveur HTTP ni réseau :
+
+- WSGI : un pool de ``--workers`` threads, comme ``gunicorn --threads`` ;
+  un worker reste occupé tant que son client n'a pas lu toute la réponse ;
+- ASGI : une boucle d'événements ; un client lent n'occupe qu'une tâche.
+
+Un client lent lit la réponse à ``--client-kbps`` Ko/s. Un visiteur
+postulant temporaire est créé pour la mesure puis supprimé.
+
+Usage:
+    python manage.py benchmark_board_servers
+    python manage.py benchmark_board_servers --clients 100 --requests 400 --workers 8 --client-kbps 128
+"""
+
+import asyncio
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.urls import reverse
+
+from home.models import Profile
+from jobs.models import Offer
+
+HOST = 'localhost'
+
+
+class Command(BaseCommand):
+    help = "Compare le débit du board en WSGI (threads) et en ASGI (boucle d'événements) avec des clients lents."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help="Clients simultanés")
+        parser.add_argument('--requests', type=int, default=200, help="Requêtes par mode")
+        parser.add_argument('--workers', type=int, default=4, help="Threads du serveur WSGI")
+        parser.add_argument('--client-kbps', type=float, default=256, help="Débit de lecture d'un client (Ko/s)")
+        parser.add_argument('--path', default='', help="Page mesurée (board par défaut)")
+
+    def handle(self, *args, **options):
+        path = options['path'] or reverse('jobs:index')
+        if not Offer.objects.active().exists():
+            self.stderr.write(self.style.WARNING('Aucune offre active : le board mesuré sera vide.'))
+
+        user = User.objects.create_user(f'benchmark-{uuid.uuid4().hex[:12]}', first_name='Benchmark')
+        Profile.objects.create(user=user, user_type=Profile.USER_TYPE_APPLICANT, address='')
+        client = Client()
+        client.force_login(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        try:
+            self.stdout.write(
+                f"{options['requests']} requêtes GET {path}, {options['clients']} clients "
+                f"à {options['client_kbps']:g} Ko/s"
+            )
+            results = [
+                (f"WSGI ({options['workers']} threads)", asyncio.run(self._run_wsgi(path, cookie, options))),
+                ('ASGI', asyncio.run(self._run_asgi(path, cookie, options))),
+            ]
+        finally:
+            client.logout()
+            user.delete()
+
+        for label, (elapsed, timings, statuses) in results:
+            self._report(label, elapsed, timings, statuses)
+        (_, (wsgi, *_)), (_, (asgi, *_)) = results
+        self.stdout.write(self.style.SUCCESS(f'ASGI / WSGI : débit x{wsgi / asgi:.2f}'))
+
+    def _delay(self, size, options):
+        return size / (options['client_kbps'] * 1024)
+
+    async def _drive(self, request, options):
+        """
+        Lancer ``--requests`` requêtes, ``--clients`` à la fois. La latence
+        est celle vue par le client, attente d'un worker WSGI comprise.
+        """
+        clients = asyncio.Semaphore(options['clients'])
+
+        async def timed():
+            async with clients:
+                started = time.perf_counter()
+                await request()
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(timed() for _ in range(options['requests'])))
+        return time.perf_counter() - started, timings
+
+    async def _run_wsgi(self, path, cookie, options):
+        application = get_wsgi_application()
+        statuses = []
+        lock = threading.Lock()
+
+        def request():
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': '',
+                'SERVER_NAME': HOST,
+                'SERVER_PORT': '80',
+                'HTTP_HOST': HOST,
+                'HTTP_COOKIE': cookie,
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': sys.stderr,
+                'wsgi.url_scheme': 'http',
+                'wsgi.version': (1, 0),
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+
+            def start_response(status, headers, exc_info=None):
+                with lock:
+                    statuses.append(int(status.split()[0]))
+
+            body = application(environ, start_response)
+            try:
+                for chunk in body:
+                    # Le worker attend que le client lent ait lu le morceau
+                    time.sleep(self._delay(len(chunk), options))
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+
+        loop = asyncio.get_running_loop()
+        # Les clients au-delà des workers attendent dans la file du serveur
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            elapsed, timings = await self._drive(lambda: loop.run_in_executor(pool, request), options)
+        return elapsed, timings, statuses
+
+    async def _run_asgi(self, path, cookie, options):
+        application = get_asgi_application()
+        statuses = []
+
+        async def request():
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': b'',
+                'root_path': '',
+                'headers': [(b'host', HOST.encode()), (b'cookie', cookie.encode())],
+                'client': ('127.0.0.1', 0),
+                'server': (HOST, 80),
+            }
+            received = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Le client ne se déconnecte pas : Django annule cette attente
+                await asyncio.Future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif message['type'] == 'http.response.body':
+                    # Le client lent n'occupe que sa propre tâche
+                    await asyncio.sleep(self._delay(len(message.get('body', b'')), options))
+
+            await application(scope, receive, send)
+
+        elapsed, timings = await self._drive(request, options)
+        return elapsed, timings, statuses
+
+    def _report(self, label, elapsed, timings, statuses):
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        errors = sum(status != 200 for status in statuses)
+        self.stdout.write(
+            f"{label} : {len(timings) / elapsed:.1f} req/s, médiane {statistics.median(timings) * 1000:.0f} ms, "
+            f"p95 {p95 * 1000:.0f} ms, {errors} réponse(s) non 200"
+        )
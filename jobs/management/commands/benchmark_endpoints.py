@@ -0,0 +1,373 @@
+"""
+Mesurer les vues principales du site sous charge : débit, latences
+(p50/p95/p99) et requêtes SQL par endpoint.
+
+Des clients locaux simultanés (un thread et une connexion à la base
+chacun) appellent les vraies vues, middlewares compris, avec le client de
+test de Django : pas de serveur HTTP ni de réseau. Endpoints mesurés :
+
+- ``board`` : GET ``jobs:index`` (postulant connecté) ;
+- ``profile`` : GET ``home:profile`` (postulant connecté) ;
+- ``create_offer`` : POST ``jobs:create_offer`` (entreprise) ;
+- ``delete_offer`` : POST ``jobs:delete_offer`` (entreprise propriétaire) ;
+- ``register`` : POST ``home:register`` (nouveau postulant) ;
+- ``login`` : POST ``home:login`` (mot de passe haché comme en production).
+
+Les données (``--offers``, ``--companies``, ``--applicants``) sont créées
+dans une base temporaire, supprimée à la fin : la base de développement
+n'est pas modifiée. Avec ``--in-place``, elles sont créées dans la base
+courante puis supprimées. Les caches utilisent un préfixe de clés propre à
+la mesure et la limitation de débit est levée.
+
+Les résultats peuvent être enregistrés en JSON (``--output``) et comparés
+à une mesure précédente (``--baseline``), par exemple celle du commit
+précédent.
+
+Usage:
+    python manage.py benchmark_endpoints
+    python manage.py benchmark_endpoints --offers 20000 --requests 200 --concurrency 8 -o bench.json
+    python manage.py benchmark_endpoints --endpoints board,profile --baseline bench.json
+"""
+
+import json
+import math
+import random
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from home import throttling
+from home.models import Profile
+from job_board.testing import temporary_database
+from jobs import board, facets
+from jobs.models import Offer
+from jobs.skills import sync_skills_for_offers
+
+ENDPOINTS = ('board', 'profile', 'create_offer', 'delete_offer', 'register', 'login')
+# Endpoints en lecture : une requête non mesurée par client remplit les caches
+READ_ENDPOINTS = {'board', 'profile'}
+HOST = 'localhost'
+PASSWORD = 'Benchmark-Passw0rd!'
+SKILLS = ['Python', 'Django', 'JavaScript', 'React', 'SQL', 'Docker', 'Go', 'Rust', 'Java', 'AWS']
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, rank):
+    """Percentile ``rank`` (méthode du rang le plus proche) de valeurs triées."""
+    index = max(0, math.ceil(rank / 100 * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(samples, elapsed):
+    """Statistiques d'un endpoint à partir des ``(latence, statut attendu ?, requêtes SQL)``."""
+    latencies = sorted(latency * 1000 for latency, _ok, _queries in samples)
+    queries = [count for _latency, _ok, count in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(not ok for _latency, ok, _queries in samples),
+        'throughput': round(len(samples) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            **{f'p{rank}': round(percentile(latencies, rank), 2) for rank in PERCENTILES},
+            'mean': round(statistics.fmean(latencies), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'queries': {'mean': round(statistics.fmean(queries), 2), 'max': max(queries)},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Mesure débit, latences et requêtes SQL des vues principales avec des clients simultanés."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=2000, help="Offres créées avant la mesure")
+        parser.add_argument('--companies', type=int, default=20, help="Entreprises créées")
+        parser.add_argument('--applicants', type=int, default=50, help="Postulants créés")
+        parser.add_argument('--active-ratio', type=float, default=0.8, help="Part des offres actives")
+        parser.add_argument('--requests', type=int, default=100, help="Requêtes mesurées par endpoint")
+        parser.add_argument('--concurrency', type=int, default=4, help="Clients simultanés")
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                            help=f"Endpoints mesurés, séparés par des virgules ({', '.join(ENDPOINTS)})")
+        parser.add_argument('--in-place', action='store_true',
+                            help="Utiliser la base courante (données supprimées à la fin) plutôt qu'une base temporaire")
+        parser.add_argument('-o', '--output', help="Fichier JSON des résultats")
+        parser.add_argument('--baseline', help="Résultats JSON précédents à comparer")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Endpoint(s) inconnu(s) : {', '.join(sorted(unknown))}")
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--requests et --concurrency doivent être positifs")
+        if options['in_place'] and options['concurrency'] > 1 and connection.vendor == 'sqlite' \
+                and connection.is_in_memory_db():
+            raise CommandError("Base SQLite en mémoire : --concurrency 1 requis avec --in-place")
+        baseline = self._load_baseline(options['baseline'])
+
+        self.prefix = f'bench-{uuid.uuid4().hex[:8]}'
+        database = self._in_place() if options['in_place'] else temporary_database()
+        with database, self._isolated_settings():
+            started = time.perf_counter()
+            self.users = self._seed(options)
+            self.stdout.write(
+                f"{options['offers']} offres, {options['companies']} entreprises et {options['applicants']} "
+                f"postulants créés en {time.perf_counter() - started:.1f}s"
+            )
+            results = {name: self._measure(name, options) for name in endpoints}
+
+        report = {
+            'commit': git_commit(),
+            'created_at': timezone.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'options': {
+                name: options[name]
+                for name in ('offers', 'companies', 'applicants', 'active_ratio', 'requests', 'concurrency', 'seed')
+            },
+            'endpoints': results,
+        }
+        self._report(results, baseline)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Résultats enregistrés dans {options['output']}."))
+
+    def _load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            return json.loads(Path(path).read_text(encoding='utf-8'))['endpoints']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Résultats de référence illisibles ({path}) : {exc}")
+
+    # Base et réglages
+
+    @contextmanager
+    def _in_place(self):
+        try:
+            yield
+        finally:
+            # Offres, profils, sessions... suivent les utilisateurs (CASCADE et signaux)
+            User.objects.filter(username__startswith=self.prefix).delete()
+
+    @contextmanager
+    def _isolated_settings(self):
+        caches = {
+            alias: {**config, 'KEY_PREFIX': f"{config.get('KEY_PREFIX', '')}{self.prefix}"}
+            for alias, config in settings.CACHES.items()
+        }
+        unlimited = {scope: (10 ** 9, 10 ** 9) for scope in throttling.limits()}
+        with override_settings(
+            CACHES=caches, RATE_LIMITS=unlimited, DATABASE_REPLICAS=[], ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, HOST],
+        ):
+            yield
+
+    # Données
+
+    def _seed(self, options):
+        rng = random.Random(options['seed'])
+        password = make_password(PASSWORD)
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [
+                    User(username=f'{self.prefix}-company-{index}', last_name=f'Entreprise {index}',
+                         email=f'company-{index}@example.com', password=password)
+                    for index in range(options['companies'])
+                ] + [
+                    User(username=f'{self.prefix}-applicant-{index}', first_name='Léa', last_name=f'Postulant {index}',
+                         email=f'applicant-{index}@example.com', password=password)
+                    for index in range(options['applicants'])
+                ]
+            )
+            users = {
+                role: list(User.objects.filter(username__startswith=f'{self.prefix}-{role}-').order_by('id'))
+                for role in ('company', 'applicant')
+            }
+            if not users['company'] or not users['applicant']:
+                raise CommandError("Au moins une entreprise et un postulant sont nécessaires")
+            Profile.objects.bulk_create(
+                [Profile(user=user, user_type=Profile.USER_TYPE_COMPANY, address='Paris', siret='12345678901234')
+                 for user in users['company']]
+                + [Profile(user=user, user_type=Profile.USER_TYPE_APPLICANT, address='Lyon')
+                   for user in users['applicant']]
+            )
+
+        # Une offre de plus par suppression mesurée
+        total = options['offers'] + options['requests']
+        for start in range(0, total, 1000):
+            batch = [
+                Offer(
+                    company=rng.choice(users['company']),
+                    title=f'Développeur {rng.choice(SKILLS)} {index}',
+                    description='Poste de développeur, équipe produit',
+                    salary=rng.randrange(25_000, 90_000, 1000),
+                    skills=rng.sample(SKILLS, 3),
+                    active=index >= options['offers'] or rng.random() < options['active_ratio'],
+                )
+                for index in range(start, min(start + 1000, total))
+            ]
+            with transaction.atomic():
+                # bulk_create ne déclenche pas les signaux : voir import_offers
+                created = Offer.objects.bulk_create(batch)
+                sync_skills_for_offers(created)
+                facets.count_offers(facets.offer_values(offer) for offer in created if offer.active)
+                board.bump_generation()
+        companies = {user.pk: user for user in users['company']}
+        users['deletable'] = [
+            (offer_id, companies[company_id])
+            for offer_id, company_id in Offer.objects.filter(company__in=users['company'])
+            .order_by('-id').values_list('id', 'company_id')[:options['requests']]
+        ]
+        return users
+
+    # Mesure
+
+    def _measure(self, name, options):
+        requests, concurrency = options['requests'], options['concurrency']
+        counter, lock, samples, failures = iter(range(requests)), threading.Lock(), [], []
+        request = getattr(self, f'_request_{name}')
+
+        def work(worker):
+            clients = {}
+
+            def client_for(user):
+                if user.pk not in clients:
+                    clients[user.pk] = Client(HTTP_HOST=HOST)
+                    clients[user.pk].force_login(user)
+                return clients[user.pk]
+
+            # Connexion ouverte, sessions créées et caches remplis avant le départ
+            client_for(self._company(worker))
+            if name in READ_ENDPOINTS:
+                request(client_for, worker, 0)
+            barrier.wait()
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    response, expected = request(client_for, worker, index)
+                    elapsed = time.perf_counter() - started
+                with lock:
+                    samples.append((elapsed, response.status_code == expected, len(queries)))
+                    if response.status_code != expected:
+                        failures.append(response.status_code)
+
+        if concurrency == 1:
+            # Même thread (et même connexion) que la commande
+            barrier = threading.Barrier(1)
+            started = time.perf_counter()
+            work(0)
+        else:
+            barrier = threading.Barrier(concurrency + 1)
+            threads = [threading.Thread(target=self._in_thread, args=(work, worker)) for worker in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - started
+
+        if failures:
+            self.stderr.write(self.style.WARNING(
+                f"{name} : {len(failures)} réponse(s) inattendue(s), statuts {sorted(set(failures))}"
+            ))
+        if not samples:
+            raise CommandError(f"{name} : aucune requête mesurée")
+        return summarize(samples, elapsed)
+
+    def _in_thread(self, work, worker):
+        try:
+            work(worker)
+        finally:
+            connections.close_all()
+
+    def _applicant(self, worker):
+        return self.users['applicant'][worker % len(self.users['applicant'])]
+
+    def _company(self, worker):
+        return self.users['company'][worker % len(self.users['company'])]
+
+    def _request_board(self, client_for, worker, index):
+        return client_for(self._applicant(worker)).get(reverse('jobs:index')), 200
+
+    def _request_profile(self, client_for, worker, index):
+        return client_for(self._applicant(worker)).get(reverse('home:profile')), 200
+
+    def _request_create_offer(self, client_for, worker, index):
+        return client_for(self._company(worker)).post(reverse('jobs:create_offer'), {
+            'title': f'Offre benchmark {index}',
+            'description': 'Créée par benchmark_endpoints',
+            'salary': '45000',
+            'skills_input': 'Python, Django',
+            'active': 'on',
+        }), 302
+
+    def _request_delete_offer(self, client_for, worker, index):
+        offer_id, owner = self.users['deletable'][index]
+        return client_for(owner).post(reverse('jobs:delete_offer', args=[offer_id])), 302
+
+    def _request_register(self, client_for, worker, index):
+        return Client(HTTP_HOST=HOST).post(reverse('home:register'), {
+            'user_type': Profile.USER_TYPE_APPLICANT,
+            'first_name': 'Léa',
+            'last_name': 'Benchmark',
+            'username': f'{self.prefix}-registered-{index}',
+            'email': f'registered-{index}@example.com',
+            'address': 'Lyon',
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        }), 302
+
+    def _request_login(self, client_for, worker, index):
+        user = self.users['applicant'][index % len(self.users['applicant'])]
+        return Client(HTTP_HOST=HOST).post(reverse('home:login'), {
+            'username': user.username, 'password': PASSWORD,
+        }), 302
+
+    # Rapport
+
+    def _report(self, results, baseline):
+        for name, result in results.items():
+            latency = result['latency_ms']
+            line = (
+                f"{name:<13} {result['throughput']:8.1f} req/s  p50 {latency['p50']:7.1f} ms  "
+                f"p95 {latency['p95']:7.1f} ms  p99 {latency['p99']:7.1f} ms  "
+                f"{result['queries']['mean']:5.1f} requêtes SQL (max {result['queries']['max']})"
+            )
+            if result['errors']:
+                line += f"  {result['errors']} erreur(s)"
+            previous = (baseline or {}).get(name)
+            if previous:
+                line += (
+                    f"  | référence : débit x{result['throughput'] / previous['throughput']:.2f}, "
+                    f"p95 {latency['p95'] - previous['latency_ms']['p95']:+.1f} ms, "
+                    f"requêtes {result['queries']['mean'] - previous['queries']['mean']:+.1f}"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,142 @@
+"""
+Comparer les plans et les temps des requêtes du board avec et sans les
+index composites de ``Offer``.
+
+Les offres de test sont insérées dans une base temporaire, supprimée à la
+fin : la base courante n'est ni modifiée ni verrouillée pendant la mesure.
+L'insertion initiale peut prendre un moment (triggers FTS compris). Avec
+``--in-place`` (tests), la mesure se fait dans la base courante, dans une
+transaction annulée à la fin qui garde le verrou d'écriture tout du long.
+
+Usage:
+    python manage.py benchmark_offer_indexes
+    python manage.py benchmark_offer_indexes --offers 200000 --active-ratio 0.2 --repeat 50
+"""
+
+import random
+import statistics
+import time
+from contextlib import nullcontext
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from job_board.testing import temporary_database
+from jobs.models import Offer
+from jobs.pagination import KeysetPaginator
+from jobs.search import search_offers
+
+# Index comparés : présents (après) ou supprimés le temps de la mesure (avant)
+BENCHMARKED_INDEXES = ('offer_active_recent_idx', 'offer_company_recent_idx')
+
+
+class Command(BaseCommand):
+    help = "Affiche EXPLAIN et les temps des requêtes du board avant/après les index d'Offer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=100_000, help="Nombre d'offres insérées")
+        parser.add_argument('--companies', type=int, default=200, help="Nombre d'entreprises")
+        parser.add_argument('--active-ratio', type=float, default=0.3, help="Part des offres actives")
+        parser.add_argument('--repeat', type=int, default=20, help="Exécutions par requête")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--in-place', action='store_true',
+                            help="Utiliser la base courante (transaction annulée à la fin) plutôt qu'une base temporaire")
+
+    def handle(self, *args, **options):
+        indexes = [index for index in Offer._meta.indexes if index.name in BENCHMARKED_INDEXES]
+        if len(indexes) != len(BENCHMARKED_INDEXES):
+            raise CommandError("Index d'Offer introuvables : migrations à jour ?")
+
+        database = nullcontext() if options['in_place'] else temporary_database()
+        with database, transaction.atomic():
+            companies = self._seed(options)
+            queries = self._queries(companies)
+            # Pas de ``with schema_editor()`` : SQLite le refuse dans une transaction
+            editor = connection.schema_editor(atomic=False)
+            create_sql = [str(index.create_sql(Offer, editor)) for index in indexes]
+
+            self._execute([f'DROP INDEX {connection.ops.quote_name(index.name)}' for index in indexes])
+            self._analyze()
+            self._run('Sans les index', queries, options['repeat'])
+
+            self._execute(create_sql)
+            self._analyze()
+            self._run('Avec les index', queries, options['repeat'])
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Données de test annulées.'))
+
+    def _seed(self, options):
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        User.objects.bulk_create(
+            User(username=f'benchmark-company-{index}', last_name=f'Entreprise {index}')
+            for index in range(options['companies'])
+        )
+        companies = list(User.objects.filter(username__startswith='benchmark-company-').values_list('id', flat=True))
+
+        remaining = options['offers']
+        while remaining > 0:
+            size = min(options['batch_size'], remaining)
+            # Insertion dans l'ordre de publication, comme en production
+            Offer.objects.bulk_create(
+                Offer(
+                    company_id=rng.choice(companies),
+                    title=f'Offre {rng.randrange(10_000)}',
+                    description='Description',
+                    salary=rng.randrange(25_000, 90_000, 1000),
+                    skills=[],
+                    active=rng.random() < options['active_ratio'],
+                )
+                for _ in range(size)
+            )
+            remaining -= size
+        self.stdout.write(
+            f"{options['offers']} offres insérées en {time.perf_counter() - started:.1f}s "
+            f"({options['companies']} entreprises)"
+        )
+        return companies
+
+    def _queries(self, companies):
+        """Requêtes du board (recherche comprise), de l'admin et de ``delete_offer``, sous forme de querysets."""
+        company_id = companies[len(companies) // 2]
+        board = KeysetPaginator(Offer.objects.active(), page_size=20)
+        # Curseur au milieu du board : filtre réellement envoyé par le paginateur
+        middle = board.get_queryset().values('publication_date', 'id')[Offer.objects.active().count() // 2]
+        cursor = board.cursor_for(middle)
+        offer = Offer.objects.filter(company_id=company_id).values('id', 'company_id').first()
+        searched, ordering = search_offers(Offer.objects.active(), 'offre 12')
+        return [
+            ('board, première page',
+             Offer.objects.active().order_by('-publication_date', '-id')[:20]),
+            ('board, page suivante (curseur)',
+             board.get_queryset(after=cursor)[:20]),
+            ('board, recherche plein texte',
+             searched.order_by(*ordering)[:20]),
+            ("offres d'une entreprise",
+             Offer.objects.filter(company_id=company_id).order_by('-publication_date')[:20]),
+            ('suppression (id + propriétaire)',
+             Offer.objects.filter(id=offer['id'], company_id=offer['company_id'])),
+        ]
+
+    def _execute(self, statements):
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def _analyze(self):
+        self._execute(['ANALYZE'])
+
+    def _run(self, label, queries, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        for name, queryset in queries:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f'  {name} : médiane {statistics.median(timings) * 1000:.2f} ms')
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'      {line}')
@@ -0,0 +1,110 @@
+"""
+Mesurer l'index de recommandations sur un corpus synthétique.
+
+Aucune écriture en base : les offres sont générées en mémoire et indexées
+directement dans un ``OfferIndex``.
+
+Usage:
+    python manage.py benchmark_recommendations
+    python manage.py benchmark_recommendations --offers 100000 --queries 500 --updates 2000
+"""
+
+import itertools
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import recommendations
+from jobs.recommendations import OfferIndex, hash_features, offer_weights
+
+
+def _vocabulary(size, rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(size)]
+
+
+class Command(BaseCommand):
+    help = "Mesure la construction, les mises à jour et le top-k de l'index de recommandations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=100_000, help="Nombre d'offres synthétiques")
+        parser.add_argument('--queries', type=int, default=200, help="Nombre de profils à classer")
+        parser.add_argument('--updates', type=int, default=1000, help="Nombre d'offres modifiées une à une")
+        parser.add_argument('--limit', type=int, default=recommendations.DEFAULT_LIMIT, help="Taille du top-k")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not recommendations.HAS_NUMPY:
+            raise CommandError('NumPy et SciPy sont requis (pip install numpy scipy).')
+        rng = random.Random(options['seed'])
+        words = _vocabulary(20_000, rng)
+        # Loi de Zipf approximative : quelques mots très fréquents, une longue traîne
+        cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+        skills = [f'skill {index}' for index in range(500)]
+
+        def random_offer():
+            return (
+                ' '.join(rng.choices(words, cum_weights=cum_weights, k=4)),
+                ' '.join(rng.choices(words, cum_weights=cum_weights, k=80)),
+                rng.sample(skills, rng.randint(1, 6)),
+            )
+
+        offers = [random_offer() for _ in range(options['offers'])]
+        started = time.perf_counter()
+        vectors = [hash_features(offer_weights(*offer)) for offer in offers]
+        vectorized = time.perf_counter() - started
+
+        index = OfferIndex()
+        started = time.perf_counter()
+        for offer_id, vector in enumerate(vectors, start=1):
+            index.upsert(offer_id, *vector)
+        index.top_k(*vectors[0], k=1)
+        built = time.perf_counter() - started
+        self.stdout.write(
+            f"{options['offers']} offres : vectorisation {vectorized:.2f}s, "
+            f"construction de la matrice {built:.2f}s ({index.matrix.nnz} valeurs non nulles)"
+        )
+
+        profiles = [
+            hash_features(offer_weights(
+                ' '.join(rng.choices(words, cum_weights=cum_weights, k=10)),
+                ' '.join(rng.choices(words, cum_weights=cum_weights, k=150)),
+                rng.sample(skills, 5),
+            ))
+            for _ in range(options['queries'])
+        ]
+        timings = []
+        for columns, values in profiles:
+            started = time.perf_counter()
+            index.top_k(columns, values, k=options['limit'])
+            timings.append(time.perf_counter() - started)
+        self._report('top-k', timings)
+
+        timings = []
+        for _ in range(options['updates']):
+            offer_id = rng.randint(1, options['offers'])
+            offer = random_offer()
+            started = time.perf_counter()
+            vector = hash_features(offer_weights(*offer))
+            index.upsert(offer_id, *vector)
+            timings.append(time.perf_counter() - started)
+        self._report('mise à jour', timings)
+
+        started = time.perf_counter()
+        index.top_k(*profiles[0], k=options['limit'])
+        self.stdout.write(
+            f"premier top-k après {options['updates']} mises à jour "
+            f"(empilement + normes) : {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    def _report(self, label, timings):
+        timings = sorted(timings)
+        if not timings:
+            return
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label} : médiane {statistics.median(timings) * 1000:.2f} ms, "
+            f"p95 {p95 * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms"
+        )
@@ -0,0 +1,60 @@
+"""
+Exporter les offres en CSV ou JSONL, en flux.
+
+Les filtres reprennent les paramètres de l'API (voir ``jobs.api``) ; le
+fichier produit peut être réimporté avec ``import_offers``.
+
+Usage:
+    python manage.py export_offers > offres.csv
+    python manage.py export_offers --format jsonl --active all -o offres.jsonl
+    python manage.py export_offers --skills python,django --salary-min 40000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.api import BadRequest, filtered_offers
+from jobs.export import DEFAULT_CHUNK_SIZE, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Exporte les offres d'emploi en CSV ou JSONL (lecture et écriture en flux)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(FORMATS), default='csv', help="Format de sortie")
+        parser.add_argument('-o', '--output', help="Fichier de sortie (sortie standard par défaut)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Lignes lues par aller-retour avec la base")
+        parser.add_argument('--active', default='true', help="true (défaut), false ou all")
+        parser.add_argument('--company', default='', help="Id de l'entreprise")
+        parser.add_argument('--skills', default='', help="Compétences séparées par des virgules")
+        parser.add_argument('--skills-mode', default='all', help="all (toutes) ou any (au moins une)")
+        parser.add_argument('--salary-min', default='')
+        parser.add_argument('--salary-max', default='')
+        parser.add_argument('-q', '--query', default='', help="Recherche plein texte")
+
+    def handle(self, *args, **options):
+        params = {
+            'active': options['active'],
+            'company': options['company'],
+            'skills': options['skills'],
+            'skills_mode': options['skills_mode'],
+            'salary_min': options['salary_min'],
+            'salary_max': options['salary_max'],
+            'q': options['query'],
+        }
+        try:
+            offers, _ordering = filtered_offers(params)
+        except BadRequest as exc:
+            raise CommandError(str(exc))
+
+        chunks = stream_export(offers, options['format'], chunk_size=options['chunk_size'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        count = -1 if options['format'] == 'csv' else 0  # sans la ligne d'en-tête
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} offres exportées dans {options['output']}."))
@@ -0,0 +1,180 @@
+"""
+Importer des offres en masse depuis un fichier CSV ou JSONL.
+
+Chaque ligne est validée par ``OfferForm`` (mêmes règles que la création
+depuis le site, y compris le découpage des compétences), puis les offres
+valides sont insérées par lots avec ``bulk_create``, un lot par transaction.
+Le fichier est lu en flux : la mémoire utilisée ne dépend que de la taille
+des lots, pas de celle du fichier.
+
+Colonnes attendues: company (nom d'utilisateur de l'entreprise, ou option
+--company), title, description, salary, skills (séparées par des virgules,
+ou liste JSON en JSONL), active (optionnelle, vraie par défaut).
+
+Usage:
+    python manage.py import_offers offres.csv
+    python manage.py import_offers offres.jsonl --batch-size 1000 --errors erreurs.csv
+    cat offres.jsonl | python manage.py import_offers - --format jsonl --company acme
+"""
+
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from home.models import Profile
+from jobs import board, facets
+from jobs.forms import OfferForm
+from jobs.models import Offer
+from jobs.skills import sync_skills_for_offers
+from jobs.tasks import schedule_alert_matching
+
+
+def read_csv(stream):
+    for line_number, row in enumerate(csv.DictReader(stream), start=2):
+        yield line_number, row
+
+
+def read_jsonl(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, exc
+            continue
+        yield line_number, row if isinstance(row, dict) else ValueError('objet JSON attendu')
+
+
+class Command(BaseCommand):
+    help = "Importe des offres d'emploi depuis un fichier CSV ou JSONL (lecture en flux, insertion par lots)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier à importer ('-' pour l'entrée standard)")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Format du fichier (déduit de l'extension par défaut)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Nombre d'offres insérées par transaction")
+        parser.add_argument('--company', help="Entreprise (nom d'utilisateur) pour les lignes sans colonne 'company'")
+        parser.add_argument('--errors', help="Fichier CSV du rapport d'erreurs (par défaut <fichier>.errors.csv)")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if path == '-' and not options['format']:
+            raise CommandError("Précisez --format quand le fichier est lu sur l'entrée standard.")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size doit être positif.')
+        errors_path = options['errors'] or f"{'import' if path == '-' else path}.errors.csv"
+
+        self.batch_size = options['batch_size']
+        self.default_company = options['company']
+        self.companies = {}
+        self.batch = []
+        self.stats = {'read': 0, 'imported': 0, 'rejected': 0}
+
+        source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        started = time.monotonic()
+        try:
+            with source, open(errors_path, 'w', newline='', encoding='utf-8') as errors_file:
+                self.errors = csv.writer(errors_file)
+                self.errors.writerow(['line', 'errors', 'row'])
+                reader = read_jsonl(source) if fmt == 'jsonl' else read_csv(source)
+                for line_number, row in reader:
+                    self.stats['read'] += 1
+                    self.handle_row(line_number, row)
+                    if len(self.batch) >= self.batch_size:
+                        self.flush()
+                self.flush()
+        except FileNotFoundError as exc:
+            raise CommandError(f'Fichier introuvable: {exc.filename}')
+
+        elapsed = time.monotonic() - started
+        rate = self.stats['imported'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.stats['imported']} offres importées, {self.stats['rejected']} rejetées "
+            f"sur {self.stats['read']} lignes en {elapsed:.2f}s ({rate:.0f} offres/s)."
+        ))
+        if self.stats['rejected']:
+            self.stdout.write(f"Rapport d'erreurs: {Path(errors_path).resolve()}")
+
+    def reject(self, line_number, message, row):
+        self.stats['rejected'] += 1
+        raw = row if isinstance(row, dict) else None
+        self.errors.writerow([line_number, message, json.dumps(raw, ensure_ascii=False, default=str)])
+
+    def get_company(self, username):
+        """Retrouver l'entreprise (mise en cache pour tout l'import)."""
+        if username not in self.companies:
+            self.companies[username] = (
+                User.objects
+                .filter(username=username, profile__user_type=Profile.USER_TYPE_COMPANY)
+                .values('id', 'last_name', 'username')
+                .first()
+            )
+        return self.companies[username]
+
+    def handle_row(self, line_number, row):
+        if isinstance(row, Exception):
+            self.reject(line_number, f'Ligne illisible: {row}', None)
+            return
+
+        company = self.get_company((row.get('company') or self.default_company or '').strip())
+        if company is None:
+            self.reject(line_number, "company: entreprise inconnue", row)
+            return
+
+        skills = row.get('skills') or ''
+        if isinstance(skills, list):
+            skills = ', '.join(str(skill) for skill in skills)
+        active = row.get('active', True)
+        if isinstance(active, str):
+            active = active.strip().lower() not in ('', '0', 'false', 'non', 'no')
+        form = OfferForm({
+            'title': row.get('title') or '',
+            'description': row.get('description') or '',
+            'salary': row.get('salary') if row.get('salary') not in (None, '') else '',
+            'active': active,
+            'skills_input': skills,
+        })
+        if not form.is_valid():
+            message = '; '.join(
+                f'{field}: {error}' for field, errors in form.errors.items() for error in errors
+            )
+            self.reject(line_number, message, row)
+            return
+
+        offer = form.save(commit=False)
+        offer.company_id = company['id']
+        self.batch.append((offer, company))
+
+    def flush(self):
+        """Insérer le lot courant et mettre à jour les index dérivés."""
+        if not self.batch:
+            return
+        offers = [offer for offer, _company in self.batch]
+        with transaction.atomic():
+            created = Offer.objects.bulk_create(offers)
+            # bulk_create ne déclenche pas les signaux : on fait leur travail en une fois
+            sync_skills_for_offers(created)
+            facets.count_offers(
+                {
+                    'salary': offer.salary,
+                    'skills': offer.skills,
+                    'company_id': company['id'],
+                    'company__last_name': company['last_name'],
+                    'company__username': company['username'],
+                    'publication_date': offer.publication_date,
+                }
+                for offer, company in self.batch
+                if offer.active
+            )
+            schedule_alert_matching(offer.pk for offer in created if offer.active)
+            board.bump_generation()
+        self.stats['imported'] += len(created)
+        self.batch = []
+        self.stdout.write(f"  {self.stats['imported']} offres importées...")
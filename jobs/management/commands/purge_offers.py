@@ -0,0 +1,43 @@
+"""
+Purger les offres supprimées par les entreprises.
+
+Une suppression depuis le site ne fait que désactiver et marquer l'offre
+(``deleted_at``, voir ``jobs.lifecycle``) ; cette commande, à lancer
+régulièrement (cron), la supprime vraiment, par lots, une fois passé
+``JOBS_PURGE_AFTER_DAYS``.
+
+Usage:
+    python manage.py purge_offers
+    python manage.py purge_offers --purge-after-days 0 --batch-size 1000
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs import lifecycle
+
+
+class Command(BaseCommand):
+    help = "Supprime définitivement, par lots, les offres supprimées par les entreprises."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=lifecycle.DEFAULT_BATCH_SIZE,
+                            help="Offres supprimées par transaction")
+        parser.add_argument('--purge-after-days', type=int, default=None,
+                            help="Purger les offres supprimées depuis ce nombre de jours (JOBS_PURGE_AFTER_DAYS)")
+        parser.add_argument('--dry-run', action='store_true', help="Compter sans rien supprimer")
+
+    def handle(self, *args, **options):
+        if options['purge_after_days'] is None:
+            before = lifecycle.purge_cutoff()
+        else:
+            before = timezone.now() - timedelta(days=options['purge_after_days'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{lifecycle.purgeable(before).count()} offre(s) à purger.")
+            return
+
+        purged = lifecycle.purge_deleted(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{purged} offre(s) purgée(s)."))
@@ -0,0 +1,21 @@
+"""
+Recalculer les compteurs de facettes du board.
+
+Usage:
+    python manage.py rebuild_facets
+"""
+
+from django.core.management.base import BaseCommand
+
+from jobs.facets import rebuild_facets
+from jobs.models import FacetCount
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de facettes (FacetCount) depuis les offres actives."
+
+    def handle(self, *args, **options):
+        rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(
+            f"{FacetCount.objects.count()} compteurs de facettes recalculés."
+        ))
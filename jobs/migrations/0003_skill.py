@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_offer_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Compétence',
+                'verbose_name_plural': 'Compétences',
+                'ordering': ['key'],
+            },
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, help_text="Compétences normalisées, synchronisées depuis 'skills'", related_name='offers', to='jobs.skill'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+# Longueur de Skill.key au moment de la migration
+SKILL_KEY_MAX_LENGTH = 100
+
+
+def canonical_skill_key(name):
+    """Copie figée de ``jobs.skills.canonical_skill_key``."""
+    return ' '.join(str(name).split()).casefold()[:SKILL_KEY_MAX_LENGTH]
+
+
+def backfill_skills(apps, schema_editor):
+    """Construire la table Skill et les liaisons à partir du JSON existant."""
+    Offer = apps.get_model('jobs', 'Offer')
+    Skill = apps.get_model('jobs', 'Skill')
+    Link = Offer.skill_tags.through
+
+    skill_ids = {}
+    links = []
+    for offer_id, names in Offer.objects.values_list('id', 'skills').iterator(chunk_size=BATCH_SIZE):
+        for name in names or []:
+            key = canonical_skill_key(name)
+            if not key:
+                continue
+            if key not in skill_ids:
+                skill, _ = Skill.objects.get_or_create(key=key, defaults={'name': ' '.join(str(name).split())[:100]})
+                skill_ids[key] = skill.id
+            links.append(Link(offer_id=offer_id, skill_id=skill_ids[key]))
+        if len(links) >= BATCH_SIZE:
+            Link.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    Link.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_skill'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_backfill_skills'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('salary', 'Salaire'), ('skill', 'Compétence'), ('company', 'Entreprise'), ('month', 'Mois de publication')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('label', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Compteur de facette',
+                'verbose_name_plural': 'Compteurs de facettes',
+                'indexes': [models.Index(fields=['facet', '-count'], name='facet_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='unique_facet_value')],
+            },
+        ),
+    ]
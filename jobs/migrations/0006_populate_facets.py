@@ -0,0 +1,76 @@
+from collections import Counter
+
+from django.db import migrations
+from django.utils import timezone
+
+# Copie figée de jobs.facets au moment de la migration
+FACET_FIELDS = ('salary', 'skills', 'company_id', 'company__last_name', 'company__username', 'publication_date')
+
+SALARY_BANDS = [
+    ('0-30000', None, 30000, 'Moins de 30 k€'),
+    ('30000-45000', 30000, 45000, '30 à 45 k€'),
+    ('45000-60000', 45000, 60000, '45 à 60 k€'),
+    ('60000-', 60000, None, 'Plus de 60 k€'),
+]
+
+SKILL_KEY_MAX_LENGTH = 100
+
+
+def salary_band(salary):
+    if salary is None:
+        return None
+    for value, low, high, label in SALARY_BANDS:
+        if (low is None or salary >= low) and (high is None or salary < high):
+            return value, label
+    return None
+
+
+def facet_entries(values):
+    entries = set()
+    band = salary_band(values['salary'])
+    if band:
+        entries.add(('salary', *band))
+    for name in values['skills'] or []:
+        key = ' '.join(str(name).split()).casefold()[:SKILL_KEY_MAX_LENGTH]
+        if key:
+            entries.add(('skill', key, ' '.join(str(name).split())))
+    company_label = values['company__last_name'] or values['company__username']
+    entries.add(('company', str(values['company_id']), company_label))
+    if values['publication_date']:
+        published = timezone.localtime(values['publication_date'])
+        entries.add(('month', published.strftime('%Y-%m'), published.strftime('%m/%Y')))
+    return entries
+
+
+def populate_facets(apps, schema_editor):
+    """Initialiser les compteurs de facettes depuis les offres actives."""
+    Offer = apps.get_model('jobs', 'Offer')
+    FacetCount = apps.get_model('jobs', 'FacetCount')
+
+    counts, labels = Counter(), {}
+    for values in Offer.objects.filter(active=True).values(*FACET_FIELDS).iterator(chunk_size=2000):
+        for facet, value, label in facet_entries(values):
+            counts[facet, value] += 1
+            labels[facet, value] = label
+    FacetCount.objects.bulk_create(
+        [
+            FacetCount(facet=facet, value=value, label=labels[facet, value], count=count)
+            for (facet, value), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def clear_facets(apps, schema_editor):
+    apps.get_model('jobs', 'FacetCount').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_facetcount'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_facets, clear_facets),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:39
+
+from django.db import migrations, models
+from django.db.models import F
+
+# SQL figé au moment de la migration (voir 0002_offer_search_index)
+FTS_TABLE = 'jobs_offer_fts'
+
+TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills)
+        VALUES (new.id, new.title, new.description, new.skills);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills)
+        VALUES ('delete', old.id, old.title, old.description, old.skills);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, skills ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills)
+        VALUES ('delete', old.id, old.title, old.description, old.skills);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills)
+        VALUES (new.id, new.title, new.description, new.skills);
+    END
+    """,
+]
+
+
+def backfill_updated_at(apps, schema_editor):
+    Offer = apps.get_model('jobs', 'Offer')
+    Offer.objects.update(updated_at=F('publication_date'))
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    # SQLite recrée jobs_offer pour ajouter la colonne : ses triggers FTS sont perdus.
+    # Les rowid étant conservés, l'index lui-même reste valide.
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in TRIGGERS_SQL:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_populate_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Date et heure de dernière modification'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-17 20:50
+
+import django.db.models.deletion
+import home.storage
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_offer_updated_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Application',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cv', models.FileField(blank=True, storage=home.storage.ContentAddressedStorage(), upload_to='profiles/cvs/')),
+                ('status', models.CharField(choices=[('sent', 'Envoyée'), ('viewed', 'Consultée'), ('accepted', 'Retenue'), ('rejected', 'Refusée')], default='sent', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to=settings.AUTH_USER_MODEL)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='received_applications', to=settings.AUTH_USER_MODEL)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.offer')),
+            ],
+            options={
+                'verbose_name': 'Candidature',
+                'verbose_name_plural': 'Candidatures',
+                'indexes': [models.Index(fields=['company', '-created_at', '-id'], name='application_inbox_idx'), models.Index(fields=['applicant', '-created_at', '-id'], name='application_history_idx')],
+                'constraints': [models.UniqueConstraint(fields=('applicant', 'offer'), name='unique_application')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 21:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_saved_search_alerts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('active', True)), fields=['-publication_date', '-id'], name='offer_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['company', '-publication_date'], name='offer_company_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.11 on 2026-10-17 21:24
+
+from datetime import timedelta
+
+import django.db.models.deletion
+import django.utils.timezone
+import jobs.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+# Copies figées au moment de la migration (voir jobs.models et 0007)
+DEFAULT_OFFER_LIFETIME_DAYS = 60
+FTS_TABLE = 'jobs_offer_fts'
+
+TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills)
+        VALUES (new.id, new.title, new.description, new.skills);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills)
+        VALUES ('delete', old.id, old.title, old.description, old.skills);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, skills ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills)
+        VALUES ('delete', old.id, old.title, old.description, old.skills);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills)
+        VALUES (new.id, new.title, new.description, new.skills);
+    END
+    """,
+]
+
+
+def backfill_expires_at(apps, schema_editor):
+    # Offres existantes : même durée de publication, comptée depuis leur publication
+    Offer = apps.get_model('jobs', 'Offer')
+    days = getattr(settings, 'JOBS_OFFER_LIFETIME_DAYS', DEFAULT_OFFER_LIFETIME_DAYS)
+    Offer.objects.update(expires_at=F('publication_date') + timedelta(days=days))
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    # SQLite recrée jobs_offer pour ajouter la colonne (voir 0007)
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in TRIGGERS_SQL:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_offer_board_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOffer',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('salary', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('skills', models.JSONField(blank=True, default=list)),
+                ('publication_date', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(help_text='Dernière modification avant archivage')),
+                ('expires_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Offre archivée',
+                'verbose_name_plural': 'Offres archivées',
+                'ordering': ['-publication_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='expires_at',
+            # Valeur par défaut du modèle, référencée par son chemin comme tout
+            # callable : seule la date des lignes existantes en dépend, et
+            # backfill_expires_at la remplace aussitôt
+            field=models.DateTimeField(default=jobs.models.default_expires_at, help_text="Fin de publication : l'offre est ensuite désactivée par archive_offers"),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_search_triggers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='application',
+            name='offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.offer'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('active', True)), fields=['expires_at'], name='offer_active_expiry_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedoffer',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_offers', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='archived_offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.archivedoffer'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedoffer',
+            index=models.Index(fields=['company', '-publication_date'], name='archived_offer_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedoffer',
+            index=models.Index(fields=['publication_date'], name='archived_offer_published_idx'),
+        ),
+    ]
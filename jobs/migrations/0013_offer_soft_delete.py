@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-17 21:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_offer_lifecycle'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, help_text="Suppression demandée : l'offre est désactivée puis purgée par purge_offers", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='offer_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-17 21:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_board_version(apps, schema_editor):
+    BoardVersion = apps.get_model('jobs', 'BoardVersion')
+    BoardVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_offer_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Version du board',
+                'verbose_name_plural': 'Versions du board',
+            },
+        ),
+        migrations.RunPython(create_board_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-17 22:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferSearchEntry',
+            fields=[
+                ('offer', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='jobs.offer')),
+                ('document', models.TextField(db_column='jobs_offer_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'verbose_name': "Entrée de l'index de recherche",
+                'verbose_name_plural': "Entrées de l'index de recherche",
+                'db_table': 'jobs_offer_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -5,9 +5,63 @@ Ce module contient le modèle Offer qui représente une offre d'emploi
 publiée par une entreprise.
 """
 
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from home.models import Profile
+from home.storage import content_addressed_storage
+
+
+class Skill(models.Model):
+    """
+    Compétence normalisée.
+
+    ``key`` est la forme canonique (casse repliée, espaces normalisés) qui
+    sert à dédoublonner « Python », « python » et « PYTHON » ; ``name`` garde
+    la première graphie rencontrée pour l'affichage.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        verbose_name = "Compétence"
+        verbose_name_plural = "Compétences"
+        ordering = ['key']
+
+    def __str__(self):
+        return self.name
+
+
+class OfferQuerySet(models.QuerySet):
+    """Requêtes réutilisables sur les offres."""
+
+    def active(self):
+        return self.filter(active=True)
+
+    def live(self):
+        """Offres dont la suppression n'a pas été demandée (voir ``deleted_at``)."""
+        return self.filter(deleted_at__isnull=True)
+
+    def with_company(self):
+        """
+        Charger l'entreprise et son profil dans la même requête (JOIN).
+
+        Évite une requête par offre quand le template ou ``__str__``
+        accèdent à ``offer.company`` ou ``offer.company.profile``.
+        """
+        return self.select_related('company', 'company__profile')
+
+
+DEFAULT_OFFER_LIFETIME_DAYS = 60
+
+
+def default_expires_at():
+    """Fin de publication d'une nouvelle offre (``JOBS_OFFER_LIFETIME_DAYS``)."""
+    days = getattr(settings, 'JOBS_OFFER_LIFETIME_DAYS', DEFAULT_OFFER_LIFETIME_DAYS)
+    return timezone.now() + timedelta(days=days)
 
 
 class Offer(models.Model):
@@ -21,8 +75,12 @@ class Offer(models.Model):
         - description: Description détaillée de l'offre
         - salary: Salaire proposé (optionnel)
         - skills: Liste de compétences requises au format JSON
+        - skill_tags: Les mêmes compétences, normalisées et indexées (table Skill)
         - publication_date: Date/heure de publication (auto-générée)
+        - updated_at: Date/heure de dernière modification (version de l'offre)
+        - expires_at: Fin de publication, l'offre est ensuite désactivée (voir ``jobs.lifecycle``)
         - active: Statut de l'offre (active ou archivée)
+        - deleted_at: Date de suppression par l'entreprise (inactive, purgée plus tard)
     """
     company = models.ForeignKey(
         User,
@@ -49,19 +107,304 @@ class Offer(models.Model):
         blank=True,
         help_text="Liste de compétences requises"
     )
+    skill_tags = models.ManyToManyField(
+        Skill,
+        related_name='offers',
+        blank=True,
+        help_text="Compétences normalisées, synchronisées depuis 'skills'"
+    )
     publication_date = models.DateTimeField(
         auto_now_add=True,
         help_text="Date et heure de publication automatiques"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Date et heure de dernière modification"
+    )
+    expires_at = models.DateTimeField(
+        default=default_expires_at,
+        help_text="Fin de publication : l'offre est ensuite désactivée par archive_offers"
+    )
     active = models.BooleanField(
         default=True,
         help_text="L'offre est-elle active?"
     )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Suppression demandée : l'offre est désactivée puis purgée par purge_offers"
+    )
+
+    objects = OfferQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Offre d'emploi"
         verbose_name_plural = "Offres d'emploi"
         ordering = ['-publication_date']
+        indexes = [
+            # MAX(updated_at) pour la version du board (GET conditionnel)
+            models.Index(fields=['updated_at'], name='offer_updated_at_idx'),
+            # Board : offres actives les plus récentes, curseur (publication_date, id).
+            # Partiel : les offres archivées n'alourdissent pas l'index
+            models.Index(
+                fields=['-publication_date', '-id'],
+                condition=models.Q(active=True),
+                name='offer_active_recent_idx',
+            ),
+            # Offres d'une entreprise (admin filtré, pages entreprise) dans l'ordre du board
+            models.Index(fields=['company', '-publication_date'], name='offer_company_recent_idx'),
+            # Offres actives expirées, à désactiver (archive_offers)
+            models.Index(fields=['expires_at'], condition=models.Q(active=True), name='offer_active_expiry_idx'),
+            # Offres supprimées, à purger (purge_offers)
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='offer_deleted_idx'),
+        ]
+
+    def __str__(self):
+        # ``company`` est déjà l'utilisateur : inutile de passer par company.profile.user
+        return f"{self.title} - {self.company} ({self.publication_date.year})"
+
+
+class OfferSearchEntry(models.Model):
+    """
+    Ligne de la table FTS5 ``jobs_offer_fts`` (SQLite), créée et tenue à
+    jour par ``jobs.search`` : Django ne la gère pas.
+
+    Déclarée pour joindre l'index à ``Offer`` dans l'ORM
+    (``offer.search_entry``) : ``document`` est la colonne cachée qui porte
+    le nom de la table, à gauche de ``MATCH`` ; ``rank`` est le score de
+    pertinence de la requête en cours.
+    """
+    offer = models.OneToOneField(
+        Offer, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='search_entry',
+    )
+    document = models.TextField(db_column='jobs_offer_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'jobs_offer_fts'
+        verbose_name = "Entrée de l'index de recherche"
+        verbose_name_plural = "Entrées de l'index de recherche"
+
+
+class ArchivedOffer(models.Model):
+    """
+    Offre retirée de la table ``Offer`` par ``manage.py archive_offers``.
+
+    Garde l'id et les champs de l'offre d'origine, sans les index du board
+    ni de la recherche : l'historique et les statistiques restent
+    disponibles sans alourdir la table des offres en ligne. Les
+    candidatures à l'offre pointent alors vers l'archive
+    (``Application.archived_offer``).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    company = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_offers')
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    publication_date = models.DateTimeField()
+    updated_at = models.DateTimeField(help_text="Dernière modification avant archivage")
+    expires_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Offre archivée"
+        verbose_name_plural = "Offres archivées"
+        ordering = ['-publication_date']
+        indexes = [
+            models.Index(fields=['company', '-publication_date'], name='archived_offer_company_idx'),
+            models.Index(fields=['publication_date'], name='archived_offer_published_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.company} ({self.publication_date.year}, archivée)"
+
+
+class FacetCount(models.Model):
+    """
+    Compteur pré-calculé d'offres actives pour une valeur de facette.
+
+    Maintenu incrémentalement par les signaux de ``Offer`` (voir
+    ``jobs.facets``) : le board lit quelques lignes au lieu de lancer un
+    ``COUNT ... GROUP BY`` sur toutes les offres.
+    """
+    FACET_SALARY = 'salary'
+    FACET_SKILL = 'skill'
+    FACET_COMPANY = 'company'
+    FACET_MONTH = 'month'
+    FACET_CHOICES = [
+        (FACET_SALARY, 'Salaire'),
+        (FACET_SKILL, 'Compétence'),
+        (FACET_COMPANY, 'Entreprise'),
+        (FACET_MONTH, 'Mois de publication'),
+    ]
+
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=100)
+    label = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Compteur de facette"
+        verbose_name_plural = "Compteurs de facettes"
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='unique_facet_value'),
+        ]
+        indexes = [
+            models.Index(fields=['facet', '-count'], name='facet_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_facet_display()}: {self.label} ({self.count})"
+
+
+class BoardVersion(models.Model):
+    """
+    Version du board : une seule ligne, incrémentée à chaque modification
+    qui peut changer son contenu (voir ``jobs.board``).
+
+    Mise à jour dans la transaction de la modification, par les signaux de
+    ``Offer`` et par les opérations en masse : le board lit cette ligne par
+    sa clé au lieu d'agréger toute la table des offres.
+    """
+    SINGLETON_ID = 1
+
+    generation = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Version du board"
+        verbose_name_plural = "Versions du board"
+
+    def __str__(self):
+        return f"Board v{self.generation} ({self.changed_at:%d/%m/%Y %H:%M})"
+
+
+class Application(models.Model):
+    """
+    Candidature d'un postulant à une offre.
+
+    L'entreprise est recopiée depuis l'offre (``company``) pour que la boîte
+    de réception se lise sur un seul index ``(company, -created_at, -id)``,
+    sans jointure ni tri en mémoire, quel que soit le nombre de candidatures.
+    Le CV est figé au moment de l'envoi : le stockage des CV est adressé par
+    le contenu et ne supprime jamais de fichier, recopier le nom suffit.
+    Quand l'offre est archivée, ``offer`` est vidé et ``archived_offer``
+    pointe vers son archive (voir ``listing``).
+    """
+    STATUS_SENT = 'sent'
+    STATUS_VIEWED = 'viewed'
+    STATUS_ACCEPTED = 'accepted'
+    STATUS_REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (STATUS_SENT, 'Envoyée'),
+        (STATUS_VIEWED, 'Consultée'),
+        (STATUS_ACCEPTED, 'Retenue'),
+        (STATUS_REJECTED, 'Refusée'),
+    ]
+
+    applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='applications')
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, null=True, blank=True, related_name='applications')
+    archived_offer = models.ForeignKey(
+        ArchivedOffer, on_delete=models.CASCADE, null=True, blank=True, related_name='applications',
+    )
+    company = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_applications')
+    cv = models.FileField(upload_to='profiles/cvs/', storage=content_addressed_storage, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_SENT)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Candidature"
+        verbose_name_plural = "Candidatures"
+        constraints = [
+            models.UniqueConstraint(fields=['applicant', 'offer'], name='unique_application'),
+        ]
+        indexes = [
+            # Boîte de réception de l'entreprise et historique du postulant
+            models.Index(fields=['company', '-created_at', '-id'], name='application_inbox_idx'),
+            models.Index(fields=['applicant', '-created_at', '-id'], name='application_history_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.applicant} → {self.offer_id or self.archived_offer_id} ({self.get_status_display()})"
+
+    @property
+    def listing(self):
+        """Offre de la candidature, en ligne ou archivée."""
+        return self.offer if self.offer_id is not None else self.archived_offer
+
+
+class SavedSearch(models.Model):
+    """
+    Recherche enregistrée par un postulant, pour être alerté des nouvelles offres.
+
+    Une offre correspond si elle contient tous les mots-clés, toutes les
+    compétences et si son salaire atteint ``salary_min``. Les termes requis
+    sont indexés dans ``SavedSearchTerm`` (voir ``jobs.alerts``) ;
+    ``term_count`` est leur nombre.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100)
+    query = models.CharField(max_length=255, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    term_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Recherche enregistrée"
+        verbose_name_plural = "Recherches enregistrées"
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='saved_search_user_idx'),
+            # Recherches sans terme (salaire seul) : candidates pour toutes les offres
+            models.Index(fields=['term_count'], name='saved_search_term_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.user})"
+
+
+class SavedSearchTerm(models.Model):
+    """
+    Entrée de l'index inversé des recherches enregistrées.
+
+    ``term`` vaut ``skill:<clé>`` ou ``kw:<mot normalisé>`` : une nouvelle
+    offre ne lit que les recherches qui partagent au moins un de ses termes.
+    """
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=110)
+
+    class Meta:
+        verbose_name = "Terme de recherche enregistrée"
+        verbose_name_plural = "Termes de recherches enregistrées"
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'saved_search'], name='unique_saved_search_term'),
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+class JobAlert(models.Model):
+    """Offre trouvée pour une recherche enregistrée, en attente d'envoi groupé."""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='alerts')
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='alerts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_alerts')
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Alerte"
+        verbose_name_plural = "Alertes"
+        constraints = [
+            models.UniqueConstraint(fields=['saved_search', 'offer'], name='unique_job_alert'),
+        ]
+        indexes = [
+            models.Index(fields=['delivered_at', 'user'], name='job_alert_pending_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.company.profile.user} ({self.publication_date.year})"
+        return f"{self.saved_search} → {self.offer_id}"
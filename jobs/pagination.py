@@ -0,0 +1,217 @@
+"""
+Pagination par curseur (keyset) pour les listes d'offres.
+
+Contrairement à la pagination par OFFSET, chaque page est obtenue en filtrant
+sur la clé de tri de la dernière ligne vue, par exemple
+``(publication_date, id) < (date, 42)``. Ce filtre est borné sur le
+premier champ de tri (``publication_date <= date``) : la base cherche le
+curseur dans l'index au lieu de le parcourir depuis le début, et le coût
+d'une page reste constant quelle que soit sa position dans la liste.
+
+Les curseurs sont des chaînes opaques (JSON encodé en base64 urlsafe)
+contenant les valeurs de la clé de tri de la ligne limite.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Levée quand un curseur reçu ne peut pas être décodé ou ne colle pas à la clé de tri."""
+
+
+def encode_cursor(values):
+    """Encoder les valeurs de la clé de tri en curseur opaque."""
+    payload = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Décoder un curseur produit par ``encode_cursor``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def get_page_size(request, default=None, maximum=None):
+    """
+    Lire la taille de page depuis ``?size=``.
+
+    Par défaut, la valeur vient du setting ``JOBS_PAGE_SIZE`` et la taille
+    est bornée par ``JOBS_MAX_PAGE_SIZE``.
+    """
+    if default is None:
+        default = getattr(settings, 'JOBS_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    if maximum is None:
+        maximum = getattr(settings, 'JOBS_MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+    try:
+        size = int(request.GET.get('size', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+class KeysetPage:
+    """Une page de résultats avec ses curseurs précédent/suivant."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, page_size):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.page_size = page_size
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginer un queryset sur une clé de tri unique.
+
+    ``ordering`` est une liste de champs au format ``order_by`` (``'-id'``
+    pour un tri descendant). Le dernier champ doit rendre la clé unique
+    (en pratique la clé primaire) pour que les curseurs soient stables.
+
+    Usage:
+        paginator = KeysetPaginator(offers, ordering=('-publication_date', '-id'))
+        page = paginator.get_page(after=request.GET.get('after'))
+        page = await paginator.aget_page(after=...)  # dans une vue async
+    """
+
+    def __init__(self, queryset, ordering=('-publication_date', '-id'), page_size=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.page_size = page_size
+
+    def _boundary_filter(self, values, forward):
+        """
+        Construire le filtre ``(a, b) > (x, y)`` développé en OR de AND,
+        précédé de la borne ``a >= x``. Sans cette borne, l'OR empêche
+        SQLite de chercher le curseur dans l'index composite : la page est
+        lue en parcourant l'index depuis le début.
+        """
+        condition = Q()
+        for position, field in enumerate(self.fields):
+            descending = self.ordering[position].startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            clause = Q(**{f'{field}__{lookup}': values[position]})
+            for previous, value in zip(self.fields[:position], values[:position]):
+                clause &= Q(**{previous: value})
+            condition |= clause
+        if len(self.fields) > 1:
+            descending = self.ordering[0].startswith('-')
+            lookup = 'lte' if descending == forward else 'gte'
+            condition &= Q(**{f'{self.fields[0]}__{lookup}': values[0]})
+        return condition
+
+    def _sort_field(self, name):
+        """Champ du modèle ou annotation (``search_rank``...) de la clé de tri."""
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def _cursor_values(self, cursor):
+        """
+        Décoder ``cursor`` et convertir ses valeurs au type des champs de
+        tri. Un curseur décodable mais aux valeurs inattendues (nombre de
+        valeurs, ``null``, liste, date invalide...) lève ``InvalidCursor``.
+        """
+        values = decode_cursor(cursor)
+        if len(values) != len(self.fields):
+            raise InvalidCursor(cursor)
+        converted = []
+        for name, value in zip(self.fields, values):
+            if not isinstance(value, (str, int, float)):
+                raise InvalidCursor(cursor)
+            try:
+                converted.append(self._sort_field(name).to_python(value))
+            except (ValidationError, TypeError, ValueError) as exc:
+                raise InvalidCursor(cursor) from exc
+        return converted
+
+    def _filter_from(self, queryset, cursor, forward):
+        return queryset.filter(self._boundary_filter(self._cursor_values(cursor), forward))
+
+    def _reversed_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def cursor_for(self, obj):
+        """Curseur désignant ``obj`` (instance ou dict issu de ``.values()``)."""
+        if isinstance(obj, dict):
+            return encode_cursor([obj[field] for field in self.fields])
+        return encode_cursor([getattr(obj, field) for field in self.fields])
+
+    def get_queryset(self, after=None, before=None):
+        """
+        Retourner le queryset trié des lignes situées après ``after`` (ou
+        avant ``before``, en ordre inverse), sans limite de taille.
+        """
+        if before:
+            return (
+                self._filter_from(self.queryset, before, forward=False)
+                .order_by(*self._reversed_ordering())
+            )
+        queryset = self.queryset
+        if after:
+            queryset = self._filter_from(queryset, after, forward=True)
+        return queryset.order_by(*self.ordering)
+
+    def get_page(self, after=None, before=None):
+        """
+        Retourner la page qui suit le curseur ``after`` ou qui précède le
+        curseur ``before``. Sans curseur, retourne la première page.
+        """
+        queryset = self.get_queryset(after=after, before=before)
+
+        # Une ligne de plus pour savoir s'il existe une page au-delà
+        rows = list(queryset[:self.page_size + 1])
+        return self._build_page(rows, after, before)
+
+    async def aget_page(self, after=None, before=None):
+        """Version async de ``get_page``, lue avec ``aiterator()``."""
+        queryset = self.get_queryset(after=after, before=before)
+        rows = [row async for row in queryset[:self.page_size + 1].aiterator()]
+        return self._build_page(rows, after, before)
+
+    def _build_page(self, rows, after, before):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if before:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(after)
+
+        next_cursor = self.cursor_for(rows[-1]) if rows and has_next else None
+        previous_cursor = self.cursor_for(rows[0]) if rows and has_previous else None
+        return KeysetPage(rows, next_cursor, previous_cursor, self.page_size)
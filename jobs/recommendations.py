@@ -0,0 +1,434 @@
+"""
+Recommandations d'offres pour les postulants (« Pour vous »).
+
+Chaque offre active est représentée par un vecteur TF-IDF creux sur les
+mêmes termes que les alertes (``kw:<mot>`` normalisé comme dans
+``jobs.search``, ``skill:<clé>``), pondérés par leur origine : titre >
+description, compétences au-dessus de tout. Les termes sont projetés sur
+``N_FEATURES`` colonnes par hachage (pas de vocabulaire à maintenir).
+
+L'index vit en mémoire dans chaque processus (``OfferIndex``) :
+
+- une matrice CSR SciPy des fréquences (tf sous-linéaire), une ligne par
+  offre, et le vecteur des fréquences documentaires (df) tenu à jour à
+  chaque ajout/retrait ; l'IDF est recalculé à la volée ;
+- une offre enregistrée (signal ``post_save``, après commit) remplace sa
+  ligne : l'ancienne est marquée morte, la nouvelle attend dans un tampon
+  empilé en une fois à la requête suivante ; les lignes mortes sont
+  compactées au-delà de ``COMPACT_RATIO`` ;
+- les écritures des autres processus sont rattrapées à chaque requête par
+  ``updated_at`` ; si le nombre d'offres actives diverge (suppressions),
+  l'index est reconstruit. Ces lectures en base et la reconstruction se
+  font hors du verrou de l'index, qui n'est tenu que pour le modifier ou
+  l'interroger en mémoire : les signaux des autres requêtes n'attendent
+  pas une synchronisation.
+
+Le score d'une offre est son produit scalaire TF-IDF avec le profil,
+divisé par la norme de l'offre (ordre identique au cosinus) : un seul
+produit matrice-vecteur pour toutes les offres, puis ``argpartition``
+pour les k meilleures.
+
+Le profil d'un postulant est construit à partir de son adresse, du texte
+de son CV (.docx/.odt ; les PDF ne sont pas lus), de ses recherches
+enregistrées et des offres auxquelles il a postulé.
+
+NumPy et SciPy sont optionnels : sans eux, les recommandations se
+rabattent sur les offres récentes partageant une compétence du profil.
+"""
+
+import html
+import logging
+import math
+import re
+import threading
+import zipfile
+import zlib
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .alerts import KEYWORD_PREFIX, SKILL_PREFIX
+from .models import Application, Offer, SavedSearch
+from .search import tokenize
+from .skills import canonical_skill_key, skills_filter
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+HAS_NUMPY = np is not None
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 2 ** 18
+DEFAULT_LIMIT = 20
+
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+SKILL_WEIGHT = 3.0
+
+# Part de lignes mortes au-delà de laquelle la matrice est recompactée
+COMPACT_RATIO = 0.25
+
+# Texte de CV pris en compte (caractères), mis en cache par fichier
+MAX_CV_CHARS = 20_000
+CV_CACHE_TIMEOUT = 24 * 60 * 60
+CV_XML_MEMBERS = {
+    '.docx': 'word/document.xml',
+    '.odt': 'content.xml',
+}
+# Candidatures récentes prises en compte dans le profil
+MAX_PROFILE_APPLICATIONS = 50
+
+
+def offer_weights(title, description, skills):
+    """Poids bruts des termes d'une offre."""
+    weights = Counter()
+    for word in tokenize(title or ''):
+        weights[f'{KEYWORD_PREFIX}{word}'] += TITLE_WEIGHT
+    for word in tokenize(description or ''):
+        weights[f'{KEYWORD_PREFIX}{word}'] += DESCRIPTION_WEIGHT
+    for skill in skills or []:
+        key = canonical_skill_key(skill)
+        if key:
+            weights[f'{SKILL_PREFIX}{key}'] += SKILL_WEIGHT
+    return weights
+
+
+def hash_features(weights):
+    """
+    Projeter des poids de termes sur ``N_FEATURES`` colonnes.
+
+    Retourne ``(colonnes triées, valeurs)`` avec une fréquence sous-linéaire
+    ``1 + log(poids)``.
+    """
+    features = {}
+    for term, weight in weights.items():
+        if weight > 0:
+            column = zlib.crc32(term.encode()) % N_FEATURES
+            features[column] = features.get(column, 0.0) + weight
+    columns = sorted(features)
+    return columns, [1.0 + math.log(max(features[column], 1.0)) for column in columns]
+
+
+class OfferIndex:
+    """
+    Matrice TF des offres actives, modifiable ligne par ligne.
+
+    Non thread-safe : les appels passent par le verrou du module.
+    """
+
+    def __init__(self):
+        if not HAS_NUMPY:
+            raise RuntimeError("NumPy et SciPy sont requis pour l'index de recommandations")
+        self.matrix = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.df = np.zeros(N_FEATURES, dtype=np.int32)
+        self.rows = {}
+        self.pending = {}
+        self.dead = 0
+        self.synced_at = None
+        self._norms = None
+
+    def __len__(self):
+        return len(self.rows) + len(self.pending)
+
+    def __contains__(self, offer_id):
+        return offer_id in self.rows or offer_id in self.pending
+
+    def upsert(self, offer_id, columns, values):
+        """Ajouter ou remplacer le vecteur d'une offre."""
+        self.remove(offer_id)
+        columns = np.asarray(columns, dtype=np.int32)
+        self.pending[offer_id] = (columns, np.asarray(values, dtype=np.float32))
+        self.df[columns] += 1
+        self._norms = None
+
+    def remove(self, offer_id):
+        """Retirer une offre (sans effet si elle n'est pas indexée)."""
+        pending = self.pending.pop(offer_id, None)
+        if pending is not None:
+            self.df[pending[0]] -= 1
+            self._norms = None
+        row = self.rows.pop(offer_id, None)
+        if row is not None:
+            start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+            self.df[self.matrix.indices[start:end]] -= 1
+            self.alive[row] = False
+            self.dead += 1
+            self._norms = None
+
+    def _materialize(self):
+        """Empiler le tampon dans la matrice et compacter les lignes mortes."""
+        if self.pending:
+            ids = list(self.pending)
+            blocks = [self.pending[offer_id] for offer_id in ids]
+            indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(columns) for columns, _values in blocks])
+            block = sparse.csr_matrix(
+                (
+                    np.concatenate([values for _columns, values in blocks]),
+                    np.concatenate([columns for columns, _values in blocks]),
+                    indptr,
+                ),
+                shape=(len(ids), N_FEATURES),
+            )
+            start = len(self.ids)
+            self.matrix = sparse.vstack([self.matrix, block], format='csr')
+            self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+            self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+            self.rows.update(zip(ids, range(start, start + len(ids))))
+            self.pending.clear()
+        if self.dead and self.dead > COMPACT_RATIO * len(self.ids):
+            keep = np.flatnonzero(self.alive)
+            self.matrix = self.matrix[keep]
+            self.ids = self.ids[keep]
+            self.alive = np.ones(len(keep), dtype=bool)
+            self.rows = dict(zip(self.ids.tolist(), range(len(keep))))
+            self.dead = 0
+            self._norms = None
+
+    def idf(self):
+        """IDF lissé : ``log((1 + n) / (1 + df)) + 1``."""
+        return (np.log((1.0 + len(self)) / (1.0 + self.df)) + 1.0).astype(np.float32)
+
+    def top_k(self, columns, values, k=DEFAULT_LIMIT, exclude=()):
+        """
+        Retourner les ``k`` offres les plus proches du vecteur requête
+        ``(columns, values)`` sous forme de ``[(offer_id, score), ...]``,
+        par score décroissant, sans les offres ``exclude`` ni les scores nuls.
+        """
+        self._materialize()
+        if not len(self.ids) or not len(columns) or k <= 0:
+            return []
+        idf = self.idf()
+        if self._norms is None:
+            squared = self.matrix.copy()
+            squared.data **= 2
+            norms = np.sqrt(squared @ (idf ** 2))
+            norms[norms == 0] = 1.0
+            self._norms = norms
+
+        columns = np.asarray(columns, dtype=np.int32)
+        query = np.zeros(N_FEATURES, dtype=np.float32)
+        query[columns] = np.asarray(values, dtype=np.float32) * idf[columns] ** 2
+        scores = (self.matrix @ query) / self._norms
+        scores[~self.alive] = 0
+        excluded = [self.rows[offer_id] for offer_id in exclude if offer_id in self.rows]
+        if excluded:
+            scores[excluded] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return list(zip(self.ids[order].tolist(), scores[order].tolist()))
+
+
+_index = None
+# Protège ``_index`` et ses modifications, toutes en mémoire : les lectures
+# en base et la construction d'un index se font hors de ce verrou
+_lock = threading.Lock()
+# Une seule synchronisation sur la base à la fois dans ce processus
+_sync_lock = threading.Lock()
+
+
+def _offer_vector(offer):
+    """Vecteur d'une offre (instance ou dict de ``values()``)."""
+    get = offer.get if isinstance(offer, dict) else lambda field: getattr(offer, field)
+    return hash_features(offer_weights(get('title'), get('description'), get('skills')))
+
+
+def _changes(since):
+    """
+    Offres modifiées depuis ``since`` (toutes les offres actives si None),
+    en ``[(offer_id, vecteur ou None si inactive, updated_at), ...]``.
+    """
+    offers = Offer.objects.values('id', 'title', 'description', 'skills', 'active', 'updated_at')
+    if since is None:
+        offers = offers.filter(active=True)
+    else:
+        # >= : une écriture de la même microseconde ne doit pas être perdue
+        offers = offers.filter(updated_at__gte=since)
+    return [
+        (offer['id'], _offer_vector(offer) if offer['active'] else None, offer['updated_at'])
+        for offer in offers.iterator(chunk_size=2000)
+    ]
+
+
+def _apply(index, changes):
+    """Appliquer à ``index`` des modifications lues par ``_changes``."""
+    for offer_id, vector, updated_at in changes:
+        if vector is None:
+            index.remove(offer_id)
+        else:
+            index.upsert(offer_id, *vector)
+        if index.synced_at is None or updated_at > index.synced_at:
+            index.synced_at = updated_at
+
+
+def _build_index():
+    """Nouvel index de toutes les offres actives, prêt à être interrogé."""
+    index = OfferIndex()
+    _apply(index, _changes(None))
+    index._materialize()
+    return index
+
+
+def _synced_index():
+    """
+    Index de ce processus, chargé au premier appel puis rattrapé sur la base.
+
+    Si un autre thread synchronise déjà l'index, il est retourné tel quel.
+    Un index reconstruit remplace l'ancien une fois prêt.
+    """
+    global _index
+    with _lock:
+        current = _index
+    if not _sync_lock.acquire(blocking=current is None):
+        return current
+    try:
+        with _lock:
+            current = _index
+            since = current.synced_at if current is not None else None
+        if current is None:
+            index = _build_index()
+        else:
+            index = current
+            changes = _changes(since)
+            with _lock:
+                _apply(index, changes)
+        active_count = Offer.objects.active().count()
+        with _lock:
+            stale = active_count != len(index)
+        if stale:
+            # Offres supprimées ou désactivées sans mise à jour de updated_at
+            logger.info('Index de recommandations reconstruit')
+            index = _build_index()
+        with _lock:
+            # Sauf si reset_index() est passé entre-temps
+            if _index is current:
+                _index = index
+        return index
+    finally:
+        _sync_lock.release()
+
+
+def reset_index():
+    """Oublier l'index de ce processus (reconstruit à la prochaine requête)."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def _apply_offer_change(offer_id, vector):
+    with _lock:
+        if _index is None:
+            return
+        if vector is None:
+            _index.remove(offer_id)
+        else:
+            _index.upsert(offer_id, *vector)
+
+
+def offer_saved(offer):
+    """Répercuter l'enregistrement d'une offre sur l'index, après commit."""
+    if not HAS_NUMPY:
+        return
+    vector = _offer_vector(offer) if offer.active else None
+    transaction.on_commit(lambda: _apply_offer_change(offer.pk, vector))
+
+
+def offer_deleted(offer_id):
+    """Retirer une offre supprimée de l'index, après commit."""
+    if HAS_NUMPY:
+        transaction.on_commit(lambda: _apply_offer_change(offer_id, None))
+
+
+def cv_text(cv):
+    """
+    Texte brut d'un CV .docx ou .odt (chaîne vide pour les autres formats).
+
+    Mis en cache par nom de fichier : les CV sont stockés sous le hash de
+    leur contenu, un même nom désigne toujours le même texte.
+    """
+    if not cv:
+        return ''
+    member = next((name for ext, name in CV_XML_MEMBERS.items() if cv.name.lower().endswith(ext)), None)
+    if member is None:
+        return ''
+    key = f'recommendations:cv-text:{cv.name}'
+    text = cache.get(key)
+    if text is None:
+        try:
+            with cv.open('rb') as source, zipfile.ZipFile(source) as archive:
+                xml = archive.read(member).decode('utf-8', errors='ignore')
+        except (OSError, KeyError, zipfile.BadZipFile):
+            logger.warning('CV illisible: %s', cv.name)
+            xml = ''
+        text = html.unescape(re.sub(r'<[^>]+>', ' ', xml))[:MAX_CV_CHARS]
+        cache.set(key, text, timeout=CV_CACHE_TIMEOUT)
+    return text
+
+
+def profile_weights(user):
+    """Poids des termes du profil d'un postulant."""
+    weights = Counter()
+    profile = getattr(user, 'profile', None)
+    if profile is not None:
+        for word in tokenize(profile.address or ''):
+            weights[f'{KEYWORD_PREFIX}{word}'] += DESCRIPTION_WEIGHT
+        for word in tokenize(cv_text(profile.cv)):
+            weights[f'{KEYWORD_PREFIX}{word}'] += DESCRIPTION_WEIGHT
+    for query, skills in SavedSearch.objects.filter(user=user).values_list('query', 'skills'):
+        weights.update(offer_weights(query, '', skills))
+    applied = (
+        Application.objects
+        .filter(applicant=user, offer__isnull=False)
+        .order_by('-created_at')
+        .values_list('offer__title', 'offer__skills')[:MAX_PROFILE_APPLICATIONS]
+    )
+    for title, skills in applied:
+        weights.update(offer_weights(title, '', skills))
+    return weights
+
+
+def _recent_offer_ids(weights, exclude, limit):
+    """Repli sans NumPy : offres récentes partageant au moins une compétence du profil."""
+    offers = Offer.objects.active().exclude(id__in=exclude)
+    skill_keys = [term[len(SKILL_PREFIX):] for term in weights if term.startswith(SKILL_PREFIX)]
+    if skill_keys:
+        offers = offers.filter(skills_filter(skill_keys, match_all=False))
+    return list(offers.order_by('-publication_date', '-id').values_list('id', flat=True)[:limit])
+
+
+def recommend(user, limit=DEFAULT_LIMIT):
+    """
+    Offres actives recommandées à ``user``, les plus pertinentes en premier.
+
+    Les offres auxquelles il a déjà postulé sont exclues. Sans signal
+    exploitable dans le profil, retourne les offres les plus récentes.
+    """
+    weights = profile_weights(user)
+    exclude = set(Application.objects.filter(applicant=user).values_list('offer_id', flat=True))
+    if HAS_NUMPY:
+        columns, values = hash_features(weights)
+        index = _synced_index()
+        with _lock:
+            offer_ids = [offer_id for offer_id, _score in index.top_k(columns, values, limit, exclude)]
+        if not offer_ids:
+            offer_ids = _recent_offer_ids({}, exclude, limit)
+    else:
+        offer_ids = _recent_offer_ids(weights, exclude, limit)
+
+    offers = Offer.objects.active().with_company().in_bulk(offer_ids)
+    missing = [offer_id for offer_id in offer_ids if offer_id not in offers]
+    if missing and HAS_NUMPY:
+        # Supprimées depuis un autre processus
+        for offer_id in missing:
+            _apply_offer_change(offer_id, None)
+    return [offers[offer_id] for offer_id in offer_ids if offer_id in offers]
@@ -0,0 +1,210 @@
+"""
+Recherche plein texte dans les offres d'emploi.
+
+Sous SQLite, les offres sont indexées dans une table virtuelle FTS5
+(``jobs_offer_fts``) à contenu externe : elle ne stocke que l'index inversé
+et relit ``jobs_offer`` pour le reste. Des triggers SQL la tiennent à jour
+à chaque INSERT/UPDATE/DELETE, y compris pour les opérations en masse qui
+ne déclenchent pas les signaux Django.
+
+- tokenizer ``unicode61 remove_diacritics 2`` : insensible à la casse et
+  aux accents (« développeur » == « developpeur ») ;
+- index de préfixes sur 2 et 3 caractères : « dev » trouve « développeur » ;
+- classement BM25 pondéré : titre > compétences > description, lu dans la
+  colonne ``rank`` de la table FTS jointe à ``jobs_offer`` (modèle non
+  géré ``OfferSearchEntry`` et lookup ``match``).
+
+Sur les autres backends, on retombe sur des ``icontains`` (sans classement).
+"""
+
+import re
+import unicodedata
+
+from django.db import connections, DEFAULT_DB_ALIAS, OperationalError
+from django.db.models import F, Lookup, Q
+from django.db.models.expressions import RawSQL
+
+from .models import OfferSearchEntry
+
+FTS_TABLE = 'jobs_offer_fts'
+
+# Poids BM25 des colonnes indexées (title, description, skills)
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+# Mots trop fréquents en français pour être discriminants
+FRENCH_STOP_WORDS = frozenset("""
+    a au aux avec ce ces dans de des du elle en et eux il je la le les leur
+    lui ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu
+    que qui sa se ses son sur ta te tes toi ton tu un une vos votre vous c d
+    j l m n s t y est sont
+""".split())
+
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, skills,
+        content='jobs_offer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+]
+
+TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills)
+        VALUES (new.id, new.title, new.description, new.skills);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills)
+        VALUES ('delete', old.id, old.title, old.description, old.skills);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, skills ON jobs_offer BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, skills)
+        VALUES ('delete', old.id, old.title, old.description, old.skills);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, skills)
+        VALUES (new.id, new.title, new.description, new.skills);
+    END
+    """,
+]
+
+DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+_fts_available = {}
+
+
+class Match(Lookup):
+    """``champ MATCH valeur`` : requête FTS5 ou, sur ``rank``, fonction de classement."""
+
+    lookup_name = 'match'
+    # Chaîne passée telle quelle, quel que soit le type du champ (``rank``)
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+for _field in ('document', 'rank'):
+    OfferSearchEntry._meta.get_field(_field).register_lookup(Match)
+
+
+def install_search_index(connection, rebuild=True):
+    """
+    Créer la table FTS5 et ses triggers puis (ré)indexer toutes les offres.
+
+    Sans effet hors SQLite ou si SQLite est compilé sans FTS5. Les
+    migrations n'importent pas ce module : celles qui recréent la table
+    ``jobs_offer`` recopient ``TRIGGERS_SQL`` pour réinstaller les
+    triggers, supprimés avec l'ancienne table (voir ``0007``).
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        try:
+            for statement in CREATE_SQL + TRIGGERS_SQL:
+                cursor.execute(statement)
+        except OperationalError:
+            # SQLite sans FTS5 : la recherche utilisera le fallback icontains
+            return
+        if rebuild:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _fts_available.pop(connection.alias, None)
+
+
+def uninstall_search_index(connection):
+    """Supprimer la table FTS5 et ses triggers."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SQL:
+            cursor.execute(statement)
+    _fts_available.pop(connection.alias, None)
+
+
+def fts_available(using=DEFAULT_DB_ALIAS):
+    """Indiquer si l'index FTS5 existe sur la base ``using``."""
+    if using not in _fts_available:
+        connection = connections[using]
+        _fts_available[using] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[using]
+
+
+def normalize(text):
+    """Mettre en minuscules et retirer les accents (« Élève » -> « eleve »)."""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """Découper un texte en termes normalisés, sans les mots vides."""
+    return [
+        term for term in re.findall(r'\w+', normalize(text))
+        if term not in FRENCH_STOP_WORDS
+    ]
+
+
+def build_match_expression(query):
+    """
+    Traduire une saisie utilisateur en expression MATCH FTS5.
+
+    Chaque terme est cité (pas d'injection de syntaxe FTS5) et suivi de
+    ``*`` pour la recherche par préfixe ; les termes sont combinés en ET.
+    """
+    return ' '.join(f'"{term}"*' for term in tokenize(query))
+
+
+def search_filter(query, using=DEFAULT_DB_ALIAS):
+    """
+    Retourner un ``Q`` qui sélectionne les offres correspondant à ``query``.
+
+    Utilisable seul (admin) ou combiné à d'autres filtres.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return Q(pk__in=[])
+    if fts_available(using):
+        return Q(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [build_match_expression(query)],
+        ))
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return condition
+
+
+def search_offers(queryset, query, using=DEFAULT_DB_ALIAS):
+    """
+    Filtrer ``queryset`` sur ``query`` et retourner ``(queryset, ordering)``.
+
+    Avec FTS5, la table ``jobs_offer_fts`` est jointe une seule fois
+    (``search_entry``) : le même parcours MATCH sélectionne les offres et
+    fournit leur ``rank`` (BM25 pondéré, plus petit = plus pertinent),
+    annoté en ``search_rank``.
+    L'ordre retourné trie par pertinence puis par id, ce qui reste
+    compatible avec la pagination par curseur.
+    """
+    if not fts_available(using) or not tokenize(query):
+        return queryset.filter(search_filter(query, using)), ('-publication_date', '-id')
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    queryset = queryset.filter(
+        search_entry__document__match=build_match_expression(query),
+        # Fonction de classement de la colonne ``rank`` pour cette requête
+        search_entry__rank__match=f'bm25({weights})',
+    )
+    return queryset.annotate(search_rank=F('search_entry__rank')), ('search_rank', '-id')
@@ -0,0 +1,143 @@
+"""
+Signaux de l'application jobs.
+
+Les receivers sont connectés au démarrage par ``JobsConfig.ready()``.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from home.models import Profile
+from . import board, facets, fragments, recommendations
+from .alerts import index_saved_search
+from .models import FacetCount, Offer, SavedSearch
+from .skills import sync_offer_skills
+from .tasks import schedule_alert_matching
+
+# Champs dont dépendent les compteurs de facettes
+FACET_SOURCE_FIELDS = {'salary', 'skills', 'company', 'publication_date', 'active'}
+
+# Champs de l'entreprise affichés dans les cartes d'offres
+CARD_USER_FIELDS = {'last_name', 'email'}
+
+
+@receiver(post_save, sender=Offer, dispatch_uid='jobs_sync_offer_skills')
+def sync_skills_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Tenir ``skill_tags`` à jour quand la liste ``skills`` d'une offre change."""
+    if raw or (update_fields is not None and 'skills' not in update_fields):
+        return
+    sync_offer_skills(instance)
+
+
+def _touches_facets(update_fields):
+    return update_fields is None or bool(FACET_SOURCE_FIELDS & set(update_fields))
+
+
+@receiver(pre_save, sender=Offer, dispatch_uid='jobs_facets_before_save')
+def remember_facets_before_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Mémoriser l'état de l'offre avant modification pour calculer le delta."""
+    if raw or not _touches_facets(update_fields):
+        return
+    instance._facet_previous = None
+    if instance.pk:
+        instance._facet_previous = (
+            Offer.objects.filter(pk=instance.pk, active=True).values(*facets.FACET_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Offer, dispatch_uid='jobs_facets_after_save')
+def update_facets_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches_facets(update_fields):
+        return
+    previous = getattr(instance, '_facet_previous', None)
+    current = facets.offer_values(instance) if instance.active else None
+    facets.offer_changed(previous, current)
+    instance._facet_previous = current
+
+
+@receiver(post_delete, sender=Offer, dispatch_uid='jobs_facets_after_delete')
+def update_facets_on_delete(sender, instance, **kwargs):
+    if instance.active:
+        facets.offer_changed(facets.offer_values(instance), None)
+
+
+@receiver(post_save, sender=User, dispatch_uid='jobs_facets_company_label')
+def update_company_facet_label(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Répercuter le nom de l'entreprise sur le libellé de sa facette."""
+    if raw or (update_fields is not None and not {'last_name', 'username'} & set(update_fields)):
+        return
+    FacetCount.objects.filter(
+        facet=FacetCount.FACET_COMPANY, value=str(instance.pk),
+    ).exclude(
+        label=instance.last_name or instance.username,
+    ).update(label=instance.last_name or instance.username)
+
+
+@receiver(post_save, sender=Offer, dispatch_uid='jobs_invalidate_card_on_save')
+@receiver(post_delete, sender=Offer, dispatch_uid='jobs_invalidate_card_on_delete')
+def invalidate_offer_card(sender, instance, **kwargs):
+    fragments.invalidate_offers([instance.pk])
+
+
+@receiver(post_save, sender=Offer, dispatch_uid='jobs_bump_board_on_save')
+@receiver(post_delete, sender=Offer, dispatch_uid='jobs_bump_board_on_delete')
+def bump_board_on_change(sender, instance, **kwargs):
+    """
+    Nouvelle version du board, dans la transaction de la modification.
+
+    Une fois par instance : les suppressions en masse l'entourent de
+    ``board.bump_once()``.
+    """
+    board.bump_generation()
+
+
+@receiver(post_save, sender=User, dispatch_uid='jobs_invalidate_cards_on_user_save')
+def invalidate_company_cards(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    """Le nom et l'email de l'entreprise apparaissent dans ses cartes."""
+    if raw or created or (update_fields is not None and not CARD_USER_FIELDS & set(update_fields)):
+        return
+    _invalidate_company(instance.pk)
+
+
+@receiver(post_save, sender=Profile, dispatch_uid='jobs_invalidate_cards_on_profile_save')
+@receiver(post_delete, sender=Profile, dispatch_uid='jobs_invalidate_cards_on_profile_delete')
+def invalidate_profile_cards(sender, instance, created=False, raw=False, **kwargs):
+    """Le type de profil de l'entreprise apparaît dans ses cartes."""
+    if raw or created:
+        return
+    _invalidate_company(instance.user_id)
+
+
+def _invalidate_company(user_id):
+    """Invalider les cartes d'une entreprise et la version du board, si elle a des offres."""
+    offer_ids = list(Offer.objects.filter(company_id=user_id).values_list('id', flat=True))
+    if offer_ids:
+        fragments.invalidate_offers(offer_ids)
+        board.bump_generation()
+
+
+@receiver(post_save, sender=SavedSearch, dispatch_uid='jobs_index_saved_search')
+def index_saved_search_on_save(sender, instance, raw=False, **kwargs):
+    """Tenir à jour l'index inversé des recherches enregistrées."""
+    if not raw:
+        index_saved_search(instance)
+
+
+@receiver(post_save, sender=Offer, dispatch_uid='jobs_match_alerts_on_create')
+def match_alerts_on_create(sender, instance, created=False, raw=False, **kwargs):
+    """Chercher en arrière-plan les alertes déclenchées par une nouvelle offre active."""
+    if created and not raw and instance.active:
+        schedule_alert_matching([instance.pk])
+
+
+@receiver(post_save, sender=Offer, dispatch_uid='jobs_recommendations_on_save')
+def update_recommendations_on_save(sender, instance, raw=False, **kwargs):
+    """Tenir à jour l'index de recommandations de ce processus."""
+    if not raw:
+        recommendations.offer_saved(instance)
+
+
+@receiver(post_delete, sender=Offer, dispatch_uid='jobs_recommendations_on_delete')
+def update_recommendations_on_delete(sender, instance, **kwargs):
+    recommendations.offer_deleted(instance.pk)
@@ -0,0 +1,104 @@
+"""
+Vocabulaire normalisé des compétences.
+
+``Offer.skills`` reste la liste saisie par l'entreprise (affichage), tandis
+que ``Offer.skill_tags`` la relie à la table ``Skill`` via une table de
+liaison indexée. Les filtres par compétence passent par cette table de
+liaison plutôt que par le JSON, ligne par ligne.
+"""
+
+from django.db.models import Count, Q
+
+from .models import Offer, Skill
+
+SKILL_KEY_MAX_LENGTH = Skill._meta.get_field('key').max_length
+
+
+def canonical_skill_key(name):
+    """Forme canonique d'une compétence : « Machine  Learning » -> « machine learning »."""
+    return ' '.join(str(name).split()).casefold()[:SKILL_KEY_MAX_LENGTH]
+
+
+def parse_skill_keys(value):
+    """Transformer ``"Python, django"`` en ``['python', 'django']`` sans doublons."""
+    keys = []
+    for part in value.split(','):
+        key = canonical_skill_key(part)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def get_or_create_skills(names):
+    """
+    Retourner les ``Skill`` correspondant à ``names``, créés si besoin.
+
+    Deux requêtes quel que soit le nombre de compétences : un INSERT groupé
+    qui ignore les clés existantes, puis un SELECT.
+    """
+    by_key = {}
+    for name in names:
+        key = canonical_skill_key(name)
+        if key:
+            by_key.setdefault(key, ' '.join(str(name).split())[:SKILL_KEY_MAX_LENGTH])
+    if not by_key:
+        return []
+    Skill.objects.bulk_create(
+        [Skill(key=key, name=name) for key, name in by_key.items()],
+        ignore_conflicts=True,
+    )
+    return list(Skill.objects.filter(key__in=by_key))
+
+
+def sync_offer_skills(offer):
+    """Aligner ``offer.skill_tags`` sur la liste JSON ``offer.skills``."""
+    wanted = {canonical_skill_key(name) for name in offer.skills or []} - {''}
+    current = set(offer.skill_tags.values_list('key', flat=True))
+    if wanted != current:
+        offer.skill_tags.set(get_or_create_skills(offer.skills or []))
+
+
+def sync_skills_for_offers(offers):
+    """
+    Créer les liaisons ``skill_tags`` d'offres insérées en masse.
+
+    Prévu pour des offres neuves (``bulk_create``), qui n'ont encore
+    aucune liaison : tout est inséré en quelques requêtes.
+    """
+    offers = list(offers)
+    skills = {skill.key: skill for skill in get_or_create_skills(
+        name for offer in offers for name in offer.skills or []
+    )}
+    Link = Offer.skill_tags.through
+    links = {
+        (offer.id, skills[key].id)
+        for offer in offers
+        for key in (canonical_skill_key(name) for name in offer.skills or [])
+        if key in skills
+    }
+    Link.objects.bulk_create(
+        [Link(offer_id=offer_id, skill_id=skill_id) for offer_id, skill_id in links],
+        ignore_conflicts=True,
+    )
+
+
+def skills_filter(keys, match_all=True):
+    """
+    Retourner un ``Q`` sur les offres ayant les compétences ``keys``.
+
+    - ``match_all=True`` (ET) : offres liées à toutes les compétences ;
+    - ``match_all=False`` (OU) : offres liées à au moins une.
+
+    Les deux cas se résolvent sur la table de liaison via l'index sur
+    ``skill_id``, sans lire les offres elles-mêmes.
+    """
+    if not keys:
+        return Q()
+    links = Offer.skill_tags.through.objects.filter(skill__key__in=keys)
+    if match_all:
+        links = (
+            links.values('offer_id')
+            .annotate(matched=Count('skill_id'))
+            .filter(matched=len(keys))
+        )
+    return Q(id__in=links.values('offer_id'))
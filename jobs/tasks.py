@@ -0,0 +1,31 @@
+"""
+Tâches en arrière-plan de l'application jobs (voir ``tasks.queue``).
+"""
+
+from tasks.queue import task
+
+from . import alerts
+
+DELIVERY_DEDUP_KEY = 'jobs:deliver-job-alerts'
+
+
+@task(max_attempts=3)
+def match_offer_alerts(offer_ids):
+    """Rapprocher de nouvelles offres des recherches enregistrées, puis planifier l'envoi."""
+    if alerts.match_offers(offer_ids):
+        # Une seule tâche d'envoi en attente : les alertes des prochaines
+        # minutes partiront dans le même lot
+        deliver_job_alerts.enqueue(dedup_key=DELIVERY_DEDUP_KEY, delay=alerts.alert_batch_delay())
+
+
+@task(max_attempts=5, backoff=60)
+def deliver_job_alerts():
+    """Envoyer les alertes en attente, groupées par utilisateur."""
+    alerts.deliver_alerts()
+
+
+def schedule_alert_matching(offer_ids):
+    """Mettre en file le rapprochement des offres ``offer_ids`` avec les recherches enregistrées."""
+    offer_ids = list(offer_ids)
+    if offer_ids:
+        match_offer_alerts.enqueue(args=[offer_ids])
@@ -1,3 +1,1193 @@
-from django.test import TestCase
+"""
+Tests de l'application jobs.
 
-# Create your tests here.
+Lancement:
+    python manage.py test jobs
+"""
+
+from django.contrib.auth.models import User
+import csv
+import json
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+
+from django.contrib.messages import get_messages
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from home.models import Profile
+from job_board.testing import assert_max_queries, count_queries, QueryBudgetExceeded
+from .admin import OfferAdmin
+from . import board, fragments, lifecycle, recommendations
+from .facets import rebuild_facets
+from .forms import SavedSearchForm
+from .alerts import deliver_alerts, match_offers, matching_searches
+from .models import Application, ArchivedOffer, FacetCount, JobAlert, Offer, SavedSearch, Skill
+from .pagination import KeysetPaginator, InvalidCursor, decode_cursor, encode_cursor
+from .search import build_match_expression, search_offers
+from .skills import canonical_skill_key, skills_filter, sync_skills_for_offers
+
+
+def create_company(username='company', last_name='Tech Corp'):
+    """Créer un utilisateur entreprise avec son profil."""
+    # Pas de mot de passe : les tests utilisent force_login, on évite le hachage
+    user = User.objects.create_user(
+        username=username,
+        email=f'{username}@test.com',
+        last_name=last_name,
+    )
+    Profile.objects.create(
+        user=user,
+        user_type=Profile.USER_TYPE_COMPANY,
+        address='123 Rue de Paris',
+        siret='12345678901234',
+    )
+    return user
+
+
+def create_applicant(username='applicant'):
+    """Créer un utilisateur postulant avec son profil."""
+    user = User.objects.create_user(username=username, email=f'{username}@test.com', first_name='Léa', last_name='Durand')
+    Profile.objects.create(user=user, user_type=Profile.USER_TYPE_APPLICANT, address='1 Rue de Lyon')
+    return user
+
+
+def create_offers(company, count, **fields):
+    """Créer ``count`` offres pour une entreprise."""
+    return [
+        Offer.objects.create(
+            company=company,
+            title=fields.get('title', f'Offre {index}'),
+            description=fields.get('description', 'Description'),
+            salary=fields.get('salary', 40000),
+            skills=fields.get('skills', ['Python']),
+            active=fields.get('active', True),
+        )
+        for index in range(count)
+    ]
+
+
+class KeysetPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.offers = create_offers(cls.company, 25)
+
+    def expected_ids(self):
+        return list(Offer.objects.order_by('-publication_date', '-id').values_list('id', flat=True))
+
+    def test_forward_pages_cover_every_offer_once(self):
+        paginator = KeysetPaginator(Offer.objects.all(), page_size=10)
+        seen = []
+        page = paginator.get_page()
+        while True:
+            seen.extend(offer.id for offer in page)
+            if not page.has_next:
+                break
+            page = paginator.get_page(after=page.next_cursor)
+        self.assertEqual(seen, self.expected_ids())
+
+    def test_previous_cursor_returns_previous_page(self):
+        paginator = KeysetPaginator(Offer.objects.all(), page_size=10)
+        first = paginator.get_page()
+        second = paginator.get_page(after=first.next_cursor)
+        back = paginator.get_page(before=second.previous_cursor)
+        self.assertEqual([o.id for o in back], [o.id for o in first])
+        self.assertFalse(first.has_previous)
+        self.assertTrue(second.has_previous)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor!')
+
+    def test_cursor_values_must_match_the_sort_key(self):
+        paginator = KeysetPaginator(Offer.objects.all(), page_size=10)
+        date = self.offers[0].publication_date.isoformat()
+        for values in (['pas une date', 1], [date, 'abc'], [date, None], [date, [1]], [date]):
+            with self.subTest(values=values), self.assertRaises(InvalidCursor):
+                paginator.get_page(after=encode_cursor(values))
+
+
+@override_settings(JOBS_PAGE_SIZE=5)
+class BoardPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        create_offers(cls.company, 12)
+
+    def setUp(self):
+        self.client.force_login(self.company)
+
+    def test_board_renders_one_page(self):
+        response = self.client.get(reverse('jobs:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page']), 5)
+        self.assertTrue(response.context['page'].has_next)
+
+    def test_board_size_parameter_is_capped(self):
+        with self.settings(JOBS_MAX_PAGE_SIZE=8):
+            response = self.client.get(reverse('jobs:index'), {'size': 1000})
+        self.assertEqual(len(response.context['page']), 8)
+
+    def test_board_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('jobs:index'), {'after': '%%%'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page']), 5)
+
+
+class BoardQueryBudgetTests(TestCase):
+    """Le nombre de requêtes du board ne doit pas dépendre du nombre d'offres."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = create_company('viewer')
+
+    def setUp(self):
+        self.client.force_login(self.viewer)
+
+    def board_queries(self):
+        return count_queries(self.client.get, reverse('jobs:index'))
+
+    def test_board_query_count_is_constant(self):
+        create_offers(create_company('first'), 2)
+        self.board_queries()  # met en cache l'instantané du visiteur (home.middleware)
+        small = self.board_queries()
+        for index in range(5):
+            create_offers(create_company(f'other{index}'), 3)
+        self.assertEqual(self.board_queries(), small)
+
+    def test_board_query_budget(self):
+        for index in range(4):
+            create_offers(create_company(f'company{index}'), 5)
+        # session, user, version du board, offres, 4 facettes, profil du visiteur
+        with assert_max_queries(9):
+            self.client.get(reverse('jobs:index'))
+
+    def test_delete_offer_query_budget(self):
+        offer = create_offers(self.viewer, 1)[0]
+        # user, profil, verrou, UPDATE, 4 facettes, alertes, version du board, savepoint x2
+        with assert_max_queries(12):
+            response = self.client.post(reverse('jobs:delete_offer', args=[offer.pk]))
+        self.assertEqual(response.status_code, 302)
+
+    def test_bump_once_updates_the_version_once(self):
+        before, _changed_at = board.board_version()
+        with board.bump_once(), board.bump_once():
+            create_offers(self.viewer, 3)
+            self.assertEqual(board.board_version()[0], before)
+        self.assertEqual(board.board_version()[0], before + 1)
+
+    def test_budget_exceeded_lists_queries(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'SELECT'):
+            with assert_max_queries(0):
+                list(Offer.objects.all())
+
+    def test_offer_str_uses_a_single_query(self):
+        create_offers(create_company('owner'), 3)
+        with assert_max_queries(1):
+            [str(offer) for offer in Offer.objects.with_company()]
+
+    def test_admin_changelist_query_count_is_constant(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@test.com')
+        self.client.force_login(admin_user)
+        url = reverse('admin:jobs_offer_changelist')
+        create_offers(create_company('first'), 2)
+        self.client.get(url)  # met en cache l'instantané du visiteur
+        small = count_queries(self.client.get, url)
+        for index in range(3):
+            create_offers(create_company(f'other{index}'), 3)
+        self.assertEqual(count_queries(self.client.get, url), small)
+        self.assertEqual(OfferAdmin.list_select_related, ('company', 'company__profile'))
+
+
+class OfferSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.title_match = Offer.objects.create(
+            company=cls.company, title='Développeur Python', description='Équipe produit', skills=['Django'],
+        )
+        cls.description_match = Offer.objects.create(
+            company=cls.company, title='Chef de projet', description='Un peu de python apprécié', skills=[],
+        )
+        cls.other = Offer.objects.create(
+            company=cls.company, title='Comptable', description='Finance', skills=['Excel'],
+        )
+
+    def search_ids(self, query):
+        offers, ordering = search_offers(Offer.objects.all(), query)
+        return list(offers.order_by(*ordering).values_list('id', flat=True))
+
+    def test_match_expression_quotes_terms_and_drops_stop_words(self):
+        self.assertEqual(build_match_expression('Le "dev" de Python'), '"dev"* "python"*')
+
+    def test_accent_insensitive_and_prefix(self):
+        self.assertEqual(self.search_ids('developpeur'), [self.title_match.id])
+        self.assertEqual(self.search_ids('équipe'), [self.title_match.id])
+        self.assertEqual(self.search_ids('compt'), [self.other.id])
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search_ids('python'), [self.title_match.id, self.description_match.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.other.title = 'Développeur Rust'
+        self.other.save()
+        self.assertIn(self.other.id, self.search_ids('rust'))
+        self.other.delete()
+        self.assertEqual(self.search_ids('rust'), [])
+
+    def test_fallback_without_fts(self):
+        with mock.patch('jobs.search.fts_available', return_value=False):
+            offers, ordering = search_offers(Offer.objects.all(), 'python')
+            ids = set(offers.values_list('id', flat=True))
+        self.assertEqual(ids, {self.title_match.id, self.description_match.id})
+        self.assertEqual(ordering, ('-publication_date', '-id'))
+
+    def test_board_search_is_paginated(self):
+        create_offers(self.company, 7, title='Développeur Go')
+        self.client.force_login(self.company)
+        url = reverse('jobs:index')
+        first = self.client.get(url, {'q': 'go', 'size': 5})
+        self.assertEqual(len(first.context['page']), 5)
+        second = self.client.get(url, {'q': 'go', 'size': 5, 'after': first.context['page'].next_cursor})
+        self.assertEqual(len(second.context['page']), 2)
+        self.assertContains(first, 'value="go"')
+
+    def test_search_cursor_rank_must_be_a_number(self):
+        offers, ordering = search_offers(Offer.objects.all(), 'python')
+        paginator = KeysetPaginator(offers, ordering=ordering)
+        with self.assertRaises(InvalidCursor):
+            paginator.get_page(after=encode_cursor(['pas un rang', self.title_match.id]))
+
+    def test_rank_comes_from_a_single_match_scan(self):
+        create_offers(self.company, 300, title='Développeur Python')
+        offers, ordering = search_offers(Offer.objects.all(), 'python')
+        plan = offers.order_by(*ordering)[:20].explain()
+        self.assertIn('VIRTUAL TABLE', plan)
+        self.assertNotIn('CORRELATED', plan)
+        self.assertNotIn('LIST SUBQUERY', plan)
+
+    def test_search_queryset_composes_with_later_filters(self):
+        offers, _ordering = search_offers(Offer.objects.all(), 'python')
+        self.assertEqual(list(offers.filter(title__startswith='Dév').values_list('id', flat=True)), [self.title_match.id])
+        others = Offer.objects.filter(pk=self.other.pk).order_by().values('id')
+        self.assertEqual(offers.order_by().values('id').union(others).count(), 3)
+        offers.filter(pk=self.description_match.pk).delete()
+        self.assertEqual(self.search_ids('python'), [self.title_match.id])
+
+
+class SkillIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.python_django = Offer.objects.create(company=cls.company, title='A', description='-', skills=['Python', ' Django '])
+        cls.python = Offer.objects.create(company=cls.company, title='B', description='-', skills=['PYTHON'])
+        cls.rust = Offer.objects.create(company=cls.company, title='C', description='-', skills=['Rust'])
+
+    def matching(self, keys, match_all=True):
+        return set(Offer.objects.filter(skills_filter(keys, match_all)).values_list('id', flat=True))
+
+    def test_skills_are_canonical_and_shared(self):
+        self.assertEqual(canonical_skill_key('  Machine   LEARNING '), 'machine learning')
+        self.assertEqual(sorted(Skill.objects.values_list('key', flat=True)), ['django', 'python', 'rust'])
+        self.assertEqual(Skill.objects.get(key='python').name, 'Python')
+
+    def test_and_or_filters(self):
+        self.assertEqual(self.matching(['python', 'django']), {self.python_django.id})
+        self.assertEqual(self.matching(['django', 'rust'], match_all=False), {self.python_django.id, self.rust.id})
+        self.assertEqual(self.matching(['python']), {self.python_django.id, self.python.id})
+
+    def test_links_follow_json_changes(self):
+        self.rust.skills = ['Go']
+        self.rust.save()
+        self.assertEqual(list(self.rust.skill_tags.values_list('key', flat=True)), ['go'])
+
+    def test_bulk_created_offers_are_linked(self):
+        offers = Offer.objects.bulk_create([
+            Offer(company=self.company, title='D', description='-', skills=['Kotlin', 'python']),
+        ])
+        sync_skills_for_offers(offers)
+        self.assertEqual(self.matching(['kotlin', 'python']), {offers[0].id})
+
+    def test_board_skill_filter(self):
+        self.client.force_login(self.company)
+        response = self.client.get(reverse('jobs:index'), {'skills': 'Python, django'})
+        self.assertEqual([card[0] for card in response.context['page']], [self.python_django.id])
+        response = self.client.get(reverse('jobs:index'), {'skills': 'django,rust', 'skills_mode': 'any'})
+        self.assertEqual(len(response.context['page']), 2)
+
+
+class FacetCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company(last_name='Acme')
+
+    def counts(self, facet):
+        return dict(FacetCount.objects.filter(facet=facet, count__gt=0).values_list('value', 'count'))
+
+    def snapshot(self):
+        return sorted(FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'))
+
+    def test_counts_follow_create_deactivate_delete(self):
+        offer = Offer.objects.create(company=self.company, title='A', description='-', salary=50000, skills=['Python'])
+        Offer.objects.create(company=self.company, title='B', description='-', salary=20000, skills=['python', 'Go'])
+        self.assertEqual(self.counts(FacetCount.FACET_SKILL), {'python': 2, 'go': 1})
+        self.assertEqual(self.counts(FacetCount.FACET_SALARY), {'45000-60000': 1, '0-30000': 1})
+        self.assertEqual(self.counts(FacetCount.FACET_COMPANY), {str(self.company.id): 2})
+
+        offer.active = False
+        offer.save()
+        self.assertEqual(self.counts(FacetCount.FACET_SKILL), {'python': 1, 'go': 1})
+        offer.active = True
+        offer.salary = 70000
+        offer.save()
+        self.assertEqual(self.counts(FacetCount.FACET_SALARY), {'60000-': 1, '0-30000': 1})
+
+        offer.delete()
+        self.assertEqual(self.counts(FacetCount.FACET_COMPANY), {str(self.company.id): 1})
+
+    def test_incremental_counts_match_rebuild(self):
+        create_offers(self.company, 3, skills=['Rust'])
+        create_offers(self.company, 2, skills=['Rust', 'C'], salary=None, active=False)
+        incremental = self.snapshot()
+        rebuild_facets()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_company_label_follows_user(self):
+        create_offers(self.company, 1)
+        self.company.last_name = 'Acme SA'
+        self.company.save()
+        self.assertEqual(FacetCount.objects.get(facet=FacetCount.FACET_COMPANY).label, 'Acme SA')
+
+    def test_board_facet_filters(self):
+        create_offers(self.company, 2, salary=50000)
+        create_offers(create_company('other'), 1, salary=20000)
+        self.client.force_login(self.company)
+        response = self.client.get(reverse('jobs:index'), {'salary': '45000-60000'})
+        self.assertEqual(len(response.context['page']), 2)
+        response = self.client.get(reverse('jobs:index'), {'company': self.company.id})
+        self.assertEqual(len(response.context['page']), 2)
+        self.assertContains(response, 'Acme')
+
+
+class OfferCardCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_company('owner', last_name='Acme')
+        cls.visitor = create_company('visitor')
+        cls.offer = create_offers(cls.owner, 1, title='Développeur Python')[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def board(self, user):
+        self.client.force_login(user)
+        return self.client.get(reverse('jobs:index'))
+
+    def test_second_render_hits_the_cache(self):
+        self.board(self.visitor)
+        self.board(self.visitor)
+        self.assertEqual(fragments.get_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_owner_actions_are_not_shared(self):
+        self.assertContains(self.board(self.owner), reverse('jobs:delete_offer', args=[self.offer.id]))
+        response = self.board(self.visitor)
+        self.assertNotContains(response, reverse('jobs:delete_offer', args=[self.offer.id]))
+        self.assertNotContains(response, fragments.ACTIONS_PLACEHOLDER)
+        self.assertEqual(fragments.get_stats()['hits'], 1)
+
+    def test_offer_and_company_changes_invalidate_the_card(self):
+        self.board(self.visitor)
+        self.offer.title = 'Développeur Rust'
+        self.offer.save()
+        self.assertContains(self.board(self.visitor), 'Développeur Rust')
+        self.owner.last_name = 'Acme SA'
+        self.owner.save()
+        self.assertContains(self.board(self.visitor), 'Acme SA')
+        self.assertEqual(fragments.get_stats()['hits'], 0)
+
+    def test_metrics_require_staff(self):
+        self.client.force_login(self.visitor)
+        self.assertEqual(self.client.get(reverse('jobs:metrics')).status_code, 302)
+        staff = User.objects.create_user('staff', is_staff=True)
+        self.client.force_login(staff)
+        self.assertIn('offer_card_cache', self.client.get(reverse('jobs:metrics')).json())
+
+
+class BoardConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.offer = create_offers(cls.company, 1)[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.company)
+        self.url = reverse('jobs:index')
+
+    def test_unchanged_board_returns_304(self):
+        self.client.get(self.url)  # pose le cookie CSRF, qui fait partie de l'ETag
+        first = self.client.get(self.url)
+        self.assertTrue(first.has_header('ETag'))
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_offer_change_returns_200(self):
+        etag = self.client.get(self.url)['ETag']
+        self.offer.title = 'Nouveau titre'
+        self.offer.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_company_rename_returns_200(self):
+        etag = self.client.get(self.url)['ETag']
+        self.company.last_name = 'Renamed'
+        self.company.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_query_string(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, {'q': 'python'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pending_messages_disable_304(self):
+        applicant = User.objects.create_user('applicant')
+        Profile.objects.create(user=applicant, user_type=Profile.USER_TYPE_APPLICANT, address='-')
+        self.client.force_login(applicant)
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        # Message flash posé par la redirection : la page doit être rendue
+        self.client.get(reverse('jobs:create_offer'))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    @override_settings(JOBS_BOARD_PAGE_CACHE_TIMEOUT=60)
+    def test_shared_page_cache_skips_offer_queries(self):
+        self.client.get(self.url)
+        viewer = create_company('viewer')
+        self.client.force_login(viewer)
+        with assert_max_queries(5):
+            response = self.client.get(self.url)
+        self.assertContains(response, self.offer.title)
+        self.assertNotContains(response, reverse('jobs:delete_offer', args=[self.offer.id]))
+        self.client.force_login(self.company)
+        self.assertContains(self.client.get(self.url), reverse('jobs:delete_offer', args=[self.offer.id]))
+
+    def test_bump_generation_changes_version(self):
+        before = board.board_version()
+        board.bump_generation()
+        self.assertNotEqual(board.board_version(), before)
+
+    def test_evicted_user_generation_does_not_revalidate_old_etags(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        # Éviction par le cache (MAX_ENTRIES) : la génération ne repart pas de zéro
+        cache.delete(board.USER_GENERATION_KEY.format(self.company.pk))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_version_does_not_read_offers(self):
+        with CaptureQueriesContext(connection) as context:
+            board.board_version()
+        self.assertNotIn('jobs_offer', context.captured_queries[0]['sql'])
+
+    def test_bulk_deactivation_returns_200(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        with transaction.atomic():
+            lifecycle.deactivate_offers(Offer.objects.filter(pk=self.offer.pk))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class OfferApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company(last_name='Acme')
+        cls.offers = create_offers(cls.company, 7, skills=['Python'], salary=50000)
+        create_offers(cls.company, 2, skills=['Rust'], salary=20000)
+        create_offers(cls.company, 1, active=False)
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, json.loads(body)
+
+    def test_list_pages_forward_and_back(self):
+        url = reverse('jobs:api_offer_list')
+        _, first = self.get(url, size=4)
+        self.assertEqual(first['count'], 4)
+        _, second = self.get(url, size=4, after=first['next_cursor'])
+        _, third = self.get(url, size=4, after=second['next_cursor'])
+        self.assertEqual(third['count'], 1)
+        self.assertIsNone(third['next_cursor'])
+        _, back = self.get(url, size=4, before=second['previous_cursor'])
+        self.assertEqual([o['id'] for o in back['results']], [o['id'] for o in first['results']])
+        ids = [o['id'] for page in (first, second, third) for o in page['results']]
+        self.assertEqual(len(set(ids)), 9)
+
+    def test_sparse_fieldsets(self):
+        _, body = self.get(reverse('jobs:api_offer_list'), fields='id,title', size=1)
+        self.assertEqual(set(body['results'][0]), {'id', 'title'})
+        response, _ = self.get(reverse('jobs:api_offer_list'), fields='id,password')
+        self.assertEqual(response.status_code, 400)
+
+    def test_filters(self):
+        url = reverse('jobs:api_offer_list')
+        self.assertEqual(self.get(url, skills='rust')[1]['count'], 2)
+        self.assertEqual(self.get(url, salary_min=30000)[1]['count'], 7)
+        self.assertEqual(self.get(url, active='all', size=100)[1]['count'], 10)
+        self.assertEqual(self.get(url, company=self.company.id, active='false')[1]['count'], 1)
+        self.assertEqual(self.get(url, salary_min='abc')[0].status_code, 400)
+
+    def test_invalid_cursor(self):
+        response, _ = self.get(reverse('jobs:api_offer_list'), after='WyJ4IiwgIngiXQ')
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail(self):
+        offer = self.offers[0]
+        response, body = self.get(reverse('jobs:api_offer_detail', args=[offer.id]))
+        self.assertEqual(body['title'], offer.title)
+        self.assertEqual(body['company'], 'Acme')
+        self.assertEqual(body['salary'], '50000.00')
+        response, _ = self.get(reverse('jobs:api_offer_detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncViewTests(TestCase):
+    """Board et API servis par le client ASGI (vues async, ORM async)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company(last_name='Acme')
+        cls.offers = create_offers(cls.company, 7)
+
+    def setUp(self):
+        cache.clear()
+
+    async def read(self, response):
+        self.assertTrue(response.is_async)
+        return json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+
+    async def test_anonymous_visitor_is_redirected(self):
+        response = await self.async_client.get(reverse('jobs:index'))
+        self.assertRedirects(
+            response, f"{reverse('home:login')}?next={reverse('jobs:index')}", fetch_redirect_response=False,
+        )
+
+    async def test_board_page_and_conditional_get(self):
+        await self.async_client.aforce_login(self.company)
+        url = reverse('jobs:index')
+        await self.async_client.get(url)  # pose le cookie CSRF, qui fait partie de l'ETag
+        response = await self.async_client.get(url, {'size': 5})
+        self.assertEqual(len(response.context['page']), 5)
+        self.assertContains(response, reverse('jobs:delete_offer', args=[self.offers[-1].id]))
+        again = await self.async_client.get(url, {'size': 5}, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    async def test_api_streams_pages_with_async_iterator(self):
+        url = reverse('jobs:api_offer_list')
+        first = await self.read(await self.async_client.get(url, {'size': 4}))
+        second = await self.read(await self.async_client.get(url, {'size': 4, 'after': first['next_cursor']}))
+        self.assertEqual(second['count'], 3)
+        self.assertIsNone(second['next_cursor'])
+        back = await self.read(await self.async_client.get(url, {'size': 4, 'before': second['previous_cursor']}))
+        self.assertEqual(back['results'], first['results'])
+
+        response = await self.async_client.get(reverse('jobs:api_offer_detail', args=[self.offers[0].id]))
+        self.assertEqual(json.loads(response.content)['company'], 'Acme')
+
+
+class ImportOffersCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company('acme', last_name='Acme')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def run_import(self, name, content, *args):
+        path = self.directory / name
+        path.write_text(content, encoding='utf-8')
+        errors = self.directory / 'errors.csv'
+        call_command('import_offers', str(path), '--errors', str(errors), *args, stdout=StringIO())
+        with open(errors, newline='', encoding='utf-8') as report:
+            return list(csv.DictReader(report))
+
+    def test_csv_import_in_batches(self):
+        content = 'company,title,description,salary,skills,active\n'
+        content += ''.join(f'acme,Offre {i},Desc,50000,"Python, Django",true\n' for i in range(5))
+        content += 'acme,,Desc,abc,,true\n'
+        content += 'unknown,Offre,Desc,40000,,true\n'
+        errors = self.run_import('offres.csv', content, '--batch-size', '2')
+
+        self.assertEqual(Offer.objects.count(), 5)
+        self.assertEqual([row['line'] for row in errors], ['7', '8'])
+        self.assertIn('title', errors[0]['errors'])
+        self.assertIn('company', errors[1]['errors'])
+        offer = Offer.objects.first()
+        self.assertEqual(sorted(offer.skill_tags.values_list('key', flat=True)), ['django', 'python'])
+        self.assertEqual(
+            FacetCount.objects.get(facet=FacetCount.FACET_SKILL, value='python').count, 5,
+        )
+        self.assertEqual(search_offers(Offer.objects.all(), 'offre')[0].count(), 5)
+
+    def test_jsonl_import_matches_rebuild(self):
+        lines = [
+            json.dumps({'title': 'Dev Go', 'description': '-', 'salary': 20000, 'skills': ['Go']}),
+            json.dumps({'title': 'Dev Rust', 'description': '-', 'skills': ['Rust'], 'active': False}),
+            '{pas du json',
+        ]
+        errors = self.run_import('offres.jsonl', '\n'.join(lines), '--company', 'acme')
+
+        self.assertEqual(Offer.objects.count(), 2)
+        self.assertEqual(len(errors), 1)
+        self.assertFalse(Offer.objects.get(title='Dev Rust').active)
+        snapshot = sorted(FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'))
+        rebuild_facets()
+        self.assertEqual(
+            sorted(FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count')), snapshot,
+        )
+
+
+class ExportOffersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company('acme', last_name='Acme')
+        create_offers(cls.company, 3, skills=['Python', 'Django'])
+        create_offers(cls.company, 1, skills=['Go'], active=False)
+        cls.admin = User.objects.create_user('admin', is_staff=True)
+
+    def test_command_round_trips_through_import(self):
+        out = StringIO()
+        call_command('export_offers', '--active', 'all', stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['company'], 'acme')
+        self.assertEqual(rows[0]['company_name'], 'Acme')
+        self.assertEqual(rows[0]['skills'], 'Python, Django')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'offres.csv'
+            path.write_text(out.getvalue(), encoding='utf-8')
+            call_command('import_offers', str(path), '--errors', str(Path(directory) / 'errors.csv'), stdout=StringIO())
+        self.assertEqual(Offer.objects.count(), 8)
+        self.assertEqual(Offer.objects.filter(active=False).count(), 2)
+
+    def test_view_streams_filtered_jsonl(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('jobs:export_offers'), {'format': 'jsonl', 'skills': 'go', 'active': 'all'})
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['skills'] for row in rows], [['Go']])
+        self.assertEqual(self.client.get(reverse('jobs:export_offers'), {'format': 'xml'}).status_code, 400)
+
+    def test_view_requires_staff(self):
+        self.client.force_login(self.company)
+        response = self.client.get(reverse('jobs:export_offers'))
+        self.assertEqual(response.status_code, 302)
+
+
+class ApplicationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company('acme', last_name='Acme')
+        cls.offer = create_offers(cls.company, 1, title='Développeur Python')[0]
+        cls.applicant = create_applicant()
+        cls.applicant.profile.cv = 'profiles/cvs/ab/abcdef.pdf'
+        cls.applicant.profile.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def apply(self, offer=None):
+        return self.client.post(reverse('jobs:apply_offer', args=[(offer or self.offer).id]))
+
+    def test_apply_is_idempotent_and_snapshots_cv(self):
+        self.client.force_login(self.applicant)
+        self.apply()
+        self.apply()
+        application = Application.objects.get()
+        self.assertEqual(application.company, self.company)
+        self.assertEqual(application.cv.name, 'profiles/cvs/ab/abcdef.pdf')
+
+        self.applicant.profile.cv = 'profiles/cvs/cd/cdef.pdf'
+        self.applicant.profile.save()
+        application.refresh_from_db()
+        self.assertEqual(application.cv.name, 'profiles/cvs/ab/abcdef.pdf')
+
+    def test_only_applicants_can_apply(self):
+        self.client.force_login(self.company)
+        self.apply()
+        self.assertFalse(Application.objects.exists())
+        self.client.force_login(self.applicant)
+        self.assertEqual(self.client.get(reverse('jobs:apply_offer', args=[self.offer.id])).status_code, 405)
+
+    def test_board_actions_follow_application(self):
+        self.client.force_login(self.applicant)
+        response = self.client.get(reverse('jobs:index'))
+        self.assertContains(response, reverse('jobs:apply_offer', args=[self.offer.id]))
+        self.assertNotContains(response, 'mailto:')
+        etag = response['ETag']
+
+        self.apply()
+        # La première page affichée consomme le message flash, la seconde doit rester à jour
+        self.client.get(reverse('jobs:index'))
+        response = self.client.get(reverse('jobs:index'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Candidature envoyée')
+
+    def test_inbox_is_paginated_with_constant_queries(self):
+        offers = create_offers(self.company, 6)
+        for index, offer in enumerate(offers):
+            Application.objects.create(applicant=create_applicant(f'a{index}'), offer=offer, company=self.company)
+        other = create_company('other')
+        Application.objects.create(applicant=self.applicant, offer=create_offers(other, 1)[0], company=other)
+
+        self.client.force_login(self.company)
+        response = self.client.get(reverse('jobs:inbox'), {'size': 4})
+        self.assertEqual(len(response.context['page']), 4)
+        second = self.client.get(reverse('jobs:inbox'), {'size': 4, 'after': response.context['page'].next_cursor})
+        self.assertEqual(len(second.context['page']), 2)
+
+        small = count_queries(self.client.get, reverse('jobs:inbox'), {'size': 2})
+        self.assertEqual(count_queries(self.client.get, reverse('jobs:inbox'), {'size': 6}), small)
+
+    def test_status_update_is_restricted_to_the_company(self):
+        application = Application.objects.create(applicant=self.applicant, offer=self.offer, company=self.company)
+        url = reverse('jobs:update_application_status', args=[application.id])
+        self.client.force_login(create_company('other'))
+        self.assertEqual(self.client.post(url, {'status': 'accepted'}).status_code, 404)
+        self.client.force_login(self.company)
+        self.client.post(url, {'status': 'accepted'})
+        application.refresh_from_db()
+        self.assertEqual(application.status, Application.STATUS_ACCEPTED)
+
+        self.client.force_login(self.applicant)
+        response = self.client.get(reverse('jobs:my_applications'))
+        self.assertContains(response, 'Retenue')
+
+
+class JobAlertTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company('acme', last_name='Acme')
+        cls.applicant = create_applicant()
+
+    def save_search(self, user=None, **fields):
+        return SavedSearch.objects.create(user=user or self.applicant, name='Alerte', **fields)
+
+    def offer(self, **fields):
+        return create_offers(self.company, 1, **fields)[0]
+
+    def matches(self, offer):
+        return set(matching_searches(offer).values_list('id', flat=True))
+
+    def test_all_terms_and_salary_floor_must_match(self):
+        python_django = self.save_search(query='Développeur Django', skills=['Python'])
+        go_only = self.save_search(skills=['Go'])
+        rich = self.save_search(salary_min=60000)
+        self.assertEqual(python_django.terms.count(), 3)
+
+        offer = self.offer(title='Développeur Django senior', skills=['python', 'SQL'], salary=50000)
+        self.assertEqual(self.matches(offer), {python_django.id})
+        offer = self.offer(title='Développeur Go', skills=['Go'], salary=70000)
+        self.assertEqual(self.matches(offer), {go_only.id, rich.id})
+
+    def test_index_follows_edits(self):
+        saved_search = self.save_search(skills=['Go'])
+        saved_search.skills = ['Rust']
+        saved_search.save()
+        self.assertEqual(list(saved_search.terms.values_list('term', flat=True)), ['skill:rust'])
+        self.assertEqual(self.matches(self.offer(skills=['Rust'])), {saved_search.id})
+
+    def test_matching_cost_does_not_depend_on_unrelated_searches(self):
+        offer = self.offer(title='Data engineer', skills=['Python'])
+        self.save_search(skills=['Python'])
+        few = count_queries(match_offers, [offer.id])
+        for index in range(30):
+            self.save_search(skills=[f'langage{index}'])
+        JobAlert.objects.all().delete()
+        self.assertEqual(count_queries(match_offers, [offer.id]), few)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_new_offer_alerts_are_delivered_in_one_email(self):
+        self.save_search(skills=['Python'])
+        self.save_search(query='django')
+        self.save_search(user=create_company('other'), skills=['Python'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer(title='Dev Django', skills=['Python'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer(title='Dev Flask', skills=['Python'])
+
+        self.assertEqual(JobAlert.objects.filter(user=self.applicant).count(), 3)
+        self.assertFalse(JobAlert.objects.filter(delivered_at__isnull=True).exists())
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertIn('applicant@test.com', recipients)
+        self.assertIn('Dev Django', mail.outbox[0].body)
+        self.assertEqual(deliver_alerts(), 0)
+
+    def test_saved_search_view(self):
+        self.client.force_login(self.applicant)
+        response = self.client.get(reverse('jobs:saved_searches'), {'q': 'python', 'skills': 'django'})
+        self.assertEqual(response.context['form'].initial['skills_input'], 'django')
+        self.client.post(reverse('jobs:saved_searches'), {'name': 'Python', 'query': 'python', 'skills_input': 'Django, SQL'})
+        saved_search = SavedSearch.objects.get()
+        self.assertEqual(saved_search.skills, ['Django', 'SQL'])
+        self.assertEqual(saved_search.term_count, 3)
+        self.client.post(reverse('jobs:delete_saved_search', args=[saved_search.id]))
+        self.assertFalse(SavedSearch.objects.exists())
+
+    def test_search_without_usable_term_is_rejected(self):
+        self.assertFalse(SavedSearchForm({'name': 'Tout', 'query': 'le de la'}).is_valid())
+        self.assertFalse(SavedSearchForm({'name': 'Tout', 'skills_input': ' , '}).is_valid())
+        self.assertTrue(SavedSearchForm({'name': 'Riche', 'salary_min': 60000}).is_valid())
+        self.assertTrue(SavedSearchForm({'name': 'Go', 'query': 'le de la', 'skills_input': 'Go'}).is_valid())
+        # Une recherche vide déjà en base ne reçoit pas toutes les offres
+        self.save_search(query='le')
+        self.assertEqual(self.matches(self.offer(title='Le poste')), set())
+
+
+class RecommendationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.applicant = create_applicant()
+        cls.python = Offer.objects.create(
+            company=cls.company, title='Développeur Python', description='API Django et PostgreSQL',
+            skills=['Python', 'Django'],
+        )
+        cls.cobol = Offer.objects.create(
+            company=cls.company, title='Développeur COBOL', description='Maintenance mainframe',
+            skills=['COBOL'],
+        )
+        cls.data = Offer.objects.create(
+            company=cls.company, title='Data engineer', description='Pipelines Python et Spark',
+            skills=['Spark', 'Python'],
+        )
+
+    def setUp(self):
+        cache.clear()
+        recommendations.reset_index()
+        SavedSearch.objects.create(user=self.applicant, name='Python', query='django', skills=['Python'])
+
+    def recommended_ids(self):
+        return [offer.id for offer in recommendations.recommend(self.applicant)]
+
+    @skipUnless(recommendations.HAS_NUMPY, 'NumPy et SciPy non installés')
+    def test_offers_ranked_by_profile(self):
+        self.assertEqual(self.recommended_ids(), [self.python.id, self.data.id])
+
+    @skipUnless(recommendations.HAS_NUMPY, 'NumPy et SciPy non installés')
+    def test_applied_offers_are_excluded(self):
+        Application.objects.create(applicant=self.applicant, offer=self.python, company=self.company)
+        self.assertNotIn(self.python.id, self.recommended_ids())
+
+    @skipUnless(recommendations.HAS_NUMPY, 'NumPy et SciPy non installés')
+    def test_index_follows_saves_and_deletes(self):
+        self.recommended_ids()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cobol.skills = ['Python', 'Django']
+            self.cobol.description = 'Migration vers Django'
+            self.cobol.save()
+        self.assertIn(self.cobol.id, self.recommended_ids())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.active = False
+            self.python.save()
+            self.data.delete()
+        self.assertEqual(self.recommended_ids(), [self.cobol.id])
+
+    @skipUnless(recommendations.HAS_NUMPY, 'NumPy et SciPy non installés')
+    def test_index_catches_up_on_bulk_updates(self):
+        self.recommended_ids()
+        Offer.objects.filter(id=self.python.id).update(active=False, updated_at=timezone.now())
+        self.assertEqual(self.recommended_ids(), [self.data.id])
+
+    @skipUnless(recommendations.HAS_NUMPY, 'NumPy et SciPy non installés')
+    def test_database_reads_do_not_hold_the_index_lock(self):
+        changes = recommendations._changes
+
+        def unlocked_changes(since):
+            self.assertFalse(recommendations._lock.locked())
+            return changes(since)
+
+        with mock.patch('jobs.recommendations._changes', side_effect=unlocked_changes) as patched:
+            self.recommended_ids()  # construction
+            self.recommended_ids()  # rattrapage
+        self.assertEqual(patched.call_count, 2)
+
+    @skipUnless(recommendations.HAS_NUMPY, 'NumPy et SciPy non installés')
+    def test_top_k_on_index(self):
+        index = recommendations.OfferIndex()
+        for offer_id, skills in enumerate([['Go'], ['Rust'], ['Rust', 'Go'], ['Java']], start=1):
+            index.upsert(offer_id, *recommendations.hash_features(recommendations.offer_weights('', '', skills)))
+        query = recommendations.hash_features(recommendations.offer_weights('', '', ['Rust']))
+        self.assertEqual([offer_id for offer_id, _score in index.top_k(*query, k=2)], [2, 3])
+        index.remove(2)
+        self.assertEqual([offer_id for offer_id, _score in index.top_k(*query, k=2)], [3])
+        self.assertEqual(index.top_k(*query, k=2, exclude={3}), [])
+
+    def test_fallback_without_numpy(self):
+        with mock.patch.object(recommendations, 'HAS_NUMPY', False):
+            self.assertEqual(self.recommended_ids(), [self.data.id, self.python.id])
+
+    def test_cv_text_from_docx(self):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('word/document.xml', '<w:body><w:t>Expert Kubernetes &amp; Go</w:t></w:body>')
+        profile = self.applicant.profile
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            profile.cv = SimpleUploadedFile('cv.docx', buffer.getvalue())
+            profile.save()
+            self.assertIn('kw:kubernetes', recommendations.profile_weights(self.applicant))
+
+    def test_view_is_reserved_to_applicants(self):
+        self.client.force_login(self.applicant)
+        response = self.client.get(reverse('jobs:recommended_offers'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Développeur Python')
+        self.client.force_login(self.company)
+        self.assertRedirects(self.client.get(reverse('jobs:recommended_offers')), reverse('jobs:index'))
+
+
+class OfferIndexTests(TestCase):
+
+    def test_board_queries_use_composite_indexes(self):
+        company = create_company()
+        board_plan = Offer.objects.active().order_by('-publication_date', '-id')[:20].explain()
+        company_plan = Offer.objects.filter(company=company).order_by('-publication_date')[:20].explain()
+        self.assertIn('offer_active_recent_idx', board_plan)
+        self.assertIn('offer_company_recent_idx', company_plan)
+
+    def test_cursor_pages_seek_into_the_index(self):
+        offers = create_offers(create_company(), 3)
+        paginator = KeysetPaginator(Offer.objects.active())
+        cursor = paginator.cursor_for(offers[1])
+        for queryset in (paginator.get_queryset(after=cursor), paginator.get_queryset(before=cursor)):
+            plan = queryset[:20].explain()
+            self.assertIn('SEARCH', plan)
+            self.assertNotIn('SCAN', plan)
+        self.assertEqual(list(paginator.get_queryset(after=cursor)), [offers[0]])
+
+    def test_benchmark_command_leaves_no_data(self):
+        out = StringIO()
+        call_command('benchmark_offer_indexes', offers=200, companies=5, repeat=1, in_place=True, stdout=out)
+        self.assertIn('Avec les index', out.getvalue())
+        self.assertFalse(Offer.objects.exists())
+        self.assertIn('offer_active_recent_idx', Offer.objects.active().order_by('-publication_date', '-id').explain())
+
+
+class OfferLifecycleTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company('acme', last_name='Acme')
+        cls.applicant = create_applicant()
+
+    def setUp(self):
+        cache.clear()
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_offers', *args, stdout=out)
+        return out.getvalue()
+
+    def facet_snapshot(self):
+        return sorted(FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'))
+
+    def test_new_offers_expire_after_lifetime(self):
+        with self.settings(JOBS_OFFER_LIFETIME_DAYS=10):
+            offer = create_offers(self.company, 1)[0]
+        self.assertAlmostEqual(
+            offer.expires_at - offer.publication_date, timedelta(days=10), delta=timedelta(seconds=5),
+        )
+
+    def test_expired_offers_are_deactivated_in_batches(self):
+        offers = create_offers(self.company, 5, skills=['Python', 'Django'])
+        expired = [offer.pk for offer in offers[:3]]
+        Offer.objects.filter(pk__in=expired).update(expires_at=timezone.now() - timedelta(days=1))
+        search = SavedSearch.objects.create(user=self.applicant, name='Python', skills=['python'])
+        JobAlert.objects.create(saved_search=search, offer=offers[0], user=self.applicant)
+
+        self.assertIn('3 offre(s) expirée(s) à désactiver', self.archive('--dry-run'))
+        self.assertEqual(Offer.objects.active().count(), 5)
+        output = self.archive('--batch-size', '2')
+
+        self.assertIn('3 offre(s) expirée(s) désactivée(s), 0 offre(s) archivée(s)', output)
+        self.assertEqual(sorted(Offer.objects.active().values_list('pk', flat=True)), [offer.pk for offer in offers[3:]])
+        self.assertFalse(JobAlert.objects.exists())
+        snapshot = self.facet_snapshot()
+        rebuild_facets()
+        self.assertEqual(self.facet_snapshot(), snapshot)
+        self.assertEqual(FacetCount.objects.get(facet=FacetCount.FACET_SKILL, value='python').count, 2)
+
+    def test_old_inactive_offers_move_to_archive(self):
+        offer, recent = create_offers(self.company, 2, title='Développeur Cobol', active=False)
+        Application.objects.create(applicant=self.applicant, offer=offer, company=self.company)
+        Offer.objects.filter(pk=offer.pk).update(updated_at=timezone.now() - timedelta(days=100))
+
+        self.assertIn('0 offre(s) expirée(s) désactivée(s), 1 offre(s) archivée(s)', self.archive())
+
+        self.assertEqual(list(Offer.objects.values_list('pk', flat=True)), [recent.pk])
+        archived = ArchivedOffer.objects.get()
+        self.assertEqual((archived.pk, archived.title, archived.skills), (offer.pk, offer.title, offer.skills))
+        application = Application.objects.get()
+        self.assertEqual((application.offer_id, application.archived_offer_id), (None, offer.pk))
+        self.assertEqual(search_offers(Offer.objects.all(), 'cobol')[0].count(), 1)
+        self.assertEqual(
+            sorted(lifecycle.offer_history('id').values_list('id', flat=True)), sorted([offer.pk, recent.pk]),
+        )
+
+        # L'historique du postulant affiche toujours l'offre
+        self.client.force_login(self.applicant)
+        self.assertContains(self.client.get(reverse('jobs:my_applications')), 'Développeur Cobol')
+        self.client.force_login(self.company)
+        self.assertContains(self.client.get(reverse('jobs:inbox')), 'Développeur Cobol')
+
+    def test_archive_batch_bumps_the_board_version_once(self):
+        offers = create_offers(self.company, 5, active=False)
+        generation, _changed_at = board.board_version()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(lifecycle.archive_offers([offer.pk for offer in offers]), 5)
+        bumps = [query for query in queries.captured_queries if 'jobs_boardversion' in query['sql']]
+        self.assertEqual(len(bumps), 1)
+        self.assertEqual(board.board_version()[0], generation + 1)
+
+
+class BulkOfferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company('acme', last_name='Acme')
+        cls.other = create_company('other', last_name='Other')
+        cls.applicant = create_applicant()
+
+    def setUp(self):
+        cache.clear()
+        self.offers = create_offers(self.company, 3, skills=['Python'])
+        self.foreign = create_offers(self.other, 1, skills=['Python'])[0]
+        self.client.force_login(self.company)
+
+    def bulk(self, action, offers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('jobs:bulk_update_offers'), {
+                'action': action, 'offer_ids': [offer.pk for offer in offers],
+            }, follow=True)
+        offer_updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "jobs_offer"')]
+        return response, offer_updates
+
+    def assert_facets_consistent(self):
+        snapshot = sorted(FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'))
+        rebuild_facets()
+        self.assertEqual(sorted(FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count')), snapshot)
+
+    def test_actions_are_single_updates_restricted_to_owner(self):
+        response, updates = self.bulk('deactivate', [*self.offers[:2], self.foreign])
+        self.assertContains(response, '2 offre(s) désactivée(s).')
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"company_id" = %s' % self.company.pk, updates[0])
+        self.assertEqual(Offer.objects.active().count(), 2)
+        self.assertTrue(Offer.objects.get(pk=self.foreign.pk).active)
+        self.assert_facets_consistent()
+
+        response, updates = self.bulk('reactivate', self.offers)
+        self.assertContains(response, '2 offre(s) réactivée(s).')
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Offer.objects.active().count(), 4)
+        self.assert_facets_consistent()
+
+    def test_reactivation_extends_expired_offers(self):
+        past = timezone.now() - timedelta(days=1)
+        Offer.objects.filter(pk=self.offers[0].pk).update(active=False, expires_at=past)
+        self.bulk('reactivate', self.offers[:1])
+        offer = Offer.objects.get(pk=self.offers[0].pk)
+        self.assertTrue(offer.active)
+        self.assertGreater(offer.expires_at, timezone.now())
+
+    def test_deleted_offers_are_hidden_then_purged(self):
+        Application.objects.create(applicant=self.applicant, offer=self.offers[0], company=self.company)
+        response, updates = self.bulk('delete', self.offers[:2])
+        self.assertContains(response, '2 offre(s) supprimée(s).')
+        self.assertEqual(len(updates), 1)
+        self.assertNotContains(response, 'Offre 0')
+        self.assertContains(response, 'Offre 2')
+        self.assertEqual(Offer.objects.count(), 4)
+        self.assertEqual(Offer.objects.active().count(), 2)
+        self.assert_facets_consistent()
+
+        # Une offre supprimée ne peut pas être réactivée ni relue par l'API
+        self.bulk('reactivate', self.offers[:2])
+        self.assertEqual(Offer.objects.active().count(), 2)
+        response = self.client.get(reverse('jobs:api_offer_detail', args=[self.offers[0].pk]))
+        self.assertEqual(response.status_code, 404)
+
+        out = StringIO()
+        call_command('purge_offers', stdout=out)
+        self.assertIn('0 offre(s) purgée(s)', out.getvalue())
+        call_command('purge_offers', '--purge-after-days', '0', stdout=out)
+        self.assertIn('2 offre(s) purgée(s)', out.getvalue())
+        self.assertEqual(Offer.objects.count(), 2)
+        self.assertFalse(Application.objects.exists())
+
+    def test_delete_view_checks_owner_in_update(self):
+        url = reverse('jobs:delete_offer', args=[self.foreign.pk])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        response = self.client.post(url)
+        self.assertRedirects(response, reverse('jobs:index'), fetch_redirect_response=False)
+        self.assertIn("Vous n'avez pas la permission", str(list(get_messages(response.wsgi_request))[0]))
+        self.assertIsNone(Offer.objects.get(pk=self.foreign.pk).deleted_at)
+
+        self.client.post(reverse('jobs:delete_offer', args=[self.offers[0].pk]))
+        self.assertIsNotNone(Offer.objects.get(pk=self.offers[0].pk).deleted_at)
+        self.assertEqual(self.client.post(reverse('jobs:delete_offer', args=[self.offers[0].pk])).status_code, 404)
+
+    def test_my_offers_is_reserved_to_companies(self):
+        self.client.force_login(self.applicant)
+        self.assertRedirects(self.client.get(reverse('jobs:my_offers')), reverse('jobs:index'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EndpointBenchmarkTests(TestCase):
+
+    def test_command_reports_every_endpoint_and_cleans_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'bench.json'
+            out = StringIO()
+            call_command(
+                'benchmark_endpoints', '--in-place', '--concurrency', '1', '--offers', '10', '--requests', '3',
+                '--companies', '2', '--applicants', '2', '-o', str(output), stdout=out, stderr=StringIO(),
+            )
+            report = json.loads(output.read_text(encoding='utf-8'))
+
+        self.assertEqual(set(report['endpoints']), {'board', 'profile', 'create_offer', 'delete_offer', 'register', 'login'})
+        for name, result in report['endpoints'].items():
+            self.assertEqual((result['requests'], result['errors']), (3, 0), name)
+            self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+        self.assertGreater(report['endpoints']['create_offer']['queries']['mean'], 0)
+        self.assertIn('p95', out.getvalue())
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Offer.objects.exists())
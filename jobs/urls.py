@@ -5,7 +5,7 @@ Ce module définit les routes pour l'affichage et la gestion des offres d'emploi
 """
 
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'jobs'
 
@@ -13,4 +13,17 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('create/', views.create_offer, name='create_offer'),
     path('<int:offer_id>/delete/', views.delete_offer, name='delete_offer'),
+    path('mine/', views.my_offers, name='my_offers'),
+    path('mine/bulk/', views.bulk_update_offers, name='bulk_update_offers'),
+    path('<int:offer_id>/apply/', views.apply_offer, name='apply_offer'),
+    path('recommended/', views.recommended_offers, name='recommended_offers'),
+    path('applications/', views.my_applications, name='my_applications'),
+    path('applications/<int:application_id>/status/', views.update_application_status, name='update_application_status'),
+    path('inbox/', views.inbox, name='inbox'),
+    path('alerts/', views.saved_searches, name='saved_searches'),
+    path('alerts/<int:saved_search_id>/delete/', views.delete_saved_search, name='delete_saved_search'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('export/', views.export_offers, name='export_offers'),
+    path('api/v1/offers/', api.offer_list, name='api_offer_list'),
+    path('api/v1/offers/<int:offer_id>/', api.offer_detail, name='api_offer_detail'),
 ]
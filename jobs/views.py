@@ -5,26 +5,92 @@ Ce module contient les vues pour afficher, créer et supprimer des offres d'empl
 Les entreprises peuvent publier et gérer leurs offres.
 """
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import Http404
-from home.decorators import login_required_custom
-from .models import Offer
-from .forms import OfferForm
+from django.db import transaction
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import condition, require_POST
+from home.decorators import login_required_custom, admin_required
+from home.models import Profile
+from home import throttling
+from home.throttling import rate_limit, user_key
+from . import board, fragments, lifecycle, recommendations
+from .api import BadRequest, filtered_offers
+from .export import FORMATS, stream_export
+from .applications import submit_application
+from .models import Application, Offer, SavedSearch
+from .forms import OfferForm, SavedSearchForm
+from .pagination import KeysetPage, KeysetPaginator, InvalidCursor, get_page_size
+from .facets import aget_facets
+from .filters import filter_offers
 
 
 @login_required_custom
-def index(request):
+@cache_control(private=True, no_cache=True)
+@board.async_board_state
+@condition(etag_func=board.board_etag, last_modified_func=board.board_last_modified)
+async def index(request):
     """
-    Vue d'accueil qui affiche toutes les offres d'emploi actives.
+    Vue d'accueil qui affiche les offres d'emploi actives, page par page.
     Cette page sert de point d'entrée principale du job board.
+
+    La pagination se fait par curseur sur ``(publication_date, id)`` via
+    les paramètres ``?after=`` / ``?before=``, et ``?size=`` pour la taille.
+    Les filtres (``?q=``, ``?skills=``...) sont décrits dans ``jobs.filters``.
+
+    Si rien n'a changé depuis la dernière visite, le navigateur reçoit un 304
+    (ETag / Last-Modified, voir ``jobs.board``) sans que la page soit rendue.
+
+    Vue async : sous ASGI, l'attente de la base et des clients lents ne
+    bloque pas de worker (voir ``benchmark_board_servers``).
     """
-    offers = Offer.objects.filter(active=True)
-    return render(request, 'jobs/index.html', {'offers': offers})
+    data = await board.aget_cached_page(request)
+    if data is None:
+        # La recherche plein texte inspecte le schéma au premier appel
+        offers, ordering = await sync_to_async(filter_offers)(Offer.objects.active().with_company(), request.GET)
+        paginator = KeysetPaginator(offers, ordering=ordering, page_size=get_page_size(request))
+        cacheable = True
+        try:
+            page = await paginator.aget_page(
+                after=request.GET.get('after'),
+                before=request.GET.get('before'),
+            )
+        except InvalidCursor:
+            messages.warning(request, 'Lien de pagination invalide, retour à la première page.')
+            page = await paginator.aget_page()
+            cacheable = False
+        data = {
+            'cards': [
+                (offer.id, offer.company_id, html)
+                for offer, html in zip(page, fragments.get_cards(page))
+            ],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+            'page_size': page.page_size,
+            'facets': await aget_facets(),
+        }
+        if cacheable:
+            await board.aset_cached_page(request, data)
+
+    page = KeysetPage(data['cards'], data['next_cursor'], data['previous_cursor'], data['page_size'])
+    return render(request, 'jobs/index.html', {
+        'offers': page,
+        'cards': await sync_to_async(fragments.fill_actions)(request, data['cards']),
+        'page': page,
+        'query': request.GET.get('q', '').strip(),
+        'skills': request.GET.get('skills', ''),
+        'skills_mode': request.GET.get('skills_mode', 'all'),
+        'facets': data['facets'],
+    })
 
 
 @login_required
+@rate_limit('create_offer', user_key)
 def create_offer(request):
     """
     Vue pour créer une nouvelle offre d'emploi.
@@ -64,32 +130,273 @@ def create_offer(request):
 
 
 @login_required
+@require_POST
 def delete_offer(request, offer_id):
     """
     Vue pour supprimer une offre d'emploi.
 
     Réservée aux entreprises propriétaires de l'offre.
 
-    Méthode POST : Supprime l'offre
+    Méthode POST : Supprime l'offre (désactivée tout de suite, purgée plus
+    tard par ``purge_offers``, voir ``jobs.lifecycle``)
 
     Sécurité:
         - Vérifie que l'utilisateur est connecté
-        - Vérifie que l'utilisateur est propriétaire de l'offre
+        - Le contrôle de propriété fait partie de la requête UPDATE
         - Redirection avec message de confirmation
     """
-    # Récupérer l'offre
-    offer = get_object_or_404(Offer, id=offer_id)
+    with transaction.atomic():
+        deleted = lifecycle.soft_delete_offers(Offer.objects.filter(id=offer_id, company=request.user))
 
-    # Vérifier que l'utilisateur est le propriétaire
-    if offer.company != request.user:
+    if not deleted:
+        if not Offer.objects.live().filter(id=offer_id).exists():
+            raise Http404
         messages.error(request, "Vous n'avez pas la permission de supprimer cette offre.")
         return redirect('jobs:index')
 
-    # Supprimer l'offre
-    offer_title = offer.title
-    offer.delete()
+    messages.success(request, "Offre supprimée avec succès!")
+    return _redirect_next(request, 'jobs:index')
+
+
+# Action groupée -> (fonction de jobs.lifecycle, message de confirmation)
+BULK_ACTIONS = {
+    'deactivate': (lifecycle.deactivate_offers, '{} offre(s) désactivée(s).'),
+    'reactivate': (lifecycle.reactivate_offers, '{} offre(s) réactivée(s).'),
+    'delete': (lifecycle.soft_delete_offers, '{} offre(s) supprimée(s).'),
+}
+
+
+@login_required
+def my_offers(request):
+    """
+    Offres de l'entreprise connectée, page par page, avec sélection
+    multiple pour les actions groupées (voir ``bulk_update_offers``).
+
+    Lue sur l'index ``(company, -publication_date)``.
+    """
+    profile = getattr(request.user, 'profile', None)
+    if profile is None or profile.user_type != Profile.USER_TYPE_COMPANY:
+        messages.error(request, "Seules les entreprises publient des offres.")
+        return redirect('jobs:index')
+
+    offers = Offer.objects.live().filter(company=request.user)
+    return render(request, 'jobs/my_offers.html', {
+        'page': _keyset_page(request, offers, ordering=('-publication_date', '-id')),
+        'now': timezone.now(),
+    })
+
+
+@login_required
+@require_POST
+def bulk_update_offers(request):
+    """
+    Désactiver, réactiver ou supprimer les offres cochées en une requête
+    ``UPDATE`` ; les offres d'autres entreprises sont ignorées par la
+    requête elle-même.
+    """
+    action = BULK_ACTIONS.get(request.POST.get('action'))
+    offer_ids = [value for value in request.POST.getlist('offer_ids') if value.isdigit()]
+    if action is None:
+        messages.error(request, 'Action invalide.')
+    elif not offer_ids:
+        messages.warning(request, 'Aucune offre sélectionnée.')
+    else:
+        apply, message = action
+        with transaction.atomic():
+            changed = apply(Offer.objects.filter(company=request.user, id__in=offer_ids))
+        messages.success(request, message.format(len(changed)))
+    return _redirect_next(request, 'jobs:my_offers')
+
+
+def _redirect_next(request, default):
+    """Rediriger vers ``next`` (POST) s'il pointe vers ce site, sinon vers ``default``."""
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect(default)
+
+
+def _keyset_page(request, queryset, ordering=('-created_at', '-id')):
+    """Page demandée par ``?after=`` / ``?before=`` (première page si le curseur est invalide)."""
+    paginator = KeysetPaginator(queryset, ordering=ordering, page_size=get_page_size(request))
+    try:
+        return paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        messages.warning(request, 'Lien de pagination invalide, retour à la première page.')
+        return paginator.get_page()
+
+
+@login_required
+@require_POST
+def apply_offer(request, offer_id):
+    """
+    Vue pour postuler à une offre (postulants uniquement).
+
+    Idempotente : renvoyer le formulaire ne crée pas de seconde candidature.
+    Le CV du profil est joint tel qu'il est au moment de l'envoi.
+    """
+    profile = getattr(request.user, 'profile', None)
+    if profile is None or profile.user_type != Profile.USER_TYPE_APPLICANT:
+        messages.error(request, "Seuls les postulants peuvent répondre à une offre.")
+        return redirect('jobs:index')
+
+    offer = get_object_or_404(Offer.objects.active(), id=offer_id)
+    _application, created = submit_application(request.user, offer)
+    if created:
+        messages.success(request, f"Candidature envoyée pour '{offer.title}'.")
+    else:
+        messages.info(request, f"Vous avez déjà postulé à '{offer.title}'.")
+
+    return _redirect_next(request, 'jobs:index')
+
 
-    messages.success(request, f"Offre '{offer_title}' supprimée avec succès!")
-    return redirect('jobs:index')
+@login_required
+def recommended_offers(request):
+    """
+    Offres recommandées au postulant connecté (« Pour vous »).
+
+    Classées par proximité avec son profil : CV, adresse, alertes et
+    candidatures passées (voir ``jobs.recommendations``).
+    """
+    profile = getattr(request.user, 'profile', None)
+    if profile is None or profile.user_type != Profile.USER_TYPE_APPLICANT:
+        messages.error(request, "Les recommandations sont réservées aux postulants.")
+        return redirect('jobs:index')
 
+    offers = recommendations.recommend(request.user)
+    return render(request, 'jobs/recommended.html', {
+        'cards': fragments.render_cards(request, offers),
+    })
+
+
+@login_required
+def my_applications(request):
+    """Historique des candidatures du postulant connecté, page par page."""
+    applications = (
+        Application.objects
+        .filter(applicant=request.user)
+        .select_related('offer', 'offer__company', 'archived_offer', 'archived_offer__company')
+    )
+    return render(request, 'jobs/applications.html', {'page': _keyset_page(request, applications)})
+
+
+@login_required
+def inbox(request):
+    """
+    Candidatures reçues par l'entreprise connectée, page par page.
+
+    Lue sur l'index ``(company, -created_at, -id)`` : le coût d'une page ne
+    dépend pas du nombre total de candidatures.
+    """
+    profile = getattr(request.user, 'profile', None)
+    if profile is None or profile.user_type != Profile.USER_TYPE_COMPANY:
+        messages.error(request, "Seules les entreprises reçoivent des candidatures.")
+        return redirect('jobs:index')
+
+    applications = (
+        Application.objects
+        .filter(company=request.user)
+        .select_related('offer', 'archived_offer', 'applicant')
+    )
+    return render(request, 'jobs/inbox.html', {
+        'page': _keyset_page(request, applications),
+        'status_choices': Application.STATUS_CHOICES,
+    })
+
+
+@login_required
+@require_POST
+def update_application_status(request, application_id):
+    """Changer le statut d'une candidature reçue (entreprise destinataire uniquement)."""
+    status = request.POST.get('status')
+    if status not in dict(Application.STATUS_CHOICES):
+        messages.error(request, 'Statut invalide.')
+    # Le contrôle de propriété fait partie de la requête UPDATE
+    elif not Application.objects.filter(id=application_id, company=request.user).update(
+        status=status, updated_at=timezone.now(),
+    ):
+        raise Http404
+    return _redirect_next(request, 'jobs:inbox')
+
+
+@login_required
+def saved_searches(request):
+    """
+    Recherches enregistrées du postulant connecté (alertes e-mail).
+
+    Méthode GET : liste des alertes et formulaire de création, pré-rempli
+    avec les paramètres ``?q=`` / ``?skills=`` du board.
+    Méthode POST : enregistre une nouvelle alerte.
+    """
+    profile = getattr(request.user, 'profile', None)
+    if profile is None or profile.user_type != Profile.USER_TYPE_APPLICANT:
+        messages.error(request, "Les alertes sont réservées aux postulants.")
+        return redirect('jobs:index')
+
+    if request.method == 'POST':
+        form = SavedSearchForm(request.POST)
+        if form.is_valid():
+            saved_search = form.save(commit=False)
+            saved_search.user = request.user
+            saved_search.save()
+            messages.success(request, f"Alerte '{saved_search.name}' enregistrée.")
+            return redirect('jobs:saved_searches')
+    else:
+        query = request.GET.get('q', '').strip()
+        form = SavedSearchForm(initial={
+            'name': query,
+            'query': query,
+            'skills_input': request.GET.get('skills', ''),
+        })
+
+    return render(request, 'jobs/saved_searches.html', {
+        'form': form,
+        'saved_searches': SavedSearch.objects.filter(user=request.user).order_by('-created_at'),
+    })
+
+
+@login_required
+@require_POST
+def delete_saved_search(request, saved_search_id):
+    """Supprimer une alerte du postulant connecté."""
+    deleted, _ = SavedSearch.objects.filter(id=saved_search_id, user=request.user).delete()
+    if not deleted:
+        raise Http404
+    messages.success(request, 'Alerte supprimée.')
+    return redirect('jobs:saved_searches')
+
+
+@admin_required
+def metrics(request):
+    """
+    Indicateurs internes au format JSON (réservé aux administrateurs).
+
+    - offer_card_cache : succès/échecs du cache des cartes d'offres ;
+    - rate_limits : requêtes autorisées/refusées par portée (``home.throttling``).
+    """
+    return JsonResponse({
+        'offer_card_cache': fragments.get_stats(),
+        'rate_limits': throttling.get_stats(),
+    })
+
+
+@admin_required
+def export_offers(request):
+    """
+    Export des offres en CSV ou JSONL (réservé aux administrateurs).
+
+    ``?format=csv`` (défaut) ou ``jsonl`` ; les filtres sont ceux de l'API
+    (``active``, ``salary_min``, ``skills``, ``q``...). La réponse est
+    envoyée en streaming, sans charger les offres en mémoire.
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest('Format inconnu (csv ou jsonl)')
+    try:
+        offers, _ordering = filtered_offers(request.GET)
+    except BadRequest as exc:
+        return HttpResponseBadRequest(str(exc))
 
+    response = StreamingHttpResponse(stream_export(offers, fmt), content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="offres.{fmt}"'
+    return response
@@ -0,0 +1,25 @@
+"""
+Configuration de l'admin Django pour l'application tasks.
+"""
+
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Suivi de la file de tâches, avec relance manuelle des tâches en échec."""
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'dedup_key')
+    readonly_fields = ('created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error')
+    actions = ('requeue',)
+
+    @admin.action(description='Relancer les tâches sélectionnées')
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status=Task.STATUS_RUNNING).update(
+            status=Task.STATUS_QUEUED, attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f'{count} tâches relancées.')
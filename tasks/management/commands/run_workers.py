@@ -0,0 +1,78 @@
+"""
+Lancer les workers de la file de tâches.
+
+Usage:
+    python manage.py run_workers                   # 1 processus
+    python manage.py run_workers --processes 4     # 4 processus
+    python manage.py run_workers --threads 4       # 4 threads dans ce processus
+    python manage.py run_workers --once            # vider la file puis quitter
+"""
+
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tasks.worker import run_worker
+
+
+def _process_main(poll_interval, once):
+    """Point d'entrée d'un processus worker (les connexions sont rouvertes à la demande)."""
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+    run_worker(stop_event, poll_interval=poll_interval, once=once)
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches en file (pool de processus ou de threads)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Nombre de processus workers")
+        parser.add_argument('--threads', type=int, default=0, help="Utiliser N threads au lieu de processus")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Attente (secondes) quand la file est vide")
+        parser.add_argument('--once', action='store_true', help="Exécuter les tâches prêtes puis quitter")
+
+    def handle(self, *args, **options):
+        poll_interval, once = options['poll_interval'], options['once']
+        if options['processes'] < 1 or options['threads'] < 0:
+            raise CommandError('Nombre de workers invalide.')
+
+        stop_event = threading.Event()
+        if options['threads']:
+            workers = [
+                threading.Thread(target=run_worker, args=(stop_event, poll_interval, once), name=f'worker-{index}')
+                for index in range(options['threads'])
+            ]
+        elif options['processes'] == 1:
+            self.stdout.write('Worker démarré (Ctrl+C pour arrêter).')
+            try:
+                run_worker(stop_event, poll_interval=poll_interval, once=once)
+            except KeyboardInterrupt:
+                pass
+            return
+        else:
+            # Ne pas partager les connexions ouvertes avec les processus enfants ;
+            # fork : les enfants héritent de Django déjà configuré
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            workers = [
+                context.Process(target=_process_main, args=(poll_interval, once), name=f'worker-{index}')
+                for index in range(options['processes'])
+            ]
+
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'{len(workers)} workers démarrés (Ctrl+C pour arrêter).')
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            stop_event.set()
+            for worker in workers:
+                if hasattr(worker, 'terminate'):
+                    worker.terminate()
+                worker.join()
+        self.stdout.write(self.style.SUCCESS('Workers arrêtés.'))
@@ -0,0 +1,64 @@
+"""
+Modèles de l'application tasks (file de tâches en base).
+"""
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    Tâche en attente, en cours ou terminée.
+
+    Une tâche est réclamée par un worker en passant de ``queued`` à
+    ``running`` par un ``UPDATE`` conditionnel : un seul worker peut
+    gagner, même avec plusieurs processus sur la même base.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_DONE, 'Terminée'),
+        (STATUS_FAILED, 'En échec'),
+    ]
+    PENDING_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+    # Une tâche en cours ne déduplique plus : ce qui arrive pendant son
+    # exécution doit être traité par une nouvelle tâche
+    DEDUP_STATUSES = (STATUS_QUEUED,)
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Deux tâches en file (``queued``) ne peuvent pas partager la même clé ;
+    # les tâches de même clé ne s'exécutent jamais en même temps
+    dedup_key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tâche"
+        verbose_name_plural = "Tâches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=Q(status='queued'),
+                name='unique_queued_task_dedup_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
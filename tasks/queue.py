@@ -0,0 +1,129 @@
+"""
+File de tâches locale, stockée dans la base de l'application.
+
+Déclarer une tâche dans le module ``tasks.py`` d'une application (ils sont
+importés au démarrage, voir ``TasksConfig.ready``) :
+
+    from tasks.queue import task
+
+    @task(max_attempts=3)
+    def send_mail(user_id):
+        ...
+
+puis la mettre en file depuis une vue :
+
+    send_mail.delay(user.id)
+    send_mail.enqueue(args=[user.id], dedup_key=f'mail:{user.id}', delay=60)
+
+Les tâches sont exécutées par ``python manage.py run_workers`` (voir
+``tasks.worker``). Avec ``TASKS_EAGER = True`` elles sont exécutées dans le
+processus appelant, après le commit de la transaction en cours (tests,
+développement sans worker).
+
+Les arguments sont stockés en JSON : passer des identifiants, pas des
+instances de modèles.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+
+class UnknownTask(LookupError):
+    """Levée quand une tâche en base n'a pas de fonction enregistrée."""
+
+
+class TaskFunction:
+    """Fonction enregistrée comme tâche ; reste appelable directement."""
+
+    def __init__(self, func, name, max_attempts, backoff):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.__doc__ = func.__doc__
+        self.__name__ = func.__name__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def retry_delay(self, attempts):
+        """Délai (secondes) avant la tentative suivante : backoff exponentiel."""
+        return self.backoff * 2 ** (attempts - 1)
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args=args, kwargs=kwargs)
+
+    def enqueue(self, args=(), kwargs=None, dedup_key=None, delay=0):
+        return enqueue(self.name, args=args, kwargs=kwargs, dedup_key=dedup_key, delay=delay)
+
+
+def task(name=None, max_attempts=5, backoff=10):
+    """
+    Enregistrer une fonction comme tâche.
+
+    ``name`` vaut par défaut ``<module>.<fonction>`` ; ``backoff`` est le
+    délai (secondes) avant la première nouvelle tentative, doublé ensuite.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registered = TaskFunction(func, task_name, max_attempts, backoff)
+        REGISTRY[task_name] = registered
+        return registered
+    return decorator
+
+
+def get_task(name):
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise UnknownTask(name)
+
+
+def enqueue(name, args=(), kwargs=None, dedup_key=None, delay=0):
+    """
+    Mettre la tâche ``name`` en file.
+
+    Si une tâche en file (pas encore réclamée) porte déjà ``dedup_key``,
+    aucune nouvelle tâche n'est créée et la tâche existante est retournée.
+    Une tâche déjà en cours ne compte pas : elle a pu lire ses données
+    avant l'appel, la nouvelle tâche attendra qu'elle se termine. La ligne est
+    écrite dans la transaction de l'appelant : elle disparaît avec elle en
+    cas de rollback.
+    """
+    registered = get_task(name)
+    args, kwargs = list(args), dict(kwargs or {})
+
+    if getattr(settings, 'TASKS_EAGER', False):
+        transaction.on_commit(lambda: registered(*args, **kwargs))
+        return None
+
+    if dedup_key:
+        existing = Task.objects.filter(dedup_key=dedup_key, status__in=Task.DEDUP_STATUSES).first()
+        if existing:
+            return existing
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name,
+                args=args,
+                kwargs=kwargs,
+                dedup_key=dedup_key,
+                max_attempts=registered.max_attempts,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        # Course avec un autre processus sur la même clé
+        existing = Task.objects.filter(dedup_key=dedup_key, status__in=Task.DEDUP_STATUSES).first()
+        if existing is None:
+            raise
+        return existing
@@ -0,0 +1,103 @@
+"""
+Tests de l'application tasks.
+
+Lancement:
+    python manage.py test tasks
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import task
+from .worker import execute, requeue_stale, run_pending
+
+CALLS = []
+
+
+@task(name='tests.record')
+def record(value):
+    CALLS.append(value)
+
+
+@task(name='tests.flaky', max_attempts=2, backoff=30)
+def flaky():
+    raise RuntimeError('boom')
+
+
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        record.delay('a')
+        record.enqueue(args=['b'], delay=3600)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(CALLS, ['a'])
+        self.assertEqual(Task.objects.filter(status=Task.STATUS_DONE).count(), 1)
+        self.assertEqual(Task.objects.filter(status=Task.STATUS_QUEUED).count(), 1)
+
+    def test_pending_tasks_are_deduplicated(self):
+        first = record.enqueue(args=['a'], dedup_key='same')
+        second = record.enqueue(args=['a'], dedup_key='same')
+        self.assertEqual(first.pk, second.pk)
+        run_pending()
+        third = record.enqueue(args=['a'], dedup_key='same')
+        self.assertNotEqual(third.pk, first.pk)
+
+    def test_enqueue_while_running_creates_a_task_run_afterwards(self):
+        running = record.enqueue(args=['a'], dedup_key='same')
+        Task.objects.filter(pk=running.pk).update(status=Task.STATUS_RUNNING, locked_at=timezone.now())
+        queued = record.enqueue(args=['a'], dedup_key='same')
+        self.assertNotEqual(queued.pk, running.pk)
+        # Jamais deux tâches de même clé en même temps
+        self.assertEqual(run_pending(), 0)
+        Task.objects.filter(pk=running.pk).update(status=Task.STATUS_DONE)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(CALLS, ['a'])
+
+    def test_failed_task_defers_to_a_queued_duplicate(self):
+        running = flaky.enqueue(dedup_key='flaky')
+        Task.objects.filter(pk=running.pk).update(status=Task.STATUS_RUNNING, attempts=1)
+        queued = flaky.enqueue(dedup_key='flaky')
+        with self.assertLogs('tasks.worker', 'WARNING'):
+            execute(Task.objects.get(pk=running.pk))
+        self.assertEqual(Task.objects.get(pk=running.pk).status, Task.STATUS_FAILED)
+        self.assertEqual(Task.objects.get(pk=queued.pk).status, Task.STATUS_QUEUED)
+
+    def test_retries_with_backoff_then_fails(self):
+        flaky.delay()
+        before = timezone.now()
+        with self.assertLogs('tasks.worker', 'WARNING'):
+            run_pending()
+        pending = Task.objects.get()
+        self.assertEqual(pending.status, Task.STATUS_QUEUED)
+        self.assertGreaterEqual(pending.run_at, before + timedelta(seconds=30))
+        self.assertIn('RuntimeError', pending.last_error)
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('tasks.worker', 'ERROR'):
+            run_pending()
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.STATUS_FAILED)
+        self.assertEqual(failed.attempts, 2)
+
+    def test_stale_running_tasks_are_requeued(self):
+        record.delay('a')
+        Task.objects.update(status=Task.STATUS_RUNNING, locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale(lock_timeout=60), 1)
+        call_command('run_workers', '--once', stdout=StringIO())
+        self.assertEqual(CALLS, ['a'])
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delay('a')
+            self.assertEqual(CALLS, [])
+        self.assertEqual(CALLS, ['a'])
+        self.assertFalse(Task.objects.exists())
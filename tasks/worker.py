@@ -0,0 +1,161 @@
+"""
+Exécution des tâches en file (voir ``tasks.queue``).
+
+Un worker boucle : il libère les tâches dont le worker a disparu, réclame
+les tâches prêtes une par une par un ``UPDATE ... WHERE status='queued'``
+(un seul worker gagne, même entre processus), les exécute puis les marque
+terminées ou les replanifie avec un backoff exponentiel. Au-delà de
+``max_attempts`` la tâche passe en échec et reste en base pour diagnostic.
+
+Une tâche en file n'est pas réclamée tant qu'une tâche de même
+``dedup_key`` est en cours : les deux ne s'exécutent jamais en même temps.
+Si une tâche de même clé a été mise en file pendant l'exécution, une
+tâche en échec ou abandonnée par son worker lui laisse le travail au lieu
+d'être replanifiée.
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+from .queue import UnknownTask, get_task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_TIMEOUT = 15 * 60
+
+SUPERSEDED_ERROR = "Remplacée par une tâche de même clé mise en file entre-temps"
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def _queued_keys():
+    return Task.objects.filter(status=Task.STATUS_QUEUED, dedup_key__isnull=False).values('dedup_key')
+
+
+def _running_keys():
+    return Task.objects.filter(status=Task.STATUS_RUNNING, dedup_key__isnull=False).values('dedup_key')
+
+
+def requeue_stale(lock_timeout=None):
+    """Remettre en file les tâches ``running`` dont le verrou a expiré (worker arrêté)."""
+    if lock_timeout is None:
+        lock_timeout = getattr(settings, 'TASKS_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+    stale = Task.objects.filter(
+        status=Task.STATUS_RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=lock_timeout),
+    )
+    # La tâche de même clé déjà en file refera le travail
+    stale.filter(dedup_key__in=_queued_keys()).update(
+        status=Task.STATUS_FAILED, finished_at=timezone.now(),
+        locked_by='', locked_at=None, last_error=SUPERSEDED_ERROR,
+    )
+    return stale.update(status=Task.STATUS_QUEUED, locked_by='', locked_at=None)
+
+
+def claim(name, batch_size=10):
+    """Réclamer une tâche prête ; retourne la tâche ou None."""
+    now = timezone.now()
+    candidates = (
+        Task.objects
+        .filter(status=Task.STATUS_QUEUED, run_at__lte=now)
+        .exclude(dedup_key__in=_running_keys())
+        .order_by('run_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    for task_id in candidates:
+        claimed = Task.objects.filter(id=task_id, status=Task.STATUS_QUEUED).update(
+            status=Task.STATUS_RUNNING,
+            locked_by=name,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(id=task_id)
+    return None
+
+
+def _reschedule(task, error):
+    """
+    Remettre en file une tâche en échec, avec backoff.
+
+    Retourne False si une tâche de même clé a été mise en file pendant
+    l'exécution : c'est elle qui refera le travail.
+    """
+    delay = get_task(task.name).retry_delay(task.attempts)
+    try:
+        with transaction.atomic():
+            Task.objects.filter(id=task.id).update(
+                status=Task.STATUS_QUEUED,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                locked_by='', locked_at=None, last_error=error,
+            )
+    except IntegrityError:
+        logger.warning('Tâche %s #%s en échec, remplacée par une tâche de même clé en file', task.name, task.pk)
+        return False
+    logger.warning('Tâche %s #%s en échec (tentative %s), nouvel essai dans %ss',
+                   task.name, task.pk, task.attempts, delay)
+    return True
+
+
+def execute(task):
+    """Exécuter une tâche réclamée et enregistrer son résultat."""
+    try:
+        get_task(task.name)(*task.args, **task.kwargs)
+    except Exception as exc:
+        error = traceback.format_exc()
+        retry = task.attempts < task.max_attempts and not isinstance(exc, UnknownTask)
+        if retry and _reschedule(task, error):
+            return False
+        if retry:
+            error = f'{SUPERSEDED_ERROR}\n\n{error}'
+        else:
+            logger.error('Tâche %s #%s abandonnée après %s tentatives', task.name, task.pk, task.attempts)
+        Task.objects.filter(id=task.id).update(
+            status=Task.STATUS_FAILED, finished_at=timezone.now(),
+            locked_by='', locked_at=None, last_error=error,
+        )
+        return False
+    Task.objects.filter(id=task.id).update(
+        status=Task.STATUS_DONE, finished_at=timezone.now(), locked_by='', locked_at=None,
+    )
+    return True
+
+
+def run_pending(name=None, limit=None):
+    """Exécuter les tâches prêtes jusqu'à épuisement (ou ``limit``) ; retourne leur nombre."""
+    name = name or worker_name()
+    done = 0
+    while limit is None or done < limit:
+        task = claim(name)
+        if task is None:
+            break
+        execute(task)
+        done += 1
+    return done
+
+
+def run_worker(stop_event, poll_interval=1.0, once=False):
+    """Boucle d'un worker (thread ou processus) jusqu'à ``stop_event``."""
+    name = worker_name()
+    logger.info('Worker %s démarré', name)
+    while not stop_event.is_set():
+        close_old_connections()
+        requeue_stale()
+        done = run_pending(name)
+        if once:
+            break
+        if not done:
+            stop_event.wait(poll_interval)
+    close_old_connections()